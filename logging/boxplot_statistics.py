@@ -3,10 +3,24 @@
 """
 CSV-Reader für Boxplot-Statistiken
 Berechnet Mittelwert, Median, Quartile und weitere Statistiken aus einer CSV-Datei.
+
+Alle Spalten (x/y bzw. x/y/z) werden gemeinsam ausgewertet, die Quantile
+in einem einzigen np.quantile-Aufruf. Eingaben: CSV mit Kopfzeile (z.B.
+uwb_positions.csv), .npy-Arrays (N, Achsen), Aufzeichnungsverzeichnisse
+von --record (uwb/recording.py) oder Spalten-Dumps von analyze-triang.py
+--dump (x.npy, y.npy, z.npy). Mehrere Dateien landen nebeneinander in
+der Ausgabe.
 """
+import argparse
 import csv
+import sys
 import numpy as np
 import logging
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+from uwb.recording import Recording
+from uwb.reprocess import is_dump, load_dump
 
 # --------------------------------------------------------------------------- #
 #  Konfiguration
@@ -14,6 +28,9 @@ import logging
 INPUT_FILE = "uwb_positions.csv"
 OUTPUT_FILE = "boxplot_statistics.csv"
 
+AXES = ("x [cm]", "y [cm]", "z [cm]")
+QUANTILES = (0.0, 0.25, 0.5, 0.75, 1.0)     # min, q1, median, q3, max
+
 logging.basicConfig(level=logging.INFO,
                     format="%(asctime)s [%(levelname)s] %(message)s",
                     datefmt="%H:%M:%S")
@@ -21,46 +38,111 @@ logging.basicConfig(level=logging.INFO,
 # --------------------------------------------------------------------------- #
 #  Hilfsfunktionen
 # --------------------------------------------------------------------------- #
+def axis_names(n: int) -> list[str]:
+    return list(AXES[:n]) if n <= len(AXES) else [f"Spalte {i + 1}" for i in range(n)]
+
+def load_positions(path: str) -> tuple[list[str], np.ndarray]:
+    """Liest eine Positionsdatei als (Spaltennamen, Array (N, Achsen))."""
+    p = Path(path)
+    if is_dump(p):
+        names, data = load_dump(p)
+        return axis_names(len(names)), data
+    if p.is_dir():
+        _, xyz = Recording(p).positions()
+        # 2D-Aufzeichnungen haben z = NaN
+        axes = 3 if len(xyz) and not np.isnan(xyz[:, 2]).all() else 2
+        return axis_names(axes), np.asarray(xyz[:, :axes], dtype=float)
+    if p.suffix == ".npy":
+        data = np.load(p, mmap_mode="r")
+        data = data.reshape(len(data), -1)
+        return axis_names(data.shape[1]), data
+    with open(p, "r") as csvfile:
+        header = next(csv.reader(csvfile), [])
+    data = np.loadtxt(p, delimiter=",", skiprows=1, ndmin=2)
+    return header or axis_names(data.shape[1]), data
+
 def calculate_statistics(data: np.ndarray) -> dict:
-    """Berechnet Statistiken für die gegebenen Daten."""
+    """Berechnet Statistiken für die gegebenen Daten (1D oder spaltenweise für (N, Achsen))."""
+    # Eine Achse pro Zeile, zusammenhängend im Speicher; die Kopie darf np.quantile umsortieren
+    cols = np.array(np.asarray(data).T, dtype=float, order="C")
+    mean, std_dev = cols.mean(axis=-1), cols.std(axis=-1)
+    mn, q1, median, q3, mx = np.quantile(cols, QUANTILES, axis=-1, overwrite_input=True)
     return {
-        "mean": np.mean(data),
-        "median": np.median(data),
-        "std_dev": np.std(data),
-        "min": np.min(data),
-        "max": np.max(data),
-        "q1": np.percentile(data, 25),
-        "q3": np.percentile(data, 75),
+        "mean": mean,
+        "median": median,
+        "std_dev": std_dev,
+        "min": mn,
+        "max": mx,
+        "q1": q1,
+        "q3": q3,
     }
 
+def plot_boxplots(labels: list[str], stats: dict, path: str):
+    """Boxplot direkt aus den berechneten Kennwerten, ohne die Daten erneut zu sortieren."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    boxes = []
+    for k, label in enumerate(labels):
+        q1, q3 = stats["q1"][k], stats["q3"][k]
+        iqr = q3 - q1
+        boxes.append({"label": label, "med": stats["median"][k], "q1": q1, "q3": q3,
+                      "mean": stats["mean"][k], "fliers": [],
+                      "whislo": max(stats["min"][k], q1 - 1.5 * iqr),
+                      "whishi": min(stats["max"][k], q3 + 1.5 * iqr)})
+    fig, ax = plt.subplots(figsize=(max(6, 1.5 * len(boxes)), 6))
+    ax.bxp(boxes, showmeans=True)
+    ax.set_title("UWB – Positions-Boxplot")
+    ax.set_ylabel("Position [cm]")
+    ax.grid(True)
+    fig.savefig(path)
+    logging.info("Boxplot gespeichert: %s", path)
+
 # --------------------------------------------------------------------------- #
 #  Hauptprogramm
 # --------------------------------------------------------------------------- #
 def main():
+    parser = argparse.ArgumentParser(description="Boxplot-Statistiken aus Positionslogs")
+    parser.add_argument("files", nargs="*", default=[INPUT_FILE],
+                        help=f"CSV, .npy, Aufzeichnung oder Spalten-Dump (default: {INPUT_FILE})")
+    parser.add_argument("--output", default=OUTPUT_FILE, help=f"Ausgabe-CSV (default: {OUTPUT_FILE})")
+    parser.add_argument("--plot", default=None, metavar="PNG", help="Boxplot aus den Kennwerten speichern")
+    args = parser.parse_args()
+
     try:
-        # Daten aus CSV lesen
-        logging.info("Lese Daten aus %s", INPUT_FILE)
-        with open(INPUT_FILE, "r") as csvfile:
-            csvreader = csv.reader(csvfile)
-            header = next(csvreader)  # Überspringe Header
-            data = np.array([list(map(float, row)) for row in csvreader])
-
-        if data.size == 0:
+        labels, columns = [], {}
+        for path in args.files:
+            # Daten am Stück lesen
+            logging.info("Lese Daten aus %s", path)
+            header, data = load_positions(path)
+            if data.size == 0:
+                logging.error("Keine Daten in %s gefunden!", path)
+                continue
+
+            # Statistiken aller Achsen auf einmal
+            logging.info("Berechne Statistiken für %d Zeilen, %d Achsen ...", *data.shape)
+            stats = calculate_statistics(data)
+            prefix = f"{Path(path).stem}: " if len(args.files) > 1 else ""
+            for k, name in enumerate(header):
+                labels.append(prefix + name)
+                for stat, values in stats.items():
+                    columns.setdefault(stat, []).append(values[k])
+
+        if not labels:
             logging.error("Keine Daten in der Datei gefunden!")
             return
 
-        # Statistiken berechnen
-        logging.info("Berechne Statistiken ...")
-        x_stats = calculate_statistics(data[:, 0])
-        y_stats = calculate_statistics(data[:, 1])
-
         # Ergebnisse in eine neue CSV-Datei schreiben
-        logging.info("Schreibe Statistiken in %s", OUTPUT_FILE)
-        with open(OUTPUT_FILE, "w", newline="") as csvfile:
+        logging.info("Schreibe Statistiken in %s", args.output)
+        with open(args.output, "w", newline="") as csvfile:
             csvwriter = csv.writer(csvfile)
-            csvwriter.writerow(["Statistik", "x [cm]", "y [cm]"])
-            for stat in x_stats.keys():
-                csvwriter.writerow([stat, x_stats[stat], y_stats[stat]])
+            csvwriter.writerow(["Statistik", *labels])
+            for stat, values in columns.items():
+                csvwriter.writerow([stat, *values])
+
+        if args.plot:
+            plot_boxplots(labels, columns, args.plot)
 
         logging.info("Statistiken erfolgreich berechnet und gespeichert.")
 
@@ -1,39 +1,108 @@
-import re
+import sys
+import time
 import numpy as np
 import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from uwb.config import add_layout_arguments, layout_from_args, parse_anchors
+from uwb.recording import Recording
+from uwb.reprocess import CHUNK_BYTES, ColumnDump, FileResult, Moments, reprocess
 
 parser = argparse.ArgumentParser(description="Berechne Mittelwerte und Abweichungen aus 3D-Koordinaten.")
-parser.add_argument("dateipfad", type=str, help="Pfad zur Datei mit den Logdaten")
+parser.add_argument("dateipfad", type=str, nargs="+",
+                    help="Logdatei(en) mit Positionen oder SESSION_INFO_NTF-Frames bzw. Aufzeichnung (--record)")
 parser.add_argument("--soll", type=float, nargs=3, metavar=('X', 'Y', 'Z'), default=[180.0, 85.0, -80.0],
                     help="Sollwerte für x, y und z (Standard: 180, 85, -80)")
+parser.add_argument("--jobs", "-j", type=int, default=None,
+                    help="Anzahl Prozesse (Standard: alle Kerne)")
+parser.add_argument("--chunk-mb", type=float, default=CHUNK_BYTES / (1 << 20),
+                    help=f"Maximale Chunkgröße in MB (Standard: {CHUNK_BYTES >> 20})")
+parser.add_argument("--anker", nargs=4, action="append", metavar=("MAC", "X", "Y", "Z"),
+                    help="Ankerposition für Rohlogs, mehrfach angeben (Standard: Anker aus --layout)")
+parser.add_argument("--dump", default=None, metavar="DIR",
+                    help="Zusätzlich zur Zusammenfassung alle Positionen spaltenweise nach DIR/<Name>/x.npy, "
+                         "y.npy, z.npy schreiben (z.B. für boxplot_statistics.py)")
+
+add_layout_arguments(parser, "lab3d")
 
 args = parser.parse_args()
+try:
+    anchors = parse_anchors(args.anker) if args.anker else layout_from_args(args, dim=3)
+except (OSError, ValueError) as e:
+    parser.exit(1, f"{e}\n")
+
+# Unterverzeichnis je Eingabe: Dateiname ohne Endung, bei gleichen Namen (a/log.txt b/log.txt) mit Index
+stems = [Path(p).stem for p in args.dateipfad]
+dump_names = [f"{stem}_{k}" if stems.count(stem) > 1 else stem for k, stem in enumerate(stems)]
+dumps: dict[int, ColumnDump] = {}
+
+def dump(k: int, pos: np.ndarray):
+    """Schreibt Positionen der k-ten Eingabe blockweise weiter, der Speicher bleibt unabhängig von der Dateigröße."""
+    if k not in dumps:
+        dumps[k] = ColumnDump(Path(args.dump) / dump_names[k], pos.shape[1])
+    dumps[k].add(pos)
+
+t0 = time.perf_counter()
+results: list[FileResult] = []
+log_index = [k for k, p in enumerate(args.dateipfad) if not Path(p).is_dir()]
+logs = [args.dateipfad[k] for k in log_index]
+if logs:
+    # Textlogs blockweise lesen, bei mehreren Prozessen in zeilen- bzw. framegenauen Chunks
+    results = reprocess(logs, anchors, jobs=args.jobs, chunk_bytes=int(args.chunk_mb * (1 << 20)),
+                        on_positions=(lambda k, pos: dump(log_index[k], pos)) if args.dump else None)
+for k, path in enumerate(args.dateipfad):
+    if Path(path).is_dir():
+        # Binäre Aufzeichnung: Positionen direkt aus den eingeblendeten Spalten
+        _, data = Recording(path).positions()
+        data = data[np.isfinite(data).all(axis=1)]
+        result = FileResult(path, "recording", 3)
+        result.moments, result.frames = Moments.of(data), len(data)
+        if args.dump and len(data):
+            dump(k, data)
+        results.insert(k, result)
+for d in dumps.values():
+    d.close()
+elapsed = time.perf_counter() - t0
+
+def report(moments: Moments):
+    mean_x, mean_y, mean_z = moments.mean
+    std_x, std_y, std_z = moments.stdev
+
+    # Ausgabe
+    print(f"Mittelwerte (n = {moments.count}):")
+    print(f"x̄ = {mean_x:.2f} cm  (σ = {std_x:.2f} cm)")
+    print(f"ȳ = {mean_y:.2f} cm  (σ = {std_y:.2f} cm)")
+    print(f"z̄ = {mean_z:.2f} cm  (σ = {std_z:.2f} cm)\n")
+
+    soll_x, soll_y, soll_z = args.soll
+    abw_x, abw_y, abw_z = abs(mean_x - soll_x), abs(mean_y - soll_y), abs(mean_z - soll_z)
+    print(f"Abweichungen:")
+    print(f"x = {abw_x:.2f} cm")
+    print(f"y = {abw_y:.2f} cm")
+    print(f"z = {abw_z:.2f} cm\n")
+
+total = Moments(3)
+for result in results:
+    if len(results) > 1:
+        print(f"== {result.path} ==")
+    if result.dim != 3:
+        print(f"Übersprungen: {result.dim}D-Positionen\n")
+        continue
+    if result.moments.count == 0:
+        print("Keine Koordinaten gefunden.\n")
+        continue
+    report(result.moments)
+    total.merge(result.moments)
+
+if len(results) > 1 and total.count:
+    print("== Gesamt ==")
+    report(total)
+if total.count == 0:
+    sys.exit(1)
 
-with open(args.dateipfad, "r") as file:
-    log_data = file.read()
-
-# Alle Koordinaten extrahieren
-pattern = r"x=\s*(-?\d+\.?\d*)\s*cm\s*y=\s*(-?\d+\.?\d*)\s*cm\s*z=\s*(-?\d+\.?\d*)\s*cm"
-matches = re.findall(pattern, log_data)
-
-# In NumPy-Arrays umwandeln
-data = np.array(matches, dtype=np.float32)
-x_vals, y_vals, z_vals = data[:, 0], data[:, 1], data[:, 2]
-
-# Mittelwerte berechnen
-mean_x = np.mean(x_vals)
-mean_y = np.mean(y_vals)
-mean_z = np.mean(z_vals)
-
-# Ausgabe
-print(f"Mittelwerte:")
-print(f"x̄ = {mean_x:.2f} cm")
-print(f"ȳ = {mean_y:.2f} cm")
-print(f"z̄ = {mean_z:.2f} cm\n")
-
-soll_x, soll_y, soll_z = args.soll
-abw_x, abw_y, abw_z = abs(mean_x - soll_x), abs(mean_y - soll_y), abs(mean_z - soll_z)
-print(f"Abweichungen:")
-print(f"x = {abw_x:.2f} cm")
-print(f"y = {abw_y:.2f} cm")
-print(f"z = {abw_z:.2f} cm\n")
\ No newline at end of file
+frames = sum(r.frames for r in results)
+chunks = sum(r.chunks for r in results)
+print(f"{total.count} Positionen aus {frames} Zeilen/Frames, {chunks} Chunks, {elapsed:.2f} s", file=sys.stderr)
+if dumps:
+    print(f"Positionen gespeichert: {', '.join(str(d.path) for d in dumps.values())}", file=sys.stderr)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Messreihen aus CSV gegen das Messarchiv (uwb/archive.py)
+
+Legt eine synthetische Kampagne mit --runs CSV-Dateien zu je --rows
+Messungen an (Format von `stat --save`) und misst die Zeit, bis alle
+Distanzen geladen sind: csv.DictReader wie bisher in auswertung.py und
+fehler_plots.py, erster Archiv-Zugriff (Konvertierung) und jeder weitere
+Zugriff (Memory-Mapping aus dem Cache).
+
+Beispiel:
+    python benchmarks/bench_archive.py --runs 10 --rows 200000
+"""
+import argparse
+import csv
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from uwb.archive import Archive
+
+def write_campaign(root: Path, runs: int, rows: int):
+    rng = np.random.default_rng(0)
+    (root / "kalibriert").mkdir(parents=True)
+    for k in range(runs):
+        nominal = 100 * (k + 1)
+        macs = rng.choice(["0x0002", "0x0003", "0x0004"], rows)
+        dists = rng.normal(nominal, 3, rows).astype(int)
+        with open(root / "kalibriert" / f"messung_{nominal}cm_kalibriert.csv", "w") as f:
+            f.write("MAC-Adresse,Distanz (cm)\n")
+            f.writelines(f"{m},{d}\n" for m, d in zip(macs, dists))
+
+def load_dictreader(root: Path) -> int:
+    n = 0
+    for path in sorted(root.rglob("*.csv")):
+        with open(path, newline="") as csvfile:
+            werte = [int(row["Distanz (cm)"]) for row in csv.DictReader(csvfile)]
+        n += len(werte)
+    return n
+
+def load_archive(root: Path) -> tuple[int, int]:
+    archive = Archive(root)
+    n = sum(len(run.distances) for run in archive.runs)
+    return n, archive.conversions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CSV gegen Messarchiv")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp())
+    try:
+        write_campaign(root, args.runs, args.rows)
+        for label, fn in (("csv.DictReader", load_dictreader),
+                          ("Archiv, erster Zugriff", load_archive),
+                          ("Archiv, Cache", load_archive)):
+            t0 = time.perf_counter()
+            result = fn(root)
+            dt = time.perf_counter() - t0
+            n = result[0] if isinstance(result, tuple) else result
+            extra = f"  ({result[1]} konvertiert)" if isinstance(result, tuple) else ""
+            print(f"{label:<24} {dt * 1e3:9.1f} ms  {n} Werte{extra}")
+    finally:
+        shutil.rmtree(root)
+
+if __name__ == "__main__":
+    main()
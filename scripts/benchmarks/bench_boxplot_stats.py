@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: logging/boxplot_statistics.py alt gegen vektorisiert
+
+Schreibt ein Positionslog mit --rows Zeilen und --axes Achsen als CSV und
+als .npy und misst Laden und Statistik: wie bisher (csv.reader mit
+list(map(float, row)) pro Zeile, sieben Durchläufe pro Spalte) gegen
+np.loadtxt bzw. .npy mit einem np.quantile-Aufruf über alle Achsen.
+
+Beispiel:
+    python benchmarks/bench_boxplot_stats.py --rows 2000000 --axes 3
+"""
+import argparse
+import csv
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+sys.path.insert(0, str(ROOT / "logging"))
+from boxplot_statistics import calculate_statistics, load_positions
+
+def old_statistics(data: np.ndarray) -> dict:
+    return {
+        "mean": np.mean(data),
+        "median": np.median(data),
+        "std_dev": np.std(data),
+        "min": np.min(data),
+        "max": np.max(data),
+        "q1": np.percentile(data, 25),
+        "q3": np.percentile(data, 75),
+    }
+
+def old(path: Path) -> list[dict]:
+    with open(path, "r") as csvfile:
+        csvreader = csv.reader(csvfile)
+        next(csvreader)
+        data = np.array([list(map(float, row)) for row in csvreader])
+    return [old_statistics(data[:, k]) for k in range(data.shape[1])]
+
+def new(path: Path) -> dict:
+    _, data = load_positions(str(path))
+    return calculate_statistics(data)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark boxplot_statistics.py")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--axes", type=int, default=3, choices=[2, 3])
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp())
+    try:
+        rng = np.random.default_rng(0)
+        data = rng.normal([175, -70, 80][:args.axes], [2, 7, 5][:args.axes], size=(args.rows, args.axes))
+        csv_path, npy_path = tmp / "pos.csv", tmp / "pos.npy"
+        header = ",".join(["x [cm]", "y [cm]", "z [cm]"][:args.axes])
+        np.savetxt(csv_path, data, delimiter=",", header=header, comments="")
+        np.save(npy_path, data)
+
+        t0 = time.perf_counter()
+        ref = old(csv_path)
+        t_old = time.perf_counter() - t0
+        for label, path in (("np.loadtxt + np.quantile", csv_path), (".npy + np.quantile", npy_path)):
+            t0 = time.perf_counter()
+            stats = new(path)
+            dt = time.perf_counter() - t0
+            for k in range(args.axes):
+                assert all(np.isclose(stats[s][k], ref[k][s]) for s in ref[k])
+            print(f"{label:<26} {dt:7.2f} s  ({t_old / dt:.1f}x schneller)")
+        print(f"{'csv.reader + 7 Durchläufe':<26} {t_old:7.2f} s  ({args.rows} Zeilen, {args.axes} Achsen)")
+
+        # Nur die Statistik, Daten schon im Speicher
+        t0 = time.perf_counter()
+        for k in range(args.axes):
+            old_statistics(data[:, k])
+        t_stat_old = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        calculate_statistics(data)
+        t_stat_new = time.perf_counter() - t0
+        print(f"Nur Statistik: alt {t_stat_old * 1e3:.0f} ms, neu {t_stat_new * 1e3:.0f} ms")
+    finally:
+        shutil.rmtree(tmp)
+
+if __name__ == "__main__":
+    main()
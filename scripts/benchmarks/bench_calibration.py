@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Kalibrierregler in calibration.py ohne Geräte
+
+Spielt --runs Kalibrierungen mit zufälligem wahren Antennen-Delay gegen
+das Modell des Simulators durch (Fehler = Steigung · (Delay - wahrer
+Delay) + Rauschen, --rate Distanzen pro Sekunde). Verglichen werden der
+bisherige Ablauf (Schritt 2 · Fehler, volle --duration) und Regression
+mit vorzeitigem Fensterende: Durchläufe, Messzeit und wie oft der finale
+Delay tatsächlich außerhalb der Toleranz liegt.
+
+Beispiel:
+    python benchmarks/bench_calibration.py --runs 500 --noise 3
+"""
+import argparse
+import random
+import sys
+from pathlib import Path
+from statistics import NormalDist, fmean
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from calibration import POLL_INTERVAL, next_delay, window_decided
+from uwb.sim import CM_PER_DELAY_UNIT, DEFAULT_ANT_DELAY
+
+TARGET = 200.0
+SLOPE = -CM_PER_DELAY_UNIT / 2      # cm pro Delay-Einheit wie im Simulator
+
+def window(rng, error, args, z):
+    """Eine Messung: (Distanzen, Messzeit) bis zum Fensterende bzw. vorzeitigen Abbruch."""
+    distances, t = [], 0.0
+    per_poll = args.rate * POLL_INTERVAL
+    while t < args.duration:
+        distances.extend(round(TARGET + error + rng.gauss(0.0, args.noise)) for _ in range(round(per_poll)))
+        t += POLL_INTERVAL
+        if z is not None and window_decided(distances, TARGET, args.tolerance, z):
+            break
+    return distances, min(t, args.duration)
+
+def calibrate(rng, true_delay, controller, z, args):
+    delay, delays, errors, measured = DEFAULT_ANT_DELAY, [], [], 0.0
+    for iteration in range(1, args.max_iterations + 1):
+        distances, dt = window(rng, SLOPE * (delay - true_delay), args, z)
+        measured += dt
+        error = fmean(distances) - TARGET
+        delays.append(delay)
+        errors.append(error)
+        if abs(error) <= args.tolerance:
+            break
+        delay = next_delay(delays, errors, controller)
+    true_error = abs(SLOPE * (delay - true_delay))
+    return iteration, measured, true_error > args.tolerance
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Kalibrierregler")
+    parser.add_argument("--runs", type=int, default=300)
+    parser.add_argument("--duration", type=float, default=10.0, help="Maximale Messdauer pro Durchlauf [s]")
+    parser.add_argument("--rate", type=float, default=10.0, help="Distanzen pro Sekunde")
+    parser.add_argument("--noise", type=float, default=3.0, help="Rauschen [cm]")
+    parser.add_argument("--tolerance", type=float, default=2.0)
+    parser.add_argument("--spread", type=int, default=150, help="Wahrer Delay um ±spread um den Startwert")
+    parser.add_argument("--max-iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    z = NormalDist().inv_cdf(0.995)
+    rng = random.Random(0)
+    truths = [DEFAULT_ANT_DELAY + rng.randint(-args.spread, args.spread) for _ in range(args.runs)]
+    for label, controller, zz in (("proportional, volles Fenster", "proportional", None),
+                                  ("proportional, vorzeitig", "proportional", z),
+                                  ("Regression, volles Fenster", "regression", None),
+                                  ("Regression, vorzeitig", "regression", z)):
+        rng = random.Random(1)
+        runs = [calibrate(rng, t, controller, zz, args) for t in truths]
+        iterations = fmean(r[0] for r in runs)
+        measured = fmean(r[1] for r in runs)
+        wrong = sum(r[2] for r in runs) / len(runs)
+        print(f"{label:<30} {iterations:5.2f} Durchläufe  {measured:6.1f} s Messzeit  "
+              f"{wrong:6.1%} außerhalb der Toleranz")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Befehls-Client (uwb/commands.py) gegen den Simulator
+
+Ablauf wie am Anfang eines Kalibrier-Durchlaufs: Zeilenende zum Aufwecken,
+STOP, RESTORE, vier CALKEYs und SAVE. Einmal Befehl für Befehl mit
+send(), einmal mit pipeline(). Nebenbei geprüft: leere Befehle liefern
+bei send() None bzw. bei pipeline() keine Antwort, alle übrigen werden
+quittiert.
+
+Beispiel:
+    python benchmarks/bench_commands.py --runs 200
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from statistics import median
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from uwb.commands import CommandClient
+from uwb.ports import open_port
+
+COMMANDS = ["", "STOP", "RESTORE"] + [f"CALKEY ant{ant}.ch5.ant_delay 16400" for ant in range(4)] + ["SAVE"]
+
+def check(client: CommandClient):
+    """Leere Befehle werden geschrieben, aber nicht quittiert."""
+    assert client.send("") is None
+    assert client.send("\n") is None
+    replies = client.pipeline(COMMANDS)
+    assert [r.command for r in replies] == [c for c in COMMANDS if c.strip()], replies
+    assert all(r.ok for r in replies), replies
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Befehls-Client")
+    parser.add_argument("--port", default="sim://?role=idle")
+    parser.add_argument("--runs", type=int, default=100)
+    args = parser.parse_args()
+
+    with open_port(args.port, timeout=0.05) as ser:
+        client = CommandClient(ser, "SIM")
+        check(client)
+        print("Leere Befehle: send() → None, pipeline() ohne Antwort – ok")
+
+        for name, run in (("send() einzeln", lambda: [client.send(c) for c in COMMANDS]),
+                          ("pipeline()", lambda: client.pipeline(COMMANDS))):
+            times = []
+            for _ in range(args.runs):
+                t0 = time.perf_counter()
+                run()
+                times.append(time.perf_counter() - t0)
+            print(f"{name:15s} {len(COMMANDS)} Befehle: Median {median(times) * 1e3:6.2f} ms, "
+                  f"max {max(times) * 1e3:6.2f} ms")
+        print(client.summary())
+
+if __name__ == "__main__":
+    main()
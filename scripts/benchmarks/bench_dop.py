@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: DOP-Karte (uwb/dop.py) aufbauen und je Fix nachschlagen
+
+Aufbau: PDOP für alle Zellen des Laborbereichs eines Layouts, einmal als
+Schleife mit np.linalg.inv je Zelle (auf --sample Zellen gemessen und
+hochgerechnet) und einmal vektorisiert über das ganze Raster.
+Betrieb: erwarteter Fehler für --fixes Positionen, je Fix direkt gerechnet
+gegen Nachschlagen in der fertigen Karte.
+
+Beispiel:
+    python benchmarks/bench_dop.py --layout lab3d --raster 10 5
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from uwb.config import load_area, load_layout
+from uwb.dop import DopMap, pdop
+
+def pdop_loop(anchors: np.ndarray, points: np.ndarray) -> np.ndarray:
+    out = np.empty(len(points))
+    for k, p in enumerate(points):
+        d = p - anchors
+        norm = np.linalg.norm(d, axis=1, keepdims=True)
+        u = np.divide(d, norm, out=np.zeros_like(d), where=norm > 0)
+        try:
+            out[k] = np.sqrt(np.trace(np.linalg.inv(u.T @ u)))
+        except np.linalg.LinAlgError:
+            out[k] = np.inf
+    return out
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DOP-Karte")
+    parser.add_argument("--layout", default="lab3d")
+    parser.add_argument("--dim", type=int, choices=[2, 3], default=3)
+    parser.add_argument("--raster", type=float, nargs="+", default=[10.0, 5.0], help="Rasterweiten in cm")
+    parser.add_argument("--sample", type=int, default=5000, help="Zellen für die Schleife")
+    parser.add_argument("--fixes", type=int, default=20_000)
+    args = parser.parse_args()
+
+    anchors = load_layout(args.layout, dim=args.dim)
+    area = load_area(args.layout)
+    a = np.array(list(anchors.values()))
+    rng = np.random.default_rng(1)
+
+    for raster in args.raster:
+        dop_map = DopMap(anchors, area, raster)
+        points = np.stack(np.meshgrid(*dop_map.axes, indexing="ij"), axis=-1).reshape(-1, dop_map.dim)
+        sample = points[rng.choice(len(points), min(args.sample, len(points)), replace=False)]
+        t0 = time.perf_counter()
+        ref = pdop_loop(a, sample)
+        loop = (time.perf_counter() - t0) / len(sample) * len(points)
+        t0 = time.perf_counter()
+        DopMap(anchors, area, raster)
+        vec = time.perf_counter() - t0
+        got = pdop(a, sample)
+        # Fast singuläre Zellen: inv() liefert riesige Werte, die Karte inf
+        ok = np.isfinite(ref) & np.isfinite(got)
+        err = np.max(np.abs(got[ok] - ref[ok]) / ref[ok])
+        print(f"Raster {raster:g} cm, {dop_map.cells} Zellen: Schleife {loop * 1e3:8.0f} ms (hochgerechnet), "
+              f"vektorisiert {vec * 1e3:6.1f} ms ({loop / vec:5.0f}x), max. rel. Abweichung {err:.1e}, "
+              f"{np.count_nonzero(~ok)} von {len(sample)} Stichproben unbestimmt")
+
+    dop_map = DopMap(anchors, area)
+    lo, hi = np.array(dop_map.lo), np.array([ax[-1] for ax in dop_map.axes])
+    fixes = lo + rng.random((args.fixes, dop_map.dim)) * (hi - lo)
+    t0 = time.perf_counter()
+    for p in fixes:
+        pdop(a, p)
+    direct = (time.perf_counter() - t0) / len(fixes)
+    t0 = time.perf_counter()
+    for p in fixes:
+        dop_map.lookup(p)
+    lookup = (time.perf_counter() - t0) / len(fixes)
+    print(f"Je Fix: direkt gerechnet {direct * 1e6:6.1f} µs, aus der Karte {lookup * 1e6:5.1f} µs "
+          f"({direct / lookup:.0f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: viele Tags einzeln gegen gemeinsam pro Tick (uwb/fleet.py)
+
+Erzeugt für --tags Tags je --ticks Frames (drei bzw. vier Anker abwechselnd,
+einzelne Ausreißer) und wertet sie aus wie bisher, ein Tracker und ein Fix
+pro Frame (triang3D.py mal Anzahl Tags), und mit `TagTable`: alle Frames
+eines Ticks einlesen, dann ein vektorisierter Schritt. Gemessen wird die
+Prozesszeit, ausgegeben Fixes pro Sekunde und Kern. Parsen ist in beiden
+Varianten enthalten.
+
+Beispiel:
+    python benchmarks/bench_fleet.py --tags 1 10 100 1000 --ticks 200
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from uwb.anchors import AnchorSet
+from uwb.fleet import TagTable
+from uwb.multilateration import Multilaterator
+from uwb.parsing import parse_distances
+from uwb.sim import format_session_info_ntf
+from uwb.tracking import Tracker
+
+ANCHORS = {2: [0.0, 0.0, 0.0], 3: [-100.0, -180.0, 80.0], 4: [220.0, -85.0, -80.0], 5: [300.0, 100.0, 150.0]}
+RATE = 50.0         # Frames pro Sekunde und Tag
+
+def make_frames(n_tags: int, n_ticks: int) -> list[list[bytes]]:
+    """Frames pro Tick, einer pro Tag."""
+    rng = np.random.default_rng(0)
+    anchors = {m: np.array(p) for m, p in ANCHORS.items()}
+    phase = rng.uniform(0, 2 * np.pi, n_tags)
+    ticks = []
+    for k in range(n_ticks):
+        t = k / RATE
+        pos = np.column_stack([150 + 80 * np.cos(t + phase), -60 + 80 * np.sin(t + phase),
+                               np.full(n_tags, -100.0)])
+        pos[rng.random(n_tags) < 0.02] += 400                           # Ausreißer
+        frames = []
+        for tag in range(n_tags):
+            macs = (2, 3, 4) if tag % 2 else (2, 3, 4, 5)
+            frames.append(format_session_info_ntf(k, [
+                (m, "SUCCESS", int(np.linalg.norm(pos[tag] - anchors[m]) + rng.normal(0, 3))) for m in macs
+            ]).encode())
+        ticks.append(frames)
+    return ticks
+
+def per_tag(ticks: list[list[bytes]]) -> int:
+    anchor_set, solver = AnchorSet(ANCHORS), Multilaterator(ANCHORS)
+    trackers = [Tracker(3, ANCHORS, mode="position") for _ in ticks[0]]
+    fixes = 0
+    for k, frames in enumerate(ticks):
+        for tracker, msg in zip(trackers, frames):
+            dists = parse_distances(msg, min_count=1) or {}
+            macs = sorted(m for m in dists if m in ANCHORS)
+            if len(macs) == 3:
+                pos = anchor_set.trilaterate(macs, [dists[m] for m in macs])
+            else:
+                pos = solver.solve(dists)
+            fixes += tracker.step(k / RATE, pos) is not None
+    return fixes
+
+def batched(ticks: list[list[bytes]]) -> int:
+    table = TagTable(ANCHORS, capacity=len(ticks[0]))
+    fixes = 0
+    for k, frames in enumerate(ticks):
+        for tag, msg in enumerate(frames):
+            table.ingest_frame(tag, k / RATE, msg)
+        fixes += table.step(k / RATE).count
+    return fixes
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Tracking vieler Tags")
+    parser.add_argument("--tags", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--ticks", type=int, default=200)
+    args = parser.parse_args()
+
+    for n in args.tags:
+        ticks = make_frames(n, args.ticks)
+        for label, fn in (("pro Tag", per_tag), ("pro Tick", batched)):
+            c0 = time.process_time()
+            fixes = fn(ticks)
+            cpu = time.process_time() - c0
+            print(f"{n:>5} Tags  {label:<9} {fixes:>7} Fixes  {cpu:6.2f} s CPU  "
+                  f"{fixes / cpu:>9.0f} Fixes/s pro Kern")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Microbenchmark: SESSION_INFO_NTF-Framing
+
+Spielt mitgeschnittene serielle Dumps (Rohbytes des Initiators) in Blöcken
+der Größe --chunk ab und vergleicht den alten String-Puffer aus
+reader_thread() mit `SessionFramer`. Ohne Datei wird ein synthetischer
+Dump erzeugt.
+
+Beispiel:
+    python benchmarks/bench_framer.py dump.bin --chunk 4096
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from uwb.framing import SessionFramer
+
+def synth_dump(n_frames: int) -> bytes:
+    """Erzeugt n_frames Nachrichten im Format der QM33-CLI mit etwas Rauschen dazwischen."""
+    out = []
+    for seq in range(n_frames):
+        meas = ";\n".join(
+            f' [mac_address=0x{mac:04x}, status="SUCCESS", distance[cm]={100 + (seq * mac) % 300}]'
+            for mac in (2, 3, 4)
+        )
+        out.append(f"SESSION_INFO_NTF: {{session_handle=1, sequence_number={seq}, "
+                   f"block_index={seq}, n_measurements=3\n{meas}}}\r\n")
+    return "".join(out).encode()
+
+def legacy_frames(chunks: list[bytes]) -> int:
+    """Der ursprüngliche Algorithmus aus reader_thread()."""
+    n = 0
+    buf = ""
+    for chunk in chunks:
+        data = chunk.decode(errors="ignore")
+        buf += data
+        while "SESSION_INFO_NTF" in buf and "}" in buf:
+            start = buf.find("SESSION_INFO_NTF")
+            end   = buf.find("}", start)
+            if end == -1:
+                break
+            msg = buf[start:end+1]
+            buf = buf[end+1:]
+            msg.replace("\n", " ")
+            n += 1
+    return n
+
+def framer_frames(chunks: list[bytes]) -> int:
+    """Neuer Pfad inkl. Dekodierung, wie ihn reader_thread() benutzt."""
+    framer = SessionFramer()
+    for chunk in chunks:
+        for frame in framer.feed(chunk):
+            str(frame, "utf-8", "ignore").replace("\n", " ")
+    return framer.frames
+
+def bench(fn, chunks: list[bytes], repeat: int) -> tuple[float, int]:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        n = fn(chunks)
+        best = min(best, time.perf_counter() - t0)
+    return best, n
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des SESSION_INFO_NTF-Framings")
+    parser.add_argument("dumps", nargs="*", help="Mitgeschnittene serielle Rohdaten")
+    parser.add_argument("--frames", type=int, default=20_000, help="Frames im synthetischen Dump (default: 20000)")
+    parser.add_argument("--chunk", type=int, nargs="+", default=[64, 1024, 65536],
+                        help="Blockgrößen der simulierten read()-Aufrufe")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.dumps:
+        data = b"".join(Path(p).read_bytes() for p in args.dumps)
+    else:
+        data = synth_dump(args.frames)
+    print(f"Dump: {len(data) / 1e6:.2f} MB")
+
+    for size in args.chunk:
+        chunks = [data[i:i + size] for i in range(0, len(data), size)]
+        t_old, n_old = bench(legacy_frames, chunks, args.repeat)
+        t_new, n_new = bench(framer_frames, chunks, args.repeat)
+        if n_old != n_new:
+            print(f"  [!] Unterschiedliche Frame-Anzahl: alt={n_old}, neu={n_new}")
+        print(f"chunk={size:>6} B   alt: {n_old / t_old:>10.0f} Frames/s   "
+              f"neu: {n_new / t_new:>10.0f} Frames/s   Faktor {t_old / t_new:5.1f}x")
+
+if __name__ == "__main__":
+    main()
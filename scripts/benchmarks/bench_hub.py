@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: SerialHub gegen einen Thread pro Modul
+
+Startet den Simulator mit --devices Pseudo-Terminals in einem eigenen
+Prozess; jedes Modul misst als Initiator mit --rate Hz. Gelesen wird
+einmal mit dem bisherigen Schema aus start_uwb.py (ein Thread pro Modul,
+blockierendes readline() mit 1 s Timeout) und einmal mit `SerialHub`.
+Gemessen werden Zeilen/s, CPU-Zeit dieses Prozesses, Threads und die
+Dauer bis alles gestoppt ist.
+
+Beispiel:
+    python benchmarks/bench_hub.py --devices 1 8 32 --rate 100
+"""
+import argparse
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import serial
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from uwb.hub import SerialHub
+
+INIT = "INITF -MULTI -ADDR=1 -PADDR=[2,3,4]"
+
+def legacy(ports: list[str], duration: float) -> tuple[int, float, int, float]:
+    """Ein Thread pro Modul wie bisher in start_uwb.py."""
+    stop = threading.Event()
+    count = [0]
+
+    def worker(port: str):
+        s = serial.Serial(port, 115200, timeout=1)
+        s.write(f"{INIT}\n".encode())
+        while not stop.is_set():
+            if s.readline().strip():
+                count[0] += 1
+        s.write(b"STOP\n")
+        s.close()
+
+    threads = [threading.Thread(target=worker, args=(p,)) for p in ports]
+    cpu0 = time.process_time()
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    n_threads = threading.active_count()
+    t0 = time.perf_counter()
+    stop.set()
+    for t in threads:
+        t.join()
+    return count[0], time.process_time() - cpu0, n_threads, time.perf_counter() - t0
+
+def hub(ports: list[str], duration: float) -> tuple[int, float, int, float]:
+    count = [0]
+
+    def consumer(i: int, line: str):
+        count[0] += 1
+
+    h = SerialHub(ports, [INIT] * len(ports), delay=0)
+    cpu0 = time.process_time()
+    h.start(consumer)
+    time.sleep(duration)
+    n_threads = threading.active_count()
+    t0 = time.perf_counter()
+    h.stop()
+    h.join()
+    return count[0], time.process_time() - cpu0, n_threads, time.perf_counter() - t0
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SerialHub gegen Thread pro Modul")
+    parser.add_argument("--devices", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--rate", type=float, default=100.0, help="Ranging-Rate pro Modul in Hz (default: 100)")
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+
+    for n in args.devices:
+        sim = subprocess.Popen([sys.executable, "-m", "uwb.sim", "--pty", str(n), "--rate", str(args.rate)],
+                               cwd=Path(__file__).resolve().parent.parent, stdout=subprocess.PIPE, text=True)
+        try:
+            ports = [sim.stdout.readline().split()[1] for _ in range(n)]
+            for label, fn in (("Thread/Modul", legacy), ("SerialHub", hub)):
+                lines, cpu, n_threads, shutdown = fn(ports, args.duration)
+                print(f"{n:>3} Module  {label:<13} {lines / args.duration:>8.0f} Zeilen/s   "
+                      f"CPU {cpu / args.duration:>6.1%}   {n_threads:>3} Threads   Stopp {shutdown * 1e3:>6.0f} ms")
+        finally:
+            sim.terminate()
+            sim.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Distanz-Parser
+
+Vergleicht die bisherigen Regexe (DIST_RE.findall in triang*.py, die
+Zeilen-Regexe von PlotDistProcessor/StatDistProcessor) mit `uwb.parsing`
+auf einem aufgezeichneten Log. Ohne Datei wird ein synthetischer Log mit
+--frames Nachrichten erzeugt.
+
+Beispiel:
+    python benchmarks/bench_parser.py log.txt
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from uwb.framing import SessionFramer
+from uwb.parsing import parse_distances, parse_line, parse_measurements, parse_records, to_records
+from bench_framer import synth_dump
+
+# Bisherige Muster, unverändert übernommen
+DIST_RE = re.compile(
+    r"\[mac_address=0x([0-9a-fA-F]+),\s*status=\"SUCCESS\",\s*distance\[cm\]=(\d+)\]"
+)
+PLOT_RE = re.compile(r'\[mac_address=(0x[0-9a-fA-F]+), status="SUCCESS", distance\[cm\]=(-?\d+)\]')
+STAT_RE = re.compile(r'\[mac_address=(0x[0-9a-fA-F]+),\s*status="SUCCESS",\s*distance\[cm\]=(-?\d+)\]')
+
+def legacy_parse_distances(frame: bytes) -> dict[int, float] | None:
+    # Bisher: reader_thread() dekodiert jeden Frame, danach findall auf str
+    msg = str(frame, "utf-8", "ignore").replace("\n", " ")
+    matches = DIST_RE.findall(msg)
+    if len(matches) < 3:
+        return None
+    return {int(mac, 16): float(dist) for mac, dist in matches}
+
+def legacy_line(pattern: re.Pattern):
+    """Match plus die Umwandlung, die die Processors danach selbst machen."""
+    def parse(line: str):
+        match = pattern.match(line)
+        if match:
+            mac, dist = match.groups()
+            return mac, int(dist)
+    return parse
+
+def bench(label: str, fn, items, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - t0)
+    print(f"{label:<45} {len(items) / best:>12.0f} /s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark der Distanz-Parser")
+    parser.add_argument("log", nargs="?", help="Aufgezeichneter serieller Log")
+    parser.add_argument("--frames", type=int, default=20_000, help="Nachrichten im synthetischen Log (default: 20000)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    data = Path(args.log).read_bytes() if args.log else synth_dump(args.frames)
+    frames = [bytes(f) for f in SessionFramer().feed(data)]
+    lines = [l.strip() for l in data.decode(errors="ignore").splitlines() if l.strip()]
+    blines = [l.encode() for l in lines]
+    print(f"{len(frames)} Nachrichten, {len(lines)} Zeilen")
+
+    print("-- Nachrichten (triang*.py)")
+    bench("alt: dekodieren + DIST_RE.findall auf str", legacy_parse_distances, frames, args.repeat)
+    bench("neu: parse_distances auf bytes", parse_distances, frames, args.repeat)
+    bench("neu: parse_measurements auf bytes", parse_measurements, frames, args.repeat)
+
+    print("-- Zeilen (start_uwb.py-Processors)")
+    bench("alt: PlotDistProcessor.pattern.match", legacy_line(PLOT_RE), lines, args.repeat)
+    bench("alt: StatDistProcessor.pattern.match", legacy_line(STAT_RE), lines, args.repeat)
+    bench("neu: parse_line auf str", parse_line, lines, args.repeat)
+    bench("neu: parse_line auf bytes", parse_line, blines, args.repeat)
+
+    print("-- Ganzer Log am Stück")
+    text = data.decode(errors="ignore")
+    t0 = time.perf_counter()
+    n_old = len(np.array([(int(mac, 16), float(d)) for mac, d in DIST_RE.findall(text)]))
+    t_old = time.perf_counter() - t0
+    t0 = time.perf_counter(); rec = to_records(parse_measurements(data)); t_tup = time.perf_counter() - t0
+    t0 = time.perf_counter(); rec = parse_records(data); t_new = time.perf_counter() - t0
+    print(f"{'alt: DIST_RE.findall + np.array':<45} {n_old / t_old:>12.0f} Messungen/s")
+    print(f"{'neu: parse_measurements + to_records':<45} {len(rec) / t_tup:>12.0f} Messungen/s")
+    print(f"{'neu: parse_records (strukturiertes Array)':<45} {len(rec) / t_new:>12.0f} Messungen/s")
+
+if __name__ == "__main__":
+    main()
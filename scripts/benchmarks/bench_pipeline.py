@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lasttest: ganze Pipeline gegen das simulierte DWM3001C
+
+Port -> reader_thread() -> Queue -> parse_distances() -> Multilaterator,
+wie in triang2D.py, nur ohne Plot. Gemessen werden empfangene Frames und
+Positionen pro Sekunde im Vergleich zur eingestellten Ranging-Rate sowie
+die Latenz vom Port bis zur Position. Mit --stall lässt sich eine langsame
+Auswertung nachstellen, um die Queue-Strategien zu vergleichen.
+Ohne --port wird ein sim://-Initiator mit --rate geöffnet.
+
+Beispiel:
+    python benchmarks/bench_pipeline.py --rate 200 --duration 5
+"""
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+from queue import Empty
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from uwb.framing import reader_thread
+from uwb.multilateration import Multilaterator
+from uwb.parsing import parse_distances
+from uwb.pipeline import QUEUE_POLICIES, LatencyStats, RingQueue
+from uwb.ports import open_port
+from uwb.sim import Scenario
+
+def main():
+    parser = argparse.ArgumentParser(description="Lasttest der Pipeline mit simuliertem Initiator")
+    parser.add_argument("--port", default=None, help="Port oder sim://-URL (default: simulierter Initiator)")
+    parser.add_argument("--rate", type=float, default=100.0, help="Ranging-Rate des Simulators in Hz (default: 100)")
+    parser.add_argument("--duration", type=float, default=5.0, help="Messdauer in s (default: 5)")
+    parser.add_argument("--dropout", type=float, default=0.01)
+    parser.add_argument("--queue", choices=QUEUE_POLICIES, default="drop-oldest")
+    parser.add_argument("--stall", type=float, default=0.0,
+                        help="Künstliche Verarbeitungszeit pro Frame in ms, um Rückstau zu erzeugen")
+    args = parser.parse_args()
+
+    port = args.port or f"sim://?role=initiator&air=bench&rate={args.rate}&dropout={args.dropout}"
+    solver = Multilaterator(Scenario().anchors)
+    latency = LatencyStats()
+    frames = fixes = 0
+    busy = 0.0
+    with open_port(port, 115_200, timeout=0.05) as ser:
+        running = threading.Event(); running.set()
+        q = RingQueue(64, args.queue)
+        t = threading.Thread(target=reader_thread, args=(ser, q, running, 0.05), daemon=True)
+        t.start()
+        start = time.perf_counter()
+        while time.perf_counter() - start < args.duration:
+            try:
+                t_rx, msg = q.get(timeout=0.2)
+            except Empty:
+                continue
+            t0 = time.perf_counter()
+            frames += 1
+            dists = parse_distances(msg)
+            if dists and solver.solve(dists) is not None:
+                fixes += 1
+                latency.add(time.monotonic() - t_rx)
+            busy += time.perf_counter() - t0
+            if args.stall:
+                time.sleep(args.stall / 1e3)
+        elapsed = time.perf_counter() - start
+        running.clear()
+        t.join(timeout=2)
+
+    print(f"Soll-Rate:      {args.rate:8.1f} Hz")
+    print(f"Frames:         {frames / elapsed:8.1f} /s")
+    print(f"Positionen:     {fixes / elapsed:8.1f} /s")
+    if frames:
+        print(f"Verarbeitung:   {busy / frames * 1e6:8.1f} µs pro Frame ({busy / elapsed:.1%} CPU im Hauptthread)")
+    print(latency.report(q))
+
+if __name__ == "__main__":
+    main()
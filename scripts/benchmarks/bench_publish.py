@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Positionen über lokale Sockets verteilen (uwb/publish.py)
+
+Startet --subscribers Abonnenten als eigene Prozesse und sendet ihnen über
+UDP (Loopback) und einen Unix-Datagramm-Socket Fixes, je Datagramm
+--batch Records. Zwei Durchläufe pro Transport und Batchgröße:
+- Durchsatz: --count Fixes so schnell wie möglich, Nachrichten pro
+  Sekunde beim Sender, Anteil, der bei den Abonnenten ankommt, und vom
+  Publisher verworfene Datagramme (Empfangspuffer voll);
+- Latenz: --rate Datagramme pro Sekunde, Zeit vom Senden (Zeitstempel im
+  Record) bis zum Empfang als Median/P99.
+
+Unix-Datagramm-Sockets puffern je Socket nur net.unix.max_dgram_qlen
+Datagramme (wird mit ausgegeben); im Durchsatz-Lauf kommen dort deshalb
+nicht alle Fixes an.
+
+Beispiel:
+    python benchmarks/bench_publish.py --subscribers 1 4 --batch 1 64
+"""
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from uwb.publish import FixPublisher, FixSubscriber
+
+RCVBUF = 4 << 20
+IDLE = 0.5          # s ohne Daten beendet einen Abonnenten
+QLEN = "/proc/sys/net/unix/max_dgram_qlen"
+
+def subscriber(address: str, ready, results):
+    latencies = []
+    with FixSubscriber(address, rcvbuf=RCVBUF) as sub:
+        sub.subscribe()
+        ready.set()
+        started = False
+        while True:
+            fixes = sub.recv(timeout=IDLE if started else 10.0)
+            now = time.monotonic()
+            if fixes is None:
+                break
+            started = True
+            latencies.append(now - fixes["t"])
+        lat = np.concatenate(latencies) if latencies else np.zeros(0)
+        results.put((sub.received, sub.lost, lat))
+
+def run(address: str, n_subs: int, batch: int, count: int, rate: float | None):
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    events = [ctx.Event() for _ in range(n_subs)]
+    with FixPublisher(address) as pub:
+        procs = [ctx.Process(target=subscriber, args=(address, e, results)) for e in events]
+        for p in procs:
+            p.start()
+        for e in events:
+            e.wait()
+        while len(pub.subscribers) < n_subs:
+            pub._poll()
+            time.sleep(0.01)
+
+        tags = np.arange(batch) % 16
+        pos = np.tile([150.0, -60.0, -100.0], (batch, 1))
+        quality = np.full(batch, 8.0)
+        n_dgrams = max(count // batch, 1)
+        t0 = time.perf_counter()
+        for k in range(n_dgrams):
+            if rate:
+                # gleichmäßig takten, sonst misst die Latenz nur die Warteschlange
+                time.sleep(max(k / rate - (time.perf_counter() - t0), 0.0))
+            pub.publish(tags, np.full(batch, time.monotonic()), pos, quality)
+        dt = time.perf_counter() - t0
+        dropped = pub.dropped / max(pub.datagrams + pub.dropped, 1)
+        out = [results.get() for _ in procs]
+        for p in procs:
+            p.join()
+    sent = n_dgrams * batch
+    received = sum(r[0] for r in out) / n_subs
+    lat = np.concatenate([r[2] for r in out]) * 1e3
+    return sent / dt, received / sent, dropped, lat
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Positions-Publisher")
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 64], help="Fixes pro Datagramm")
+    parser.add_argument("--count", type=int, default=200_000, help="Fixes im Durchsatz-Lauf")
+    parser.add_argument("--rate", type=float, default=1000.0, help="Datagramme pro Sekunde im Latenz-Lauf")
+    parser.add_argument("--latency-count", type=int, default=2000, help="Datagramme im Latenz-Lauf")
+    args = parser.parse_args()
+    try:
+        with open(QLEN) as f:
+            qlen = f.read().strip()
+    except OSError:
+        qlen = "?"
+    print(f"{os.cpu_count()} Kerne, net.unix.max_dgram_qlen = {qlen}")
+
+    unix = os.path.join(tempfile.gettempdir(), f"uwb-bench-{os.getpid()}.sock")
+    for address in ("udp://127.0.0.1:5599", f"unix://{unix}"):
+        transport = address.split(":", 1)[0]
+        for n_subs in args.subscribers:
+            for batch in args.batch:
+                msgs, delivered, dropped, _ = run(address, n_subs, batch, args.count, None)
+                _, _, _, lat = run(address, n_subs, batch, args.latency_count * batch, args.rate)
+                print(f"{transport:<4} {n_subs:>2} Abonnenten  {batch:>3} Fixes/Datagramm: "
+                      f"{msgs:>9.0f} Fixes/s gesendet, {delivered:6.1%} empfangen "
+                      f"({dropped:5.1%} vom Publisher verworfen), "
+                      f"Latenz Median {np.median(lat):6.3f} ms  P99 {np.percentile(lat, 99):6.3f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Textaufzeichnung gegen spaltenweise .npy-Aufzeichnung
+
+Erzeugt --frames simulierte SESSION_INFO_NTF-Frames (drei Anker) und
+schreibt sie einmal im Textformat von --record (uwb/replay.py) und einmal
+mit `ColumnarRecorder`. Verglichen werden Schreibzeit, Dateigröße und die
+Zeit, bis die Distanzen pro MAC als Arrays vorliegen (Text: read_replay()
++ parse_line() bzw. parse_records() über die ganze Datei; binär: Spalten
+per Memory-Mapping).
+
+Beispiel:
+    python benchmarks/bench_recording.py --frames 200000
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from uwb.parsing import STATUS_SUCCESS, parse_line, parse_records
+from uwb.recording import ColumnarRecorder, Recording
+from uwb.replay import LineRecorder, read_replay
+from uwb.sim import format_session_info_ntf
+
+def frames(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    dists = rng.normal([300, 340, 290], 5, size=(n, 3)).astype(int)
+    for seq in range(n):
+        status = "RX_TIMEOUT" if rng.random() < 0.02 else "SUCCESS"
+        yield seq * 0.01, format_session_info_ntf(seq, [(2, "SUCCESS", dists[seq, 0]),
+                                                       (3, status, None if status != "SUCCESS" else dists[seq, 1]),
+                                                       (4, "SUCCESS", dists[seq, 2])])
+
+def size(path: Path) -> int:
+    if path.is_dir():
+        return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+    return path.stat().st_size
+
+def per_mac(mac: np.ndarray, status: np.ndarray, dist: np.ndarray) -> dict[int, np.ndarray]:
+    ok = status == STATUS_SUCCESS
+    return {int(m): dist[ok & (mac == m)] for m in np.unique(mac)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Text- gegen .npy-Aufzeichnung")
+    parser.add_argument("--frames", type=int, default=100_000)
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp())
+    txt, npy = tmp / "rec.txt", tmp / "rec"
+    try:
+        data = [(t, msg.split("\r\n")) for t, msg in frames(args.frames)]
+
+        t0 = time.perf_counter()
+        rec = LineRecorder(txt)
+        for _, lines in data:
+            for line in lines:
+                if line.strip():
+                    rec.write(0, line.strip())
+        rec.close()
+        t_txt_write = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        with ColumnarRecorder(npy) as col:
+            for t, lines in data:
+                for line in lines:
+                    if line.strip():
+                        col.add_line(0, line, t)
+        t_npy_write = time.perf_counter() - t0
+
+        # Text zeilenweise wie start_uwb.py --replay
+        t0 = time.perf_counter()
+        rows = [m for _, _, line in read_replay(txt) if (m := parse_line(line))]
+        arr = np.array(rows)
+        text_lines = per_mac(arr[:, 0].astype(int), arr[:, 1].astype(int), arr[:, 2].astype(int))
+        t_lines = time.perf_counter() - t0
+
+        # Text am Stück, schnellster Text-Pfad
+        t0 = time.perf_counter()
+        recs = parse_records(txt.read_bytes())
+        text_bulk = per_mac(recs["mac"], recs["status"], recs["distance"])
+        t_bulk = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        r = Recording(npy)
+        binary = per_mac(r["mac"], r["status"], r["distance"])
+        t_mmap = time.perf_counter() - t0
+
+        for m in binary:
+            assert np.array_equal(binary[m], text_bulk[m]) and np.array_equal(binary[m], text_lines[m])
+
+        n = len(r)
+        print(f"{args.frames} Frames, {n} Messungen")
+        print(f"Schreiben:  Text {t_txt_write:6.2f} s   .npy {t_npy_write:6.2f} s")
+        print(f"Größe:      Text {size(txt) / 1e6:6.1f} MB  .npy {size(npy) / 1e6:6.1f} MB ({len(r.segments)} Segmente)")
+        print(f"Laden:      Text zeilenweise     {t_lines * 1e3:8.1f} ms")
+        print(f"            Text parse_records() {t_bulk * 1e3:8.1f} ms")
+        print(f"            .npy Memory-Mapping  {t_mmap * 1e3:8.1f} ms  ({t_bulk / t_mmap:.0f}x schneller)")
+    finally:
+        shutil.rmtree(tmp)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: analyze-triang.py alt gegen parallele Nachauswertung (uwb/reprocess.py)
+
+Schreibt ein Positionslog mit --lines Zeilen (Format von triang3D) und ein
+Rohlog mit --frames SESSION_INFO_NTF-Frames (drei Anker) und wertet beide
+aus: wie bisher (file.read() + ein re.findall, nur Positionslogs) und mit
+`reprocess()` für jede Prozesszahl aus --jobs. Ausgegeben werden Zeit,
+Speedup gegenüber einem Prozess und Effizienz pro Kern, außerdem der
+Spitzenspeicher (tracemalloc, eigener Durchlauf) von altem Skript und
+blockweisem Lesen mit einem Prozess.
+
+Beispiel:
+    python benchmarks/bench_reprocess.py --lines 4000000 --jobs 1 2 4 8
+"""
+import argparse
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from uwb.reprocess import reprocess
+from uwb.sim import format_session_info_ntf
+
+ANCHORS = {2: [0.0, 0.0, 0.0], 3: [-100.0, -180.0, 80.0], 4: [220.0, -85.0, -80.0]}
+
+def write_positions(path: Path, n: int):
+    rng = np.random.default_rng(0)
+    with open(path, "w") as f:
+        for start in range(0, n, 100_000):
+            block = rng.normal([180, 85, -80], [2, 5, 4], size=(min(100_000, n - start), 3))
+            f.writelines(f"12:00:00 [INFO] x={x:6.1f} cm   y={y:6.1f} cm   z={z:6.1f} cm\n"
+                         for x, y, z in block)
+
+def write_frames(path: Path, n: int):
+    rng = np.random.default_rng(1)
+    anchors = np.array(list(ANCHORS.values()))
+    r = np.linalg.norm(anchors - [150, -60, -100], axis=1)
+    dists = (r + rng.normal(0, 2, size=(n, 3))).astype(int)
+    with open(path, "w") as f:
+        f.writelines(format_session_info_ntf(seq, [(2, "SUCCESS", d[0]), (3, "SUCCESS", d[1]),
+                                                   (4, "SUCCESS", d[2])])
+                     for seq, d in enumerate(dists))
+
+def old(path: Path) -> np.ndarray:
+    with open(path, "r") as file:
+        log_data = file.read()
+    pattern = r"x=\s*(-?\d+\.?\d*)\s*cm\s*y=\s*(-?\d+\.?\d*)\s*cm\s*z=\s*(-?\d+\.?\d*)\s*cm"
+    return np.array(re.findall(pattern, log_data), dtype=np.float32)
+
+def peak(fn, *args, **kwargs) -> int:
+    tracemalloc.start()
+    fn(*args, **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallele Nachauswertung")
+    parser.add_argument("--lines", type=int, default=2_000_000, help="Zeilen im Positionslog")
+    parser.add_argument("--frames", type=int, default=300_000, help="Frames im Rohlog")
+    parser.add_argument("--jobs", type=int, nargs="+", default=sorted({1, 2, os.cpu_count() or 1}))
+    parser.add_argument("--chunk-mb", type=float, default=8)
+    args = parser.parse_args()
+    print(f"{os.cpu_count()} Kerne")
+
+    tmp = Path(tempfile.mkdtemp())
+    try:
+        pos_log, raw_log = tmp / "positions.log", tmp / "raw.log"
+        write_positions(pos_log, args.lines)
+        write_frames(raw_log, args.frames)
+
+        t0 = time.perf_counter()
+        ref = old(pos_log)
+        print(f"Positionslog {pos_log.stat().st_size / 1e6:.0f} MB, alt (read + re.findall): "
+              f"{time.perf_counter() - t0:6.2f} s")
+        print(f"Spitzenspeicher alt {peak(old, pos_log) / 1e6:.0f} MB, blockweise "
+              f"{peak(reprocess, [pos_log], jobs=1) / 1e6:.0f} MB")
+
+        for label, path in (("Positionslog", pos_log), (f"Rohlog {raw_log.stat().st_size / 1e6:.0f} MB", raw_log)):
+            base = None
+            for jobs in args.jobs:
+                t0 = time.perf_counter()
+                result, = reprocess([path], ANCHORS, jobs=jobs, chunk_bytes=int(args.chunk_mb * (1 << 20)))
+                dt = time.perf_counter() - t0
+                base = base or dt
+                if path == pos_log:
+                    assert result.moments.count == len(ref)
+                    assert np.allclose(result.moments.mean, ref.astype(float).mean(axis=0))
+                print(f"{label:<16} {jobs:>2} Prozesse: {dt:6.2f} s  Speedup {base / dt:4.1f}x  "
+                      f"Effizienz {base / dt / jobs:4.0%}  ({result.chunks} Chunks, {result.moments.count} Fixes)")
+    finally:
+        shutil.rmtree(tmp)
+
+if __name__ == "__main__":
+    main()
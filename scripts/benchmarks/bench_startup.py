@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Start von triang2D.py/triang3D.py mit Plot und im Kopfbetrieb
+
+Startet jedes Skript --runs-mal gegen einen simulierten Initiator, einmal
+mit Plot (Backend Agg, ein Fenster-Backend wie TkAgg kostet zusätzlich)
+und einmal mit --headless, und liest stdout (--sink -) bis zum ersten Fix.
+Gemessen werden die Zeit vom Prozessstart bis zum ersten Fix sowie
+RSS und Spitzen-RSS (VmRSS/VmHWM aus /proc, nur Linux) in diesem Moment,
+außerdem ob matplotlib im Prozess geladen ist.
+
+Beispiel:
+    python benchmarks/bench_startup.py --runs 5
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+from statistics import median
+
+SCRIPTS = Path(__file__).resolve().parent.parent
+PORT = "sim://?role=initiator&rate=50"
+
+def proc_status(pid: int) -> dict[str, int]:
+    """VmRSS und VmHWM in kB."""
+    out = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "VmHWM"):
+                out[key] = int(value.split()[0])
+    return out
+
+def matplotlib_loaded(pid: int) -> bool:
+    with open(f"/proc/{pid}/maps") as f:
+        return any("matplotlib" in line for line in f)
+
+def first_fix(script: str, headless: bool) -> tuple[float, dict[str, int], bool]:
+    cmd = [sys.executable, str(SCRIPTS / script), "--port", PORT, "--sink", "-"]
+    if headless:
+        cmd.append("--headless")
+    env = dict(os.environ, MPLBACKEND="Agg")
+    t0 = time.perf_counter()
+    p = subprocess.Popen(cmd, cwd=SCRIPTS, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                         text=True)
+    try:
+        p.stdout.readline()                 # CSV-Kopf
+        if not p.stdout.readline():
+            raise RuntimeError(f"{script}: kein Fix")
+        dt = time.perf_counter() - t0
+        return dt, proc_status(p.pid), matplotlib_loaded(p.pid)
+    finally:
+        p.send_signal(signal.SIGINT)
+        try:
+            p.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            p.kill()
+            p.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Start mit und ohne Plot")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    for script in ("triang2D.py", "triang3D.py"):
+        for label, headless in (("Plot (Agg)", False), ("--headless", True)):
+            runs = [first_fix(script, headless) for _ in range(args.runs)]
+            t = median(r[0] for r in runs)
+            rss = median(r[1]["VmRSS"] for r in runs) / 1024
+            hwm = median(r[1]["VmHWM"] for r in runs) / 1024
+            mpl = "ja" if runs[0][2] else "nein"
+            print(f"{script:<12} {label:<11} erster Fix nach {t:5.2f} s  RSS {rss:5.1f} MB  "
+                  f"Spitze {hwm:5.1f} MB  matplotlib geladen: {mpl}")
+
+if __name__ == "__main__":
+    main()
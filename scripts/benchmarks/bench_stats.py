@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Listen + statistics gegen StreamingStats (uwb/stats.py)
+
+Spielt --samples Distanzen pro MAC (drei MACs) ein, einmal wie bisher im
+`stat`-Processor (alles in Listen, Auswertung am Ende mit `statistics`)
+und einmal mit `StreamingStats`. Gemessen werden Speicher (tracemalloc),
+Zeit pro Wert, Zeit für die Auswertung und die Abweichung der Quantile.
+
+Beispiel:
+    python benchmarks/bench_stats.py --samples 1000000
+"""
+import argparse
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from uwb.stats import StreamingStats
+
+MACS = ("0x0002", "0x0003", "0x0004")
+
+def collect(samples: list[tuple[str, int]], streaming: bool) -> dict:
+    if streaming:
+        data = defaultdict(StreamingStats)
+        for mac, d in samples:
+            data[mac].add(d)
+    else:
+        data = defaultdict(list)
+        for mac, d in samples:
+            data[mac].append(d)
+    return data
+
+def run(samples: list[tuple[str, int]], streaming: bool):
+    # Speicher in einem eigenen Durchlauf, tracemalloc verfälscht die Zeit
+    tracemalloc.start()
+    collect(samples, streaming)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    t0 = time.perf_counter()
+    data = collect(samples, streaming)
+    t_add = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    if streaming:
+        result = {mac: (s.median, s.variance, s.quantiles) for mac, s in data.items()}
+    else:
+        result = {mac: (statistics.median(v), statistics.variance(v), statistics.quantiles(v))
+                  for mac, v in data.items()}
+    t_eval = time.perf_counter() - t0
+    return result, t_add, t_eval, peak
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Listen gegen StreamingStats")
+    parser.add_argument("--samples", type=int, default=300_000, help="Werte pro MAC (default: 300000)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    n = args.samples * len(MACS)
+    macs = rng.choice(MACS, n).tolist()
+    # Normalverteilt mit 5 % NLOS-Ausreißern
+    dists = (rng.normal(300, 3, n) + (rng.random(n) < 0.05) * rng.exponential(80, n)).astype(int).tolist()
+    samples = list(zip(macs, dists))
+
+    exact, *old = run(samples, streaming=False)
+    approx, *new = run(samples, streaming=True)
+    for label, (t_add, t_eval, peak) in (("Listen + statistics", old), ("StreamingStats", new)):
+        print(f"{label:<20} {t_add / n * 1e6:6.2f} µs/Wert   Auswertung {t_eval * 1e3:8.1f} ms   "
+              f"Speicher {peak / 1e6:7.1f} MB")
+    for mac in MACS:
+        (m0, v0, q0), (m1, v1, q1) = exact[mac], approx[mac]
+        err = max(abs(a - b) for a, b in zip(q0, q1))
+        print(f"{mac}: Median {m0} / {m1:.1f}, Varianz {v0:.2f} / {v1:.2f}, max. Quantilfehler {err:.2f} cm")
+
+if __name__ == "__main__":
+    main()
@@ -1,72 +1,138 @@
 import time
-import serial.tools.list_ports
-import re
+import csv
+import math
 import signal
 import sys
 import threading
 import argparse
-from statistics import mean
-import matplotlib.pyplot as plt
+from statistics import NormalDist, StatisticsError, fmean, linear_regression, mean, stdev
+from typing import NamedTuple
 
-SERIAL_NUMBERS = ["C208865F906F", "FAD4A05A59E7", "FA6D881A5AFC", "F07DD0297227"]
-ADDRS = [0x001, 0x002]
-
-ser1 = None
-ser2 = None
-running = True
-distance_values = []
-distance_lock = threading.Lock()
+from uwb.commands import CommandClient
+from uwb.config import BAUDRATE, find_devices
+from uwb.parsing import parse_distances
+from uwb.ports import open_port
 
-def find_devices():
-    ports = serial.tools.list_ports.comports()
-    return {p.serial_number: p.device for p in ports if p.serial_number in SERIAL_NUMBERS}
+ADDRS = [0x001, 0x002]
 
-def send_command(ser, cmd, delay=0.5):
+CONTROLLERS = ("regression", "proportional")
+MAX_STEP = 100              # größte Delay-Änderung pro Durchlauf
+DEFAULT_SLOPE = -0.5        # cm Fehler pro Delay-Einheit, solange keine Steigung geschätzt ist
+MIN_SLOPE = 0.05            # flachere (oder positive) Schätzungen sind Rauschen
+MIN_SAMPLES = 10            # so viele Distanzen, bevor ein Fenster vorzeitig enden darf
+MIN_SIGMA = 0.5             # cm, Auflösung der Distanzen als Untergrenze für die Streuung
+POLL_INTERVAL = 0.2         # s zwischen zwei Prüfungen des Messfensters
+
+running = threading.Event()
+open_ports = []
+
+def log_command(label, reply):
+    print(f"[→] {label}: {reply}")
+
+def open_device(port, label, device, timeout):
+    # Port samt Befehls-Client; sofort in open_ports, damit er bei jedem Abbruch geschlossen wird
+    ser = open_port(port, baudrate=BAUDRATE, timeout=0.2)
+    ser.label, ser.device = label, device
+    ser.client = CommandClient(ser, label, timeout=timeout, log=log_command)
+    open_ports.append(ser)
+    return ser
+
+def send_command(ser, cmd):
+    # Wartet auf die Quittung des Geräts statt einer festen Pause
     try:
-        if cmd.strip() != "":
-            print(f"[→] {ser.label}: {cmd}")
-        ser.write((cmd + '\r\n').encode())
-        time.sleep(delay)
-        return ser.read_all().decode(errors='ignore')
+        return ser.client.send(cmd)
     except Exception as e:
-        return f"[ERROR] {e}"
+        print(f"[ERROR] {ser.label}: {cmd}: {e}")
 
-def set_calkey(ser, ant, delay_value, channel):
-    send_command(ser, f"CALKEY ant{ant}.ch{channel}.ant_delay {delay_value}", 1)
+def set_calkeys(ser, delay_value, channel):
+    # Alle vier Antennen und SAVE in einem Rutsch, die CLI arbeitet sie der Reihe nach ab
+    ser.client.pipeline([f"CALKEY ant{ant}.ch{channel}.ant_delay {delay_value}" for ant in range(4)] + ["SAVE"])
 
 def graceful_exit(sig=None, frame=None):
-    global running
     print("\n[!] Abbruch erkannt. Sende STOP an Geräte ...")
-    running = False
-    if ser1:
-        send_command(ser1, "STOP")
-    if ser2:
-        send_command(ser2, "STOP")
+    running.clear()
+    for ser in open_ports:
+        send_command(ser, "STOP")
     sys.exit(0)
 
-def serial_logger(ser):
-    pattern = re.compile(r'distance\[cm\]=(\d+)')
-    while running:
-        try:
-            line = ser.readline().decode(errors='ignore').strip()
-            if line:
-                print(f"[{ser.label}] {line}")
-                match = pattern.search(line)
-                if match:
-                    dist = int(match.group(1))
-                    with distance_lock:
-                        distance_values.append(dist)
-        except Exception:
-            pass
-
-def plot_calibration_curve(delays, errors, final_delay, final_error):
-    data = sorted(zip(delays, errors))
-    delays_sorted, errors_sorted = zip(*data)
+# --------------------------------------------------------------------------- #
+#  Paare
+# --------------------------------------------------------------------------- #
+class CalibrationResult(NamedTuple):
+    device: str                 # kalibriertes Gerät (Responder)
+    initiator: str
+    channel: int
+    ant_delay: int | None       # None, wenn keine Messdaten kamen
+    error: float | None
+    iterations: int
+    delays: list[int]
+    errors: list[float]
+    measured: float = 0.0       # s tatsächlich gemessen
+    budget: float = 0.0         # s bei vollen Messfenstern
+
+    @property
+    def saved(self) -> float:
+        return self.budget - self.measured
+
+    @property
+    def ok(self) -> bool:
+        return self.ant_delay is not None
+
+class Pair:
+    """Initiator/Responder-Paar mit eigenen Ports, Adressen und eigenem Distanzpuffer."""
+
+    def __init__(self, name, initiator, responder, addrs, target_dist):
+        self.name = name
+        self.initiator = initiator
+        self.responder = responder
+        self.addrs = addrs
+        self.target_dist = target_dist
+        self.distances = []
+        self.lock = threading.Lock()
+        self.results = []
+
+    def log(self, msg):
+        if self.name:
+            body = msg.lstrip("\n")
+            msg = f"{msg[:len(msg) - len(body)]}[{self.name}] {body}"
+        print(msg)
+
+    def add_distance(self, dist):
+        with self.lock:
+            self.distances.append(dist)
+
+    def peek_distances(self):
+        with self.lock:
+            return list(self.distances)
+
+    def take_distances(self):
+        with self.lock:
+            distances, self.distances = self.distances, []
+        return distances
+
+def serial_logger(ser, pair):
+    # Liest über den Befehls-Client: Quittungen gehen an die wartenden Befehle, der Rest hierher
+    def on_line(line):
+        print(f"[{ser.label}] {line}")
+        # Nur SUCCESS-Messungen mit gültiger Distanz (uwb/parsing.py)
+        for dist in (parse_distances(line, min_count=1) or {}).values():
+            pair.add_distance(int(dist))
+    ser.client.start_reader(on_line)
+
+def plot_calibration_curve(results):
+    import matplotlib.pyplot as plt
 
     plt.figure(figsize=(10, 5))
-    plt.plot(delays_sorted, errors_sorted, marker='o', label='Messfehler')
-
-    plt.scatter(final_delay, final_error, color='red', zorder=5, label='Finaler Wert')
+    for r in results:
+        if not r.delays:
+            continue
+        data = sorted(zip(r.delays, r.errors))
+        delays_sorted, errors_sorted = zip(*data)
+        label = f"{r.device} ch{r.channel}" if len(results) > 1 else 'Messfehler'
+        plt.plot(delays_sorted, errors_sorted, marker='o', label=label)
+        if r.ok:
+            plt.scatter(r.ant_delay, r.error, color='red', zorder=5,
+                        label='Finaler Wert' if r is results[0] else None)
 
     plt.title("Kalibrierfehler vs. Antennen-Delay")
     plt.xlabel("ant_delay")
@@ -76,122 +142,294 @@ def plot_calibration_curve(delays, errors, final_delay, final_error):
     plt.tight_layout()
     plt.show()
 
-def calibrate_pair(initiator, responder, target_dist, duration, fixed_delay, tolerance, channel, plot):
+# --------------------------------------------------------------------------- #
+#  Regler
+# --------------------------------------------------------------------------- #
+def next_delay(delays, errors, controller="regression"):
+    """
+    Nächster Delay aus den bisherigen Durchläufen. "regression" passt
+    Fehler = a + b * Delay an alle Punkte an (bei zwei Punkten die Sekante)
+    und springt auf die Nullstelle; "proportional" ist der bisherige Schritt
+    2 * Fehler. Der Schritt ist auf ±MAX_STEP begrenzt.
+    """
+    current, error = delays[-1], errors[-1]
+    slope = DEFAULT_SLOPE
+    if controller == "regression" and len(set(delays)) >= 2:
+        try:
+            fitted, _ = linear_regression(delays, errors)
+        except StatisticsError:
+            fitted = 0.0
+        # Mehr Delay verkürzt die gemessene Distanz; alles andere ist Rauschen
+        if fitted <= -MIN_SLOPE:
+            slope = fitted
+    delta = round(-error / slope)
+    return current + max(-MAX_STEP, min(MAX_STEP, delta))
+
+def window_decided(distances, target_dist, tolerance, z):
+    """
+    Sequentieller Test für ein Messfenster: True, sobald das Konfidenzintervall
+    des mittleren Fehlers ganz innerhalb der Toleranz liegt, oder ganz außerhalb
+    und dabei schmaler als ±tolerance/2 (genau genug für den nächsten Schritt).
+    """
+    n = len(distances)
+    if n < MIN_SAMPLES:
+        return False
+    error = abs(fmean(distances) - target_dist)
+    half = z * max(stdev(distances), MIN_SIGMA) / math.sqrt(n)
+    return error + half <= tolerance or (error - half > tolerance and half <= tolerance / 2)
+
+def measure_window(pair, duration, tolerance, z):
+    """Wartet höchstens `duration` s; mit z (Quantil der Konfidenz) endet das Fenster vorzeitig."""
+    t0 = time.monotonic()
+    end = t0 + duration
+    while running.is_set():
+        now = time.monotonic()
+        if now >= end:
+            break
+        time.sleep(min(POLL_INTERVAL, end - now))
+        if z is not None and window_decided(pair.peek_distances(), pair.target_dist, tolerance, z):
+            break
+    return time.monotonic() - t0
+
+def calibrate_pair(pair, duration, fixed_delay, tolerance, channel, controller="regression", confidence=0.99):
+    initiator, responder = pair.initiator, pair.responder
     iteration = 1
     current_delay = fixed_delay
     delay_history = []
     error_history = []
+    measured = 0.0
+    z = NormalDist().inv_cdf((1 + confidence) / 2) if confidence else None
+
+    def result(ant_delay=None, error=None):
+        return CalibrationResult(responder.device, initiator.device, channel, ant_delay, error,
+                                 len(delay_history), delay_history, error_history,
+                                 measured, duration * len(delay_history))
 
     send_command(initiator, "\n")
     send_command(responder, "\n")
     send_command(initiator, "STOP")
     send_command(responder, "STOP")
-    time.sleep(2)
 
     send_command(initiator, "RESTORE")
     send_command(responder, "RESTORE")
 
-    for ant in range(4):
-        set_calkey(responder, ant, fixed_delay, channel)
-    send_command(responder, "SAVE")
+    set_calkeys(responder, fixed_delay, channel)
 
-    while True:
-        print(f"\n=== Kalibrier-Durchlauf {iteration} ===")
-        with distance_lock:
-            distance_values.clear()
+    while running.is_set():
+        pair.log(f"\n=== Kalibrier-Durchlauf {iteration} (Kanal {channel}) ===")
+        pair.take_distances()
 
-        send_command(responder, f"RESPF -ADDR={ADDRS[1]} -PADDR={ADDRS[0]} -CHAN={channel}")
-        send_command(initiator, f"INITF -ADDR={ADDRS[0]} -PADDR={ADDRS[1]} -CHAN={channel}")
+        send_command(responder, f"RESPF -ADDR={pair.addrs[1]} -PADDR={pair.addrs[0]} -CHAN={channel}")
+        send_command(initiator, f"INITF -ADDR={pair.addrs[0]} -PADDR={pair.addrs[1]} -CHAN={channel}")
 
-        print(f"[*] Messe für {duration} Sekunden ...")
-        time.sleep(duration)
+        pair.log(f"[*] Messe bis zu {duration} Sekunden ...")
+        elapsed = measure_window(pair, duration, tolerance, z)
+        measured += elapsed
 
         send_command(initiator, "STOP")
         send_command(responder, "STOP")
 
-        with distance_lock:
-            distances = distance_values.copy()
+        distances = pair.take_distances()
 
         if not distances:
-            print("Keine gültigen Messdaten empfangen.")
-            return
+            pair.log("Keine gültigen Messdaten empfangen.")
+            return result()
 
         avg = mean(distances)
-        error = avg - target_dist
+        error = avg - pair.target_dist
         delay_history.append(current_delay)
         error_history.append(error)
 
-        print(f"[=] Gemessener Abstand: {avg:.1f} cm")
-        print(f"[=] Fehler: {error:.1f} cm (Erlaubt: ±{tolerance} cm)")
+        pair.log(f"[=] Gemessener Abstand: {avg:.1f} cm ({len(distances)} Werte in {elapsed:.1f} s)")
+        pair.log(f"[=] Fehler: {error:.1f} cm (Erlaubt: ±{tolerance} cm)")
 
         if abs(error) <= tolerance:
-            print("[✓] Kalibrierung abgeschlossen – Fehler innerhalb der Toleranz.")
-            print(f"    ↪ Durchschnitt: {avg:.1f} cm")
-            print(f"    ↪ Fehler: {error:.1f} cm")
-            print(f"    ↪ Finaler ant_delay am Responder: {current_delay} (0x{current_delay:04X})")
-
-            if plot:
-                plot_calibration_curve(delay_history, error_history, current_delay, error)
-            return
+            pair.log("[✓] Kalibrierung abgeschlossen – Fehler innerhalb der Toleranz.")
+            pair.log(f"    ↪ Durchschnitt: {avg:.1f} cm")
+            pair.log(f"    ↪ Fehler: {error:.1f} cm")
+            pair.log(f"    ↪ Finaler ant_delay am Responder: {current_delay} (0x{current_delay:04X})")
+            pair.log(f"    ↪ Messzeit: {measured:.1f} s von {duration * iteration} s "
+                     f"({duration * iteration - measured:.1f} s gespart), {iteration} Durchläufe")
+            return result(current_delay, error)
 
-        delta = round(2 * error)
-        delta = max(-100, min(100, delta))
-        current_delay += delta
+        new_delay = next_delay(delay_history, error_history, controller)
+        delta = new_delay - current_delay
+        current_delay = new_delay
 
-        print(f"[~] Wende Korrektur an: delta={delta}, neuer Responder-Delay={current_delay} (0x{current_delay:04X})")
+        pair.log(f"[~] Wende Korrektur an: delta={delta}, neuer Responder-Delay={current_delay} (0x{current_delay:04X})")
 
-        for ant in range(4):
-            set_calkey(responder, ant, current_delay, channel)
-        send_command(responder, "SAVE")
+        set_calkeys(responder, current_delay, channel)
 
         iteration += 1
+    return result()
+
+def run_pair(pair, args):
+    """Kalibriert ein Paar nacheinander auf allen Kanälen; läuft in einem eigenen Thread."""
+    for channel in args.channel:
+        try:
+            pair.results.append(calibrate_pair(pair, args.duration, args.fixed_delay, args.tolerance,
+                                               channel, args.controller,
+                                               None if args.full_window else args.confidence))
+        except Exception as e:
+            pair.log(f"[!] Kalibrierung abgebrochen: {e}")
+            pair.results.append(CalibrationResult(pair.responder.device, pair.initiator.device,
+                                                  channel, None, None, 0, [], []))
+
+# --------------------------------------------------------------------------- #
+#  Bericht
+# --------------------------------------------------------------------------- #
+def print_report(results):
+    print("\n=== Kalibrierbericht ===")
+    print(f"{'Gerät':<24} {'Kanal':>5}  {'ant_delay':<16} {'Fehler':>9}  {'Durchläufe':>10}  "
+          f"{'Messzeit':>8}  {'gespart':>7}  Initiator")
+    for r in sorted(results, key=lambda r: (r.device, r.channel)):
+        if r.ok:
+            delay, error = f"{r.ant_delay} (0x{r.ant_delay:04X})", f"{r.error:+.1f} cm"
+        else:
+            delay, error = "–", "–"
+        print(f"{r.device:<24} {r.channel:>5}  {delay:<16} {error:>9}  {r.iterations:>10}  "
+              f"{r.measured:>6.1f} s  {r.saved:>5.1f} s  {r.initiator}")
+    budget, measured = sum(r.budget for r in results), sum(r.measured for r in results)
+    if budget:
+        print(f"Messzeit gesamt {measured:.1f} s von {budget:.1f} s ({budget - measured:.1f} s gespart)")
+
+def save_report(results, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Gerät", "Kanal", "ant_delay", "ant_delay_hex", "Fehler (cm)", "Durchläufe",
+                         "Messzeit (s)", "gespart (s)", "Initiator"])
+        for r in sorted(results, key=lambda r: (r.device, r.channel)):
+            writer.writerow([r.device, r.channel, r.ant_delay if r.ok else "",
+                             f"0x{r.ant_delay:04X}" if r.ok else "",
+                             f"{r.error:.2f}" if r.ok else "", r.iterations,
+                             f"{r.measured:.1f}", f"{r.saved:.1f}", r.initiator])
+    print(f"[=] Bericht gespeichert: {path}")
+
+# --------------------------------------------------------------------------- #
+#  Hauptprogramm
+# --------------------------------------------------------------------------- #
+def resolve_pairs(args):
+    """Liefert [(Initiator, Responder)] als (Gerätename, Port) aus --pair bzw. den Einzeloptionen."""
+    devices = None
+
+    def lookup(value):
+        nonlocal devices
+        if devices is None:
+            devices = find_devices()
+        # Seriennummer oder direkt ein Port bzw. eine sim://-URL
+        return (value, devices[value]) if value in devices else (value, value)
+
+    if args.pair:
+        return [(lookup(i), lookup(r)) for i, r in args.pair]
+
+    initiator_port = args.initiator_port
+    responder_port = args.responder_port
+    initiator_name, responder_name = args.initiator or initiator_port, responder_port
+    if initiator_port is None or responder_port is None:
+        devices = find_devices()
+        if initiator_port is None:
+            if args.initiator not in devices:
+                raise LookupError(f"[!] Initiator mit Seriennummer {args.initiator} nicht gefunden.")
+            initiator_port = devices[args.initiator]
+
+        if responder_port is None:
+            other_devices = [sn for sn in devices if sn != args.initiator and devices[sn] != initiator_port]
+            if not other_devices:
+                raise LookupError("Kein zweites Gerät für Responder gefunden.")
+            responder_name = other_devices[0]
+            responder_port = devices[responder_name]
+    return [((initiator_name, initiator_port), (responder_name, responder_port))]
 
 def main():
-    global ser1, ser2
     signal.signal(signal.SIGINT, graceful_exit)
 
     parser = argparse.ArgumentParser(description="UWB Kalibrierung per Serial")
-    parser.add_argument("--initiator", required=True, help="Seriennummer des Geräts, das Initiator ist")
-    parser.add_argument("--dist", type=int, default=200, help="Zielabstand in cm (default: 200)")
-    parser.add_argument("--duration", type=int, default=10, help="Messdauer in Sekunden (default: 10)")
+    parser.add_argument("--initiator", help="Seriennummer des Geräts, das Initiator ist")
+    parser.add_argument("--initiator-port", help="Port oder sim://-URL des Initiators statt --initiator")
+    parser.add_argument("--responder-port", help="Port oder sim://-URL des Responders (default: zweites gefundenes Gerät)")
+    parser.add_argument("--pair", nargs=2, action="append", metavar=("INIT", "RESP"),
+                        help="Paar aus Seriennummern, Ports oder sim://-URLs; mehrfach angeben, "
+                             "die Paare werden gleichzeitig kalibriert")
+    parser.add_argument("--dist", type=int, nargs="+", default=[200],
+                        help="Zielabstand in cm, einer für alle oder einer pro --pair (default: 200)")
+    parser.add_argument("--duration", type=int, default=10, help="Maximale Messdauer pro Durchlauf in Sekunden (default: 10)")
     parser.add_argument("--fixed_delay", type=lambda x: int(x, 0), default=0x4015, help="Fester Delay-Wert für Initiator (default: 0x4015)")
     parser.add_argument("--tolerance", type=float, default=2.0, help="Toleranzbereich in cm (default: ±2.0)")
-    parser.add_argument("--channel", type=int, default=9, choices=[5, 9], help="Kanal (5 oder 9) für Kalibrierung (default: 9)")
+    parser.add_argument("--channel", type=int, nargs="+", default=[9], choices=[5, 9],
+                        help="Kanal bzw. Kanäle (5, 9) für Kalibrierung, nacheinander (default: 9)")
+    parser.add_argument("--controller", choices=CONTROLLERS, default="regression",
+                        help="Delay-Schritt aus Regression über alle Durchläufe oder fest 2·Fehler (default: regression)")
+    parser.add_argument("--confidence", type=float, default=0.99,
+                        help="Konfidenz für das vorzeitige Ende eines Messfensters (default: 0.99)")
+    parser.add_argument("--full-window", action="store_true", help="Immer die volle --duration messen")
+    parser.add_argument("--timeout", type=float, default=1.0,
+                        help="Sekunden bis ein Befehl ohne Quittung als fehlgeschlagen gilt (default: 1.0)")
+    parser.add_argument("--report", default=None, metavar="CSV", help="Kalibrierbericht zusätzlich als CSV speichern")
     parser.add_argument("--plot", action="store_true", help="Zeige Plot der Kalibrierwerte")
 
     args = parser.parse_args()
+    if not 0 < args.confidence < 1:
+        parser.error("--confidence muss zwischen 0 und 1 liegen")
 
-    devices = find_devices()
-    if args.initiator not in devices:
-        print(f"[!] Initiator mit Seriennummer {args.initiator} nicht gefunden.")
-        return
-
-    other_devices = [sn for sn in devices if sn != args.initiator]
-    if not other_devices:
-        print("Kein zweites Gerät für Responder gefunden.")
+    try:
+        endpoints = resolve_pairs(args)
+    except LookupError as e:
+        print(e.args[0])
         return
-
-    initiator_port = devices[args.initiator]
-    responder_port = devices[other_devices[0]]
-
-    ser1 = serial.Serial(initiator_port, baudrate=115200, timeout=0.2)
-    ser2 = serial.Serial(responder_port, baudrate=115200, timeout=0.2)
-    ser1.label = "INIT"
-    ser2.label = "RESP"
-
-    threading.Thread(target=serial_logger, args=(ser1,), daemon=True).start()
-    threading.Thread(target=serial_logger, args=(ser2,), daemon=True).start()
-
-    with ser1, ser2:
-        calibrate_pair(
-            ser1, ser2,
-            args.dist,
-            args.duration,
-            args.fixed_delay,
-            args.tolerance,
-            args.channel,
-            args.plot
-        )
+    if len(args.dist) not in (1, len(endpoints)):
+        parser.error(f"--dist braucht einen Wert oder {len(endpoints)} (einen pro Paar)")
+    dists = args.dist * len(endpoints) if len(args.dist) == 1 else args.dist
+
+    # Unabhängig heißt: kein Gerät in zwei Paaren
+    ports = [port for pair in endpoints for _, port in pair]
+    shared = {p for p in ports if ports.count(p) > 1 and not p.startswith("sim://")}
+    if shared:
+        parser.error(f"Gerät in mehreren Paaren: {', '.join(sorted(shared))}")
+
+    running.set()
+    pairs = []
+    single = len(endpoints) == 1
+    try:
+        try:
+            for k, ((init_name, init_port), (resp_name, resp_port)) in enumerate(endpoints):
+                name = "" if single else f"P{k + 1}"
+                if not single and ports.count(resp_port) > 1:
+                    # Mehrere simulierte Geräte unter derselben URL: Paar im Namen
+                    init_name, resp_name = f"{init_name} [{name}]", f"{resp_name} [{name}]"
+                ser_i = open_device(init_port, "INIT" if single else f"{name}/INIT", init_name, args.timeout)
+                ser_r = open_device(resp_port, "RESP" if single else f"{name}/RESP", resp_name, args.timeout)
+                # Jedes Paar bekommt eigene Adressen, damit sich gleichzeitige Sessions nicht antworten
+                addrs = [ADDRS[0] + 2 * k, ADDRS[1] + 2 * k]
+                pair = Pair(name, ser_i, ser_r, addrs, dists[k])
+                pairs.append(pair)
+                serial_logger(ser_i, pair)
+                serial_logger(ser_r, pair)
+        except OSError as e:
+            # Bereits geöffnete Ports schließt das finally unten
+            print(f"[ERROR] {e}")
+            sys.exit(1)
+
+        workers = [threading.Thread(target=run_pair, args=(pair, args), daemon=True) for pair in pairs]
+        for t in workers:
+            t.start()
+        for t in workers:
+            while t.is_alive():
+                t.join(0.5)
+    finally:
+        running.clear()
+        for ser in open_ports:
+            ser.client.stop_reader()
+            ser.close()
+        for ser in open_ports:
+            if ser.client.history:
+                print(f"[i] {ser.label}: {ser.client.summary()}")
+
+    results = [r for pair in pairs for r in pair.results]
+    print_report(results)
+    if args.report:
+        save_report(results, args.report)
+    if args.plot:
+        plot_calibration_curve(results)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,35 +1,57 @@
-import csv
-import statistics
-from collections import defaultdict
+import argparse
+import sys
+from pathlib import Path
 
-def lese_csv_datei(pfad):
-    daten = defaultdict(list)
-    
-    with open(pfad, newline='') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for zeile in reader:
-            mac = zeile["MAC-Adresse"]
-            dist = int(zeile["Distanz (cm)"])
-            daten[mac].append(dist)
-    
-    return daten
+import numpy as np
+
+# gemeinsame Module aus scripts/uwb
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from uwb.archive import Archive, parse_csv
+from uwb.parsing import format_mac
+
+def lese_csv_datei(pfad, archiv=None):
+    archiv = archiv or Archive()
+    try:
+        run = archiv.find(pfad)
+    except KeyError:
+        # Datei außerhalb des Archivs: direkt parsen
+        daten = parse_csv(Path(pfad))
+        macs = daten["mac"]
+        return {format_mac(m): daten["distance"][macs == m] for m in np.unique(macs)}
+    return {format_mac(m): d for m, d in run.by_mac().items()}
 
 def berechne_statistiken(daten):
     for mac, dists in daten.items():
         print(f"\nStatistik für {mac}:")
         print(f"Anzahl Werte      : {len(dists)}")
-        print(f"Minimum           : {min(dists)} cm")
-        print(f"Maximum           : {max(dists)} cm")
-        print(f"Mittelwert        : {statistics.mean(dists):.2f} cm")
-        print(f"Median            : {statistics.median(dists)} cm")
+        print(f"Minimum           : {dists.min()} cm")
+        print(f"Maximum           : {dists.max()} cm")
+        print(f"Mittelwert        : {dists.mean():.2f} cm")
+        print(f"Median            : {np.median(dists)} cm")
         if len(dists) > 1:
-            print(f"Varianz           : {statistics.variance(dists):.2f}")
-            print(f"Standardabweichung: {statistics.stdev(dists):.2f}")
+            print(f"Varianz           : {dists.var(ddof=1):.2f}")
+            print(f"Standardabweichung: {dists.std(ddof=1):.2f}")
         if len(dists) >= 4:
-            q1, q2, q3 = statistics.quantiles(dists, n=4)
+            # "weibull" entspricht statistics.quantiles(method="exclusive")
+            q1, q3 = np.percentile(dists, [25, 75], method="weibull")
             print(f"1. Quartil (Q1)   : {q1}")
             print(f"3. Quartil (Q3)   : {q3}")
 
 if __name__ == "__main__":
-    daten = lese_csv_datei("messungen/messung14.csv")
-    berechne_statistiken(daten)
+    parser = argparse.ArgumentParser(description="Statistik einer Messreihe aus dem Messarchiv")
+    parser.add_argument("messreihe", nargs="?", default="unkalibriert/messung14.csv",
+                        help="CSV relativ zu messungen/ oder beliebiger Pfad (default: unkalibriert/messung14.csv)")
+    parser.add_argument("--soll", type=int, default=None, help="Statt einer Datei: Messreihe mit dieser Soll-Distanz in cm")
+    parser.add_argument("--unkalibriert", action="store_true", help="Mit --soll: unkalibrierte Messreihe wählen")
+    args = parser.parse_args()
+
+    archiv = Archive()
+    if args.soll is not None:
+        runs = archiv.select(nominal=args.soll, calibrated=not args.unkalibriert)
+        if not runs:
+            sys.exit(f"Keine Messreihe mit {args.soll} cm im Archiv")
+        pfad = runs[0].name
+    else:
+        pfad = args.messreihe
+    print(f"Messreihe: {pfad}")
+    berechne_statistiken(lese_csv_datei(pfad, archiv))
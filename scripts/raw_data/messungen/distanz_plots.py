@@ -1,36 +1,22 @@
-from os import path
 import statistics
-import pandas as pd
+import sys
+from pathlib import Path
 import matplotlib.pyplot as plt
 
-# key: distanz in cm
-#messungen = {
-#	200: "messung1.csv",
-#	100: "messung7.csv",
-#	50: "messung8.csv",
-#	30: "messung9.csv",
-#	20: "messung10.csv",
-#	250: "messung11.csv",
-#	300: "messung12.csv",
-#	400: "messung13.csv",
-#	2855: "messung14.csv"
-#}
-#
+# gemeinsame Module aus scripts/uwb
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from uwb.archive import Archive
 
-messungen = {
-	200: "kalibriert/messung_2m_kalibriert.csv",
-	400: "kalibriert/messung_4m_kalibriert.csv",
-	2855: "kalibriert/messung_2855cm_kalibriert.csv",
-}
+# key: distanz in cm, Zuordnung der Dateien steht in archiv.json
+# (unkalibrierte Messreihen: Archive().by_nominal(calibrated=False))
+messungen = Archive().by_nominal(calibrated=True)
 
 daten = {}
-for k, v in messungen.items():
+for k, run in messungen.items():
 	try:
-		df = pd.read_csv(v)
-		werte = df.iloc[:, 1]  # Nur zweite Spalte (gemessene Distanz)
-		daten[k] = werte
+		daten[k] = run.distances  # gemessene Distanz, per Memory-Mapping
 	except Exception as e:
-		print(f"Fehler beim Lesen von '{v}': {e}")
+		print(f"Fehler beim Lesen von '{run.name}': {e}")
 
 def strip():
 	import seaborn as sns
@@ -1,32 +1,24 @@
-import csv
+import sys
+from pathlib import Path
 import matplotlib.pyplot as plt
 
-# Pfade zu den CSV-Dateien mit den Soll-Distanzen
-messungen = {
-    200: "kalibriert/messung_2m_kalibriert.csv",
-    400: "kalibriert/messung_4m_kalibriert.csv",
-    2855: "kalibriert/messung_2855cm_kalibriert.csv",
-}
+# gemeinsame Module aus scripts/uwb
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from uwb.archive import Archive
 
-abweichungen = {}
+# Messreihen mit den Soll-Distanzen (Zuordnung in archiv.json)
+messungen = Archive().by_nominal(calibrated=True)
 
-# CSVs einlesen und Abweichungen berechnen
-for soll_distanz, pfad in messungen.items():
-    distanz_werte = []
+abweichungen = {}
 
-    with open(pfad, newline='') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            try:
-                distanz = float(row["Distanz (cm)"])
-                distanz_werte.append(distanz)
-            except ValueError:
-                continue  # Überspringe ungültige Werte
+# Messreihen laden (ungültige Zeilen sind beim Konvertieren schon entfernt) und Abweichungen berechnen
+for soll_distanz, run in messungen.items():
+    distanz_werte = run.distances
 
-    if not distanz_werte:
+    if not len(distanz_werte):
         continue
 
-    mittelwert = sum(distanz_werte) / len(distanz_werte)
+    mittelwert = distanz_werte.mean()
     abweichung = mittelwert - soll_distanz
     abweichungen[soll_distanz] = (abweichung, distanz_werte)
 
@@ -41,7 +33,7 @@ for idx, (soll, (abweichung, werte)) in enumerate(sorted(abweichungen.items())):
     ax = axs[idx]
     ax.hist(werte, bins=15, color='lightgreen', edgecolor='black')
     ax.axvline(soll, color='red', linestyle='--', label=f"Soll: {soll} cm")
-    ax.axvline(sum(werte)/len(werte), color='blue', linestyle='-', label=f"Mittelwert: {sum(werte)/len(werte):.2f} cm")
+    ax.axvline(werte.mean(), color='blue', linestyle='-', label=f"Mittelwert: {werte.mean():.2f} cm")
     ax.set_title(f"Messung für Soll-Distanz: {soll} cm\nAbweichung: {abweichung:+.2f} cm", fontsize=14)
     ax.set_xlabel("Gemessene Distanz (cm)", fontsize=12)
     ax.set_ylabel("Anzahl", fontsize=12)
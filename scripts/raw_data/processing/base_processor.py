@@ -32,5 +32,5 @@ class UWBProcessor(ABC):
 
 	@abstractmethod
 	def post_process(self):
-		"""Wird aufgerufen, nachdem alle Threads erfolgreich durch sind"""
+		"""Wird aufgerufen, nachdem der Hub alle Module gestoppt hat"""
 		pass
\ No newline at end of file
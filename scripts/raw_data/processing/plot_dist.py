@@ -1,10 +1,12 @@
 import threading
-import re
 from datetime import datetime
 from collections import defaultdict, deque
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 
+from uwb.parsing import STATUS_SUCCESS, format_mac, parse_line
+from uwb.render import BlitRenderer
+
 from .base_processor import UWBProcessor
 
 class PlotDistProcessor(UWBProcessor):
@@ -13,45 +15,71 @@ class PlotDistProcessor(UWBProcessor):
 
 	def __init__(self, args):
 		super().__init__(args)
-		self.pattern = re.compile(r'\[mac_address=(0x[0-9a-fA-F]+), status="SUCCESS", distance\[cm\]=(-?\d+)\]')
 		self.distance_history = defaultdict(lambda: deque(maxlen=args.max_points))
 		self.data_lock = threading.Lock()
 
+		self.lines = {}
+
 		self.fig, self.ax = plt.subplots()
+		self._setup_axes()
+		self.renderer = BlitRenderer(self.fig, fps=args.fps)
 		plt.ion()
 		plt.show()
 
+	def _setup_axes(self):
+		self.ax.set_title("Distanz über Zeit")
+		self.ax.set_xlabel("Zeit")
+		self.ax.set_ylabel("Distanz (cm)")
+		self.ax.xaxis.set_major_locator(mdates.AutoDateLocator())
+		self.ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M:%S'))
+		self.ax.set_ylim(-20, self.args.max_y)
+
 	@classmethod
 	def cli(cls, parser):
 		parser.add_argument("--max_points", type=int, default=100)
 		parser.add_argument("--max_y", type=int, default=150)
+		parser.add_argument("--fps", type=float, default=20.0, help="Maximale Bildrate des Plots (default: 20)")
 
 	def on_data(self, i: int, line: str):
-		match = self.pattern.match(line)
-		if match:
-			mac, dist = match.groups()
+		m = parse_line(line)
+		if m and m[1] == STATUS_SUCCESS:
+			mac, dist = format_mac(m[0]), m[2]
 			#if mac == "0x0001": return
 			with self.data_lock:
-				self.distance_history[mac].append((datetime.now(), int(dist)))
+				self.distance_history[mac].append((datetime.now(), dist))
+			self.renderer.submit()
 			print(f"[{i}] MAC={mac}, Distance={dist} cm")
 	
 	def main(self):
-		self.ax.clear()
-		self.ax.set_title("Distanz über Zeit")
-		self.ax.set_xlabel("Zeit")
-		self.ax.set_ylabel("Distanz (cm)")
-		self.ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M:%S'))
-		self.ax.set_ylim(-20, self.args.max_y)
+		# Höchstens fps Bilder pro Sekunde; alles dazwischen landet im nächsten Bild
+		self.renderer.wait()
+		if not self.renderer.pending:
+			self.renderer.poll()
+			return
 
+		full = False
+		t_min = t_max = None
 		with self.data_lock:
 			for mac, data in self.distance_history.items():
+				line = self.lines.get(mac)
+				if line is None:
+					line, = self.ax.plot([], [], label=mac)
+					self.lines[mac] = self.renderer.add(line)
+					full = True
 				times, dists = zip(*data)
-				self.ax.plot(times, dists, label=mac)
+				x = mdates.date2num(times)
+				line.set_data(x, dists)
+				t_min = x[0] if t_min is None else min(t_min, x[0])
+				t_max = x[-1] if t_max is None else max(t_max, x[-1])
 
-		self.ax.legend()
-		self.fig.autofmt_xdate()
-		self.fig.canvas.draw()
-		self.fig.canvas.flush_events()
+		# Hintergrund nur neu zeichnen, wenn die Zeitachse weiterlaufen muss oder eine MAC dazukommt
+		if t_max is not None and (full or t_max > self.ax.get_xlim()[1]):
+			span = max(t_max - t_min, 1 / 86400)
+			self.ax.set_xlim(t_min, t_max + 0.5 * span)
+			self.ax.legend()
+			self.fig.autofmt_xdate()
+			full = True
+		self.renderer.render(full)
 
 	def post_process(self):
-		...
\ No newline at end of file
+		print(f"[PLOT] {self.renderer.report()}")
\ No newline at end of file
@@ -1,11 +1,12 @@
 from collections import defaultdict
 import csv
-import re
 import sys
 import time
-import statistics
 import matplotlib.pyplot as plt
 
+from uwb.parsing import STATUS_SUCCESS, format_mac, parse_line
+from uwb.stats import StreamingStats
+
 from .base_processor import UWBProcessor
 
 class StatDistProcessor(UWBProcessor):
@@ -14,15 +15,20 @@ class StatDistProcessor(UWBProcessor):
 
 	def __init__(self, args):
 		self.args = args
-		self.dists: dict[str, list] = defaultdict(lambda: [])
-		self.pattern = re.compile(r'\[mac_address=(0x[0-9a-fA-F]+),\s*status="SUCCESS",\s*distance\[cm\]=(-?\d+)\]')
+		# Laufende Statistik pro MAC mit konstantem Speicher
+		self.stats: dict[str, StreamingStats] = defaultdict(StreamingStats)
+		# Einzelwerte nur, wenn sie mit --save gespeichert werden sollen
+		self.dists: dict[str, list] | None = defaultdict(list) if args.save else None
 		self.start_time = None
 		self.timeout = args.time
+		self.interval = args.interval
+		self.next_snapshot = None
 
 	@classmethod
 	def cli(cls, parser) -> None:
 		parser.add_argument("--time", type=int, default=0)
 		parser.add_argument("--save", type=str, default=None)
+		parser.add_argument("--interval", type=float, default=10, help="Zwischenstand alle N Sekunden ausgeben, 0 = aus (default: 10)")
 
 	
 	def on_data(self, i: int, line: str):
@@ -34,18 +40,30 @@ class StatDistProcessor(UWBProcessor):
 			print("Messzeit abgelaufen.")
 			sys.exit(0)  # stop execution
 
-		match = self.pattern.match(line)
-		if match:
-			mac, dist = match.groups()
+		m = parse_line(line)
+		if m and m[1] == STATUS_SUCCESS:
+			mac, dist = format_mac(m[0]), m[2]
 			if mac == "0x0001": return # wenn du keine data kriegst kann es daran liegen
-			self.dists[mac].append(int(dist))
+			self.stats[mac].add(dist)
+			if self.dists is not None:
+				self.dists[mac].append(dist)
 		print(line)
 
 	def main(self):
 		time.sleep(1)
+		if self.interval <= 0 or not self.stats:
+			return
+		now = time.time()
+		if self.next_snapshot is None:
+			self.next_snapshot = now + self.interval
+		elif now >= self.next_snapshot:
+			self.next_snapshot = now + self.interval
+			print(f"Zwischenstand nach {now - self.start_time:.0f} s:")
+			for mac, s in list(self.stats.items()):
+				print(f"  {mac}: {s.summary()}")
 
 	def post_process(self):
-		if not self.dists:
+		if not self.stats:
 			print("Keine Daten vorhanden.")
 			return
 		
@@ -58,24 +76,13 @@ class StatDistProcessor(UWBProcessor):
 					for dist in dist_list:
 						writer.writerow([mac, dist])
 
-		stats = {k: {
-			"median": statistics.median(v),
-			"variance": statistics.variance(v) if len(v) > 1 else 0,
-			"quartile": statistics.quantiles(v) if len(v) >= 4 else []
-		} for k, v in self.dists.items()}
-		
-
 		print("Statistiken pro MAC-Adresse:")
-		for mac, s in stats.items():
-			print(f"{mac}: Median = {s['median']}, Varianz = {s['variance']}, Quartile = {s['quartile']}")
-
-		# Vorbereitung der Daten für Boxplot
-		macs = list(self.dists.keys())
-		data = [self.dists[mac] for mac in macs]
+		for mac, s in self.stats.items():
+			print(f"{mac}: {s.summary()}")
 
-		# Boxplot erzeugen
+		# Boxplot aus den laufenden Kennwerten, ohne Einzelwerte
 		plt.figure(figsize=(10, 5))
-		plt.boxplot(data, labels=macs, showmeans=True)
+		plt.gca().bxp([s.boxplot_stats(mac) for mac, s in self.stats.items()], showmeans=True)
 		plt.xlabel("MAC-Adresse")
 		plt.ylabel("Distanz (cm)")
 		plt.title("Boxplot der Distanzen pro MAC-Adresse")
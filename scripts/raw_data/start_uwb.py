@@ -1,88 +1,106 @@
 import argparse
-import time
-import serial
+import sys
 import threading
-import serial.tools.list_ports
+from pathlib import Path
 
-serial_nrs = ["C208865F906F", "FAD4A05A59E7", "FA6D881A5AFC", "F07DD0297227"]
-ports = serial.tools.list_ports.comports()
-print([port.serial_number for port in ports if port.serial_number])
-devices = [port.device for port in ports if port.serial_number in serial_nrs]
+# gemeinsame Module aus scripts/uwb
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+devices: list[str] = []
 stop_event = threading.Event()
+recorder = None
+columns = None
+hub = None
 
 from processing import *
+from uwb import config
+from uwb.hub import SerialHub
+from uwb.recording import ColumnarRecorder
+from uwb.replay import LineRecorder, replay
+
+def find_devices() -> list[str]:
+	found = config.find_devices()
+	print(list(found))
+	return list(found.values())
 
 def get_processors() -> list[UWBProcessor]:
 	return [PlotDistProcessor, LogProcessor, StatDistProcessor]
 
-def start(command: str | None, baud: int = 115200, timeout: int = 1):
-	threads = start_threads(command, baud, timeout)
+def start(command: str | None, baud: int = config.BAUDRATE):
+	global hub
+	print(f"[GLOBAL] UWB Geräte: {devices}")
+	if len(devices) == 0:
+		print(f"[GLOBAL] Keine UWB Geräte erkannt. Abbruch.")
+		run([])
+		return
 
+	# Alle Module auf einer Eventloop in einem Thread, statt ein Thread pro Modul
+	print("[GLOBAL] Starte Hub")
+	commands = [device_command(command, i) for i in range(len(devices))]
+	hub = SerialHub(devices, commands, baudrate=baud, delay=args.delay)
+	hub.start(on_line)
+	run([hub])
+	if not any(hub.opened):
+		print("[GLOBAL] Kein Gerät ließ sich öffnen. Abbruch.")
+		sys.exit(1)
+
+def start_replay(path: str, speed: float):
+	print(f"[REPLAY] Spiele {path} ab ({'so schnell wie möglich' if speed <= 0 else f'{speed}x Echtzeit'})")
+	t = threading.Thread(target=replay_serial, args=(path, speed))
+	t.start()
+	run([t])
+
+def run(workers: list):
 	try:
-		while any(t.is_alive() for t in threads) and not stop_event.is_set():
+		while any(w.is_alive() for w in workers) and not stop_event.is_set():
 			processor.main()
 	except KeyboardInterrupt:
 		print("[GLOBAL] Stoppe Threads")
 		stop_event.set()
-		for t in threads:
-			t.join()
 	finally:
+		if hub:
+			hub.stop()
+		for w in workers:
+			w.join()
 		processor.post_process()
 
-
-def start_threads(cmd: str, baud: int, timeout: int) -> list[threading.Thread]:
-	print(f"[GLOBAL] UWB Geräte: {devices}")
-	if len(devices) == 0:
-		print(f"[GLOBAL] Keine UWB Geräte erkannt. Abbruch.")
-		return
-
-	print("[GLOBAL] Starte Threads")
-	threads: list[threading.Thread] = []
-	for i in range(len(devices)):
-		t = threading.Thread(target=start_serial, args=(cmd, i, baud, timeout))
-		t.start()
-		threads.append(t)
-
-	return threads
-
-def start_serial(cmd: str | None, i: int, baud: int, timeout: int):
-	print(f"[{i}] Serielle Verbindung geöffnet.")
-	s = serial.Serial(devices[i], baudrate=baud, timeout=timeout)
-	time.sleep(args.delay)
+def device_command(cmd: str | None, i: int) -> str:
+	if cmd is not None:
+		return cmd
+	if i == 0:
+		return f"INITF -MULTI -ADDR=1 -PADDR=[{','.join([str(a) for a in range(2, len(devices)+1)])}] -CHAN={args.channel}"
+	return f"RESPF -MULTI -ADDR={i+1} -PADDR=1 -CHAN={args.channel}"
+
+def on_line(i: int, line: str):
+	if recorder:
+		recorder.write(i, line)
+	if columns:
+		columns.add_line(i, line)
+	processor.on_data(i, line)
+
+def replay_serial(path: str, speed: float):
 	try:
-		if (cmd == None):
-			init_command = f"INITF -MULTI -ADDR=1 -PADDR=[{','.join([str(a) for a in range(2, len(devices)+1)])}] -CHAN={args.channel}"
-			resp_command = f"RESPF -MULTI -ADDR={i+1} -PADDR=1 -CHAN={args.channel}"
-			command = init_command if i == 0 else resp_command
-		else:
-			command = cmd
-		print(f"[{i}] Schicke Befehl: {command}")
-		s.write(f"{command}\n".encode('utf-8'))
-		time.sleep(args.delay)
-		while not stop_event.is_set():
-			line = s.readline().decode('utf-8', errors='ignore').strip()
-			if not line:
-				continue
-
-			processor.on_data(i, line)
-		print(f"[{i}] Stoppe Schnittstelle")
+		n, elapsed = replay(path, processor.on_data, speed, stop_event)
 	except Exception as err:
-		print(f"[{i}] Fehler: {err}")
-	finally:
-		print(f"[{i}] Schicke Befehl: STOP")
-		s.write(f"STOP\n".encode('utf-8'))
-		time.sleep(args.delay)
-		s.close()
+		print(f"[REPLAY] Fehler: {err}")
+		return
+	rate = n / elapsed if elapsed > 0 else float("inf")
+	print(f"[REPLAY] {n} Zeilen in {elapsed:.2f} s ({rate:.0f} Zeilen/s)")
 
 
 if __name__ == '__main__':
 	parser = argparse.ArgumentParser()
-	parser.add_argument('--baud', type=int, default=115200)
-	parser.add_argument('--timeout', type=int, default=1)
+	parser.add_argument('--baud', type=int, default=config.BAUDRATE)
+	parser.add_argument('--timeout', type=int, default=1, help="Veraltet, ohne Wirkung (der Hub liest nicht blockierend)")
 	parser.add_argument("--cmd", type=str, default=None, help="Fester command der auf allen Modulen ausgeführt wird")
-	parser.add_argument("--delay", type=float, default=0.5)
+	parser.add_argument("--delay", type=float, default=0.5, help="Sekunden bis eine fehlende Quittung des Startbefehls gemeldet wird (default: 0.5)")
 	parser.add_argument("--channel", type=int, default=9, choices=[5, 9], help="Kanal (5 oder 9, default: 9)")
 	parser.add_argument("--remote-responders", type=str, default=None, help="Liste der Responder. Benutze diese Option wenn du nur ein Initator Modul angeschlossen hast. Beispiel: '[2,3,4]'")
+	parser.add_argument("--replay", type=str, default=None, metavar="FILE", help="Spielt eine Aufzeichnung ab statt serielle Geräte zu öffnen")
+	parser.add_argument("--replay-speed", type=float, default=1.0, help="1 = Originalzeiten, 0 = so schnell wie möglich (default: 1)")
+	parser.add_argument("--port", action="append", default=None, help="Port oder sim://-URL statt der Gerätesuche, mehrfach nutzbar (erster = Initiator)")
+	parser.add_argument("--record", type=str, default=None, metavar="FILE", help="Zeichnet alle empfangenen Zeilen mit Zeitstempel für --replay auf")
+	parser.add_argument("--record-npy", type=str, default=None, metavar="DIR", help="Zeichnet alle Messungen spaltenweise als .npy-Segmente auf (siehe uwb/recording.py)")
 
 	subparsers = parser.add_subparsers(title="processor", dest="command", required=True)
 
@@ -93,14 +111,28 @@ if __name__ == '__main__':
 	processor: UWBProcessor = args.processor_class(args)
 
 	try:
-		if args.cmd:
-			command = args.cmd
+		if args.replay:
+			start_replay(args.replay, args.replay_speed)
 		else:
-			if args.remote_responders is None:
-				command = None
+			devices = args.port or find_devices()
+			if args.record:
+				recorder = LineRecorder(args.record)
+			if args.record_npy:
+				columns = ColumnarRecorder(args.record_npy)
+			if args.cmd:
+				command = args.cmd
 			else:
-				command = f"INITF -MULTI -ADDR=1 -PADDR={args.remote_responders}"
-		start(command=command, baud=args.baud, timeout=args.timeout)
+				if args.remote_responders is None:
+					command = None
+				else:
+					command = f"INITF -MULTI -ADDR=1 -PADDR={args.remote_responders}"
+			start(command=command, baud=args.baud)
 	except KeyboardInterrupt:
 		print("[GLOBAL] Tastaturabbruch erkannt")
-		stop_event.set()
\ No newline at end of file
+		stop_event.set()
+	finally:
+		if recorder:
+			recorder.close()
+		if columns:
+			columns.close()
+			print(f"[GLOBAL] {columns.rows} Messungen in {args.record_npy} gespeichert")
\ No newline at end of file
@@ -1,20 +1,30 @@
 import threading
 import time
-import serial.tools.list_ports
 import argparse
 
-BAUDRATE = 115200
+from uwb.commands import CommandClient
+from uwb.config import BAUDRATE, find_devices
+from uwb.ports import open_port
 
-serial_nrs = ["C208865F906F", "FAD4A05A59E7", "FA6D881A5AFC", "F07DD0297227"]
-ports = serial.tools.list_ports.comports()
-print(f"connected devices: {[port.serial_number for port in ports if port.serial_number]}")
-devices = { port.serial_number: port.device for port in ports if port.serial_number in serial_nrs }
+devices: dict[str, str] = {}
 stop_event = threading.Event()
 
-def send_command(ser: serial.Serial, cmd: str):
-	ser.write(f"{cmd}\n".encode())
-	time.sleep(0.1)
-	print(f"OUTPUT: {ser.read_all().decode().strip()}")
+def log_reply(label, reply):
+	print(f"OUTPUT: {label}: {reply}")
+	for line in reply.lines:
+		print(f"OUTPUT: {label}:   {line}")
+
+def provision(serial_nr: str, app: str, command: str):
+	# Auf Quittungen warten statt fester Pausen; STOP und SETAPP bzw. STOP und SAVE gehen gemeinsam raus
+	t0 = time.monotonic()
+	with open_port(devices[serial_nr], BAUDRATE, timeout=0.05) as ser:
+		client = CommandClient(ser, serial_nr, timeout=args.timeout, log=log_reply)
+		client.pipeline(["STOP", f"SETAPP {app}"])
+		client.send(command)
+		client.pipeline(["STOP", "SAVE"])
+	failed = [r for r in client.history if not r.ok]
+	status = "OK" if not failed else f"FEHLER bei {', '.join(r.command for r in failed)}"
+	print(f"INFO: {serial_nr} fertig in {(time.monotonic() - t0) * 1e3:.0f} ms ({client.summary()}) – {status}")
 
 def program_responder(serial_nr: str, id: int):
 	if serial_nr not in devices:
@@ -22,13 +32,7 @@ def program_responder(serial_nr: str, id: int):
 		return
 
 	print(f"INFO: Programming {serial_nr} as responder")
-	with serial.Serial(devices[serial_nr], BAUDRATE, timeout=0.5) as ser:
-		send_command(ser, "STOP")
-		send_command(ser, "SETAPP RESPF")
-		send_command(ser, f"RESPF -MULTI -ADDR={id} -PADDR=1 -CHAN={args.channel}")
-		time.sleep(0.5)
-		send_command(ser, "STOP")
-		send_command(ser, "SAVE")
+	provision(serial_nr, "RESPF", f"RESPF -MULTI -ADDR={id} -PADDR=1 -CHAN={args.channel}")
 
 def program_initiator(serial_nr: str, n_responder: int):
 	if serial_nr not in devices:
@@ -36,17 +40,17 @@ def program_initiator(serial_nr: str, n_responder: int):
 		return
 
 	print(f"INFO: Programming {serial_nr} as responder with {n_responder} responders")
-	with serial.Serial(devices[serial_nr], BAUDRATE, timeout=0.5) as ser:
-		send_command(ser, "STOP")
-		send_command(ser, "SETAPP INITF")
-		send_command(ser, f"INITF -MULTI -ADDR=1 -PADDR=[{','.join([str(a) for a in range(2, n_responder+2)])}] -CHAN={args.channel}")
-		time.sleep(0.5)
-		send_command(ser, "STOP")
-		send_command(ser, "SAVE")
+	provision(serial_nr, "INITF", f"INITF -MULTI -ADDR=1 -PADDR=[{','.join([str(a) for a in range(2, n_responder+2)])}] -CHAN={args.channel}")
 
 parser = argparse.ArgumentParser(description="Stellt die UWB Module für den Batteriebetrieb ein")
 parser.add_argument("--channel", type=int, default=9, choices=[5, 9], help="Kanal (5 oder 9, default: 9)")
+parser.add_argument("--port", action="append", default=[], metavar="SN=PORT", help="Port oder sim://-URL für eine Seriennummer vorgeben, mehrfach nutzbar")
+parser.add_argument("--timeout", type=float, default=1.0, help="Sekunden bis ein Befehl ohne Quittung als fehlgeschlagen gilt (default: 1.0)")
 args = parser.parse_args()
+# Ports erst nach dem Parsen abfragen, damit --help sofort antwortet
+devices.update(find_devices())
+print(f"connected devices: {list(devices)}")
+devices.update(p.split("=", 1) for p in args.port)
 
 responders = {
 	"FA6D881A5AFC": 2, # rot
@@ -54,8 +58,14 @@ responders = {
 	"FAD4A05A59E7": 4, # ohne
 }
 
-for serial_nr, id in responders.items():
-	program_responder(serial_nr, id)
-
 initiator = "F07DD0297227" # gelb
-program_initiator(initiator, len(responders))
+
+# Jedes Modul hängt an einem eigenen Port: alle gleichzeitig einstellen
+t0 = time.monotonic()
+workers = [threading.Thread(target=program_responder, args=(serial_nr, id)) for serial_nr, id in responders.items()]
+workers.append(threading.Thread(target=program_initiator, args=(initiator, len(responders))))
+for t in workers:
+	t.start()
+for t in workers:
+	t.join()
+print(f"INFO: {len(workers)} Module in {time.monotonic() - t0:.2f} s eingestellt")
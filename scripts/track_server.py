@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UWB-Tracking-Server – mehrere Tags (Initiatoren) gleichzeitig
+Jeder Initiator ist ein Tag; alle Tags werden pro Tick gemeinsam gelöst
+und gefiltert (uwb/fleet.py). Ausgabe als Log und optional als CSV.
+"""
+import argparse
+import csv
+import logging
+import signal
+import sys
+from contextlib import ExitStack
+
+import numpy as np
+
+from uwb.config import BAUDRATE, add_layout_arguments, layout_from_args, parse_anchors
+from uwb.fleet import DEFAULT_CAPACITY, DEFAULT_RATE, QUEUE_SIZE, READ_TIMEOUT, TagTable, TrackingServer
+from uwb.pipeline import QUEUE_POLICIES
+from uwb.ports import open_port
+from uwb.publish import DEFAULT_ADDRESS, FixPublisher
+
+# --------------------------------------------------------------------------- #
+#  Konfiguration
+# --------------------------------------------------------------------------- #
+logging.basicConfig(level=logging.INFO,
+                    format="%(asctime)s [%(levelname)s] %(message)s",
+                    datefmt="%H:%M:%S")
+
+# --------------------------------------------------------------------------- #
+#  Ausgaben
+# --------------------------------------------------------------------------- #
+def log_fixes(batch):
+    for tag, pos, measured in zip(batch.tags, batch.positions, batch.measured):
+        logging.info("[%s] %s%s", tag, "   ".join(f"{a}={v:6.1f} cm" for a, v in zip("xyz", pos)),
+                     "" if measured else "   (prädiziert)")
+
+class CsvWriter:
+    """Schreibt jeden Fix als Zeile tag, t_rx, x, y[, z], vx, vy[, vz], sigma, gemessen."""
+
+    def __init__(self, path: str, dim: int):
+        self.file = open(path, "w", newline="")
+        self.writer = csv.writer(self.file)
+        axes = "xyz"[:dim]
+        self.writer.writerow(["tag", "t_rx", *axes, *(f"v{a}" for a in axes), "sigma", "gemessen"])
+
+    def __call__(self, batch):
+        data = np.column_stack([batch.t_rx, batch.positions, batch.velocities, batch.sigma])
+        self.writer.writerows([tag, *(f"{v:.3f}" for v in row), int(m)]
+                              for tag, row, m in zip(batch.tags, data, batch.measured))
+
+    def close(self):
+        self.file.close()
+
+# --------------------------------------------------------------------------- #
+#  Hauptprogramm
+# --------------------------------------------------------------------------- #
+def main():
+    parser = argparse.ArgumentParser(description="Tracking-Server für mehrere Tags")
+    parser.add_argument("--tag", action="append", required=True, metavar="[ID=]PORT",
+                        help="Initiator als Tag, mehrfach angeben; ohne ID wird der Port als ID verwendet")
+    parser.add_argument("--anker", nargs=4, action="append", metavar=("MAC", "X", "Y", "Z"),
+                        help="Ankerposition, mehrfach angeben (Standard: Anker aus --layout)")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help=f"Ticks pro Sekunde; alle fälligen Tags werden gemeinsam gelöst (default: {DEFAULT_RATE:g})")
+    parser.add_argument("--filter", choices=["position", "off"], default="position",
+                        help="Kalman-Filter auf den Positionen oder rohe Fixes (default: position)")
+    parser.add_argument("--capacity", type=int, default=DEFAULT_CAPACITY,
+                        help=f"Vorallokierte Tag-Zeilen, wächst bei Bedarf (default: {DEFAULT_CAPACITY})")
+    parser.add_argument("--queue", choices=QUEUE_POLICIES, default="drop-oldest",
+                        help="Bei Rückstau älteste Frames verwerfen oder nur den neuesten behalten (default: drop-oldest)")
+    parser.add_argument("--csv", default=None, metavar="DATEI", help="Alle Fixes zusätzlich als CSV schreiben")
+    parser.add_argument("--publish", nargs="?", const=DEFAULT_ADDRESS, default=None, metavar="ADRESSE",
+                        help=f"Fixes binär an Abonnenten senden, udp://HOST:PORT oder unix:///PFAD (ohne Wert: {DEFAULT_ADDRESS})")
+    parser.add_argument("--quiet", action="store_true", help="Fixes nicht einzeln loggen")
+    add_layout_arguments(parser, "lab3d")
+    args = parser.parse_args()
+
+    tags = [t.split("=", 1) if "=" in t.split("://", 1)[0] else (t, t) for t in args.tag]
+    if len({tag for tag, _ in tags}) != len(tags):
+        parser.error("Tag-IDs müssen eindeutig sein")
+    try:
+        anchors = parse_anchors(args.anker) if args.anker else layout_from_args(args, dim=3)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    table = TagTable(anchors, capacity=args.capacity, filter=args.filter != "off")
+    server = TrackingServer(table, rate=args.rate, queue_size=QUEUE_SIZE, policy=args.queue)
+    if not args.quiet:
+        server.subscribe(log_fixes)
+    writer = CsvWriter(args.csv, table.dim) if args.csv else None
+    if writer is not None:
+        server.subscribe(writer)
+    publisher = FixPublisher(args.publish) if args.publish else None
+    if publisher is not None:
+        server.subscribe(publisher)
+
+    signal.signal(signal.SIGINT, lambda *_: server.running.clear())
+    with ExitStack() as stack:
+        try:
+            for tag, port in tags:
+                server.add_port(tag, stack.enter_context(open_port(port, BAUDRATE, timeout=READ_TIMEOUT)))
+        except Exception as e:
+            logging.error("Port %s: %s", port, e)
+            server.stop()
+            sys.exit(1)
+        logging.info("%d Tags, %d Anker, %g Ticks/s", len(tags), len(anchors), args.rate)
+        if publisher is not None:
+            # Im Binärformat trägt jeder Fix die Zeilennummer des Tags
+            logging.info("Sende an %s: %s", args.publish,
+                         ", ".join(f"{tag}={table.row(tag)}" for tag, _ in tags))
+        try:
+            server.run()
+        finally:
+            server.stop()
+            if writer is not None:
+                writer.close()
+            if publisher is not None:
+                logging.info(publisher.report())
+                publisher.close()
+            logging.info(table.report())
+            logging.info("Queue: %d Frames, %d verworfen", server.queue.put_count, server.queue.dropped)
+
+if __name__ == "__main__":
+    main()
@@ -4,37 +4,36 @@
 UWB-Initiator – Live-Trilateration & Plot
 läuft stabil mit PySerial ≥ 3.5 und Matplotlib ≥ 3.8
 """
-import serial.tools.list_ports as slp
-import serial, re, time, signal, sys, threading, logging
-from queue import Queue, Empty
+import argparse
+import time, sys, threading, logging
+from queue import Empty
 from collections import deque
 import numpy as np
-import matplotlib.pyplot as plt
+
+from uwb.config import BAUDRATE, add_layout_arguments, area_from_args, find_initiator_port, layout_from_args
+from uwb.dop import MAX_PDOP, DopMap, GeometryAlarm, check_geometry
+from uwb.framing import reader_thread
+from uwb.multilateration import Multilaterator
+from uwb.parsing import parse_distances
+from uwb.pipeline import QUEUE_POLICIES, LatencyStats, RingQueue
+from uwb.ports import open_port
+from uwb.publish import DEFAULT_ADDRESS
+from uwb.recording import ColumnarRecorder
+from uwb.render import BlitRenderer
+from uwb.sinks import PublisherSink, open_sink
+from uwb.tracking import Tracker
+from uwb.trilateration import trilaterate_2d
 
 # --------------------------------------------------------------------------- #
 #  Konfiguration
 # --------------------------------------------------------------------------- #
-SERIAL_NUMBERS = {
-    "C208865F906F",
-    "FAD4A05A59E7",
-    "FA6D881A5AFC",
-    "F07DD0297227",
-}
-
-ANCHOR_POSITIONS = {
-    0x0002: np.array([0.0, 0.0]),        # rot
-    0x0003: np.array([0.0, -310]),     # grün
-    0x0004: np.array([550.0, -160]),      # ohne
-}
-
-BAUDRATE       = 115_200
+# x, y Koordinaten der Anker aus der Layout-Datei (uwb/anker.json), gesetzt in main()
+ANCHOR_POSITIONS: dict[int, np.ndarray] = {}
+
 READ_TIMEOUT   = 0.05          # s
+QUEUE_SIZE     = 64            # Frames zwischen Reader und Auswertung
 TRACE_LENGTH   = 50            # vergangene Punkte im Plot
 
-DIST_RE = re.compile(
-    r"\[mac_address=0x([0-9a-fA-F]+),\s*status=\"SUCCESS\",\s*distance\[cm\]=(\d+)\]"
-)
-
 logging.basicConfig(level=logging.INFO,
                     format="%(asctime)s [%(levelname)s] %(message)s",
                     datefmt="%H:%M:%S")
@@ -42,59 +41,31 @@ logging.basicConfig(level=logging.INFO,
 # --------------------------------------------------------------------------- #
 #  Hilfsfunktionen
 # --------------------------------------------------------------------------- #
-def find_initiator_port() -> str:
-    for port in slp.comports():
-        if (port.serial_number or "").upper() in SERIAL_NUMBERS:
-            logging.info("Serielles Gerät gefunden: %s  (SN=%s)", port.device,
-                         port.serial_number)
-            return port.device
-    raise RuntimeError("Kein bekanntes UWB-Modul eingesteckt!")
-
-def parse_distances(msg: str) -> dict[int, float] | None:
-    matches = DIST_RE.findall(msg)
-    if len(matches) < 3:
-        return None
-    return {int(mac, 16): float(dist) for mac, dist in matches}
-
 def trilateration(anchors: list[np.ndarray], d: list[float]) -> np.ndarray | None:
-    # Extrahiere die x- und y-Koordinaten der Anker
-    (x1, y1), (x2, y2), (x3, y3) = anchors
-    # Extrahiere die Distanzen zu den Ankern
-    r1, r2, r3 = d
-
-    # Berechnung der Koeffizienten für die Gleichungssysteme
-    A, B = 2*(x2 - x1), 2*(y2 - y1)  # Koeffizienten für Anker 2
-    C = r1**2 - r2**2 - x1**2 + x2**2 - y1**2 + y2**2  # Konstante für Anker 2
-    D, E = 2*(x3 - x1), 2*(y3 - y1)  # Koeffizienten für Anker 3
-    F = r1**2 - r3**2 - x1**2 + x3**2 - y1**2 + y3**2  # Konstante für Anker 3
-    denom = A*E - B*D  # Berechnung des Determinantenwerts
-
-    # Überprüfung auf numerische Instabilität
-    if abs(denom) < 1e-6:
-        logging.warning("Numerische Instabilität: denom=%s", denom)
+    # Einzelner Fix über die Batch-Engine (N=1)
+    pos, valid = trilaterate_2d(anchors, [d])
+    if not valid[0]:
+        logging.warning("Trilateration nicht möglich (Ankergeometrie instabil).")
         return None
-
-    # Berechnung der x- und y-Koordinaten
-    x = (C*E - F*B) / denom  # x-Koordinate
-    y = (A*F - D*C) / denom  # y-Koordinate
-
-    # Debug-Log für die berechneten Werte
-    logging.debug("Berechnete Werte: x=%s, y=%s", x, y)
-
-    # Rückgabe der berechneten Position als numpy-Array
-    return np.array([x, y])
+    logging.debug("Berechnete Werte: x=%s, y=%s", *pos[0])
+    return pos[0]
 
 # --------------------------------------------------------------------------- #
 #  Plot-Objekt
 # --------------------------------------------------------------------------- #
 class LivePlot:
-    def __init__(self):
+    def __init__(self, fps: float = 30.0):
+        # matplotlib erst hier laden: im Kopfbetrieb (--headless) nie
+        import matplotlib.pyplot as plt
+        self.plt = plt
         plt.ion()
         self.fig, self.ax = plt.subplots(figsize=(6, 6))
         self._setup_axes()
         self.trace = deque(maxlen=TRACE_LENGTH)
         (self.line,)  = self.ax.plot([], [], "b--", lw=1, alpha=0.6)
         (self.point,) = self.ax.plot([], [], "ro",  ms=8)
+        # Nur Spur und Punkt werden pro Bild neu gezeichnet, höchstens fps-mal pro Sekunde
+        self.renderer = BlitRenderer(self.fig, [self.line, self.point], fps)
 
     def _setup_axes(self):
         # Berechne die minimalen und maximalen Werte der Ankerpositionen
@@ -117,81 +88,148 @@ class LivePlot:
         self.ax.set_ylabel("y [cm]")
         self.ax.set_title("UWB – Initiator-Position")
 
+    def show(self):
+        """Lässt das Fenster nach dem Ende offen."""
+        self.plt.ioff(); self.plt.show()
+
     def update(self, pos: np.ndarray):
         self.trace.append(pos)
-        pts = np.asarray(self.trace)
-        if len(pts) > 1:
-            self.line.set_data(pts[:, 0], pts[:, 1])
-        self.point.set_data([pos[0]], [pos[1]])
-        self.fig.canvas.draw_idle()
-        self.fig.canvas.flush_events()
-
-# --------------------------------------------------------------------------- #
-#  Reader-Thread
-# --------------------------------------------------------------------------- #
-def reader_thread(ser: serial.Serial, q: Queue, running: threading.Event):
-    buf = ""
-    while running.is_set():
-        try:
-            data = ser.read(ser.in_waiting or 1).decode(errors="ignore")
-            if data:
-                buf += data
-                while "SESSION_INFO_NTF" in buf and "}" in buf:
-                    start = buf.find("SESSION_INFO_NTF")
-                    end   = buf.find("}", start)
-                    if end == -1:
-                        break
-                    msg = buf[start:end+1]
-                    buf = buf[end+1:]
-                    q.put(msg.replace("\n", " "))
-            else:
-                time.sleep(READ_TIMEOUT)
-        except serial.SerialException as e:
-            logging.warning("Serielle Ausnahme: %s – versuche weiter …", e)
-            time.sleep(1)
+        self.renderer.submit()
+        self.refresh()
+
+    def refresh(self):
+        """Zeichnet den neuesten Fix, sobald ein Bild fällig ist; Zwischenstände entfallen."""
+        if not self.renderer.due():
+            return
+        if self.renderer.pending:
+            pts = np.asarray(self.trace)
+            if len(pts) > 1:
+                self.line.set_data(pts[:, 0], pts[:, 1])
+            self.point.set_data([pts[-1, 0]], [pts[-1, 1]])
+        self.renderer.poll()
 
 # --------------------------------------------------------------------------- #
 #  Hauptprogramm
 # --------------------------------------------------------------------------- #
 def main():
+    parser = argparse.ArgumentParser(description="Live-Trilateration (2D)")
+    parser.add_argument("--port", default=None,
+                        help="Serieller Port oder sim://-URL, z.B. sim://?role=initiator (default: suchen)")
+    parser.add_argument("--queue", choices=QUEUE_POLICIES, default="drop-oldest",
+                        help="Bei Rückstau älteste Frames verwerfen oder nur den neuesten behalten (default: drop-oldest)")
+    parser.add_argument("--filter", choices=["ranges", "position", "off"], default="ranges",
+                        help="Kalman-Tracker auf den Distanzen (EKF), auf den Positionen oder aus (default: ranges)")
+    parser.add_argument("--fps", type=float, default=30.0, help="Maximale Bildrate des Plots (default: 30)")
+    parser.add_argument("--record", default=None, metavar="DIR",
+                        help="Zeichnet Frames und Positionen spaltenweise als .npy-Segmente auf")
+    parser.add_argument("--publish", nargs="?", const=DEFAULT_ADDRESS, default=None, metavar="ADRESSE",
+                        help=f"Jeden Fix binär an Abonnenten senden, udp://HOST:PORT oder unix:///PFAD (ohne Wert: {DEFAULT_ADDRESS})")
+    parser.add_argument("--headless", action="store_true",
+                        help="Ohne Plot und ohne matplotlib; Fixes gehen an die Senken (ohne --sink/--publish: stdout)")
+    parser.add_argument("--sink", action="append", default=[], metavar="ZIEL",
+                        help="Fixes zusätzlich ausgeben: - (stdout, CSV), Dateipfad (CSV) oder udp://…/unix://…, mehrfach nutzbar")
+    parser.add_argument("--max-pdop", type=float, default=MAX_PDOP,
+                        help=f"Warnen, sobald ein Fix in einer Zelle der DOP-Karte mit höherem PDOP liegt (default: {MAX_PDOP:g})")
+    add_layout_arguments(parser, "lab2d")
+    args = parser.parse_args()
+
+    global ANCHOR_POSITIONS
     try:
-        port = find_initiator_port()
-    except RuntimeError as e:
+        ANCHOR_POSITIONS = layout_from_args(args, dim=2)
+        area = area_from_args(args)
+        port = args.port or find_initiator_port()
+        # Vor dem Port: ein belegtes --record-Verzeichnis soll nicht erst bei laufendem Reader auffallen
+        recorder = ColumnarRecorder(args.record) if args.record else None
+    except (OSError, RuntimeError, ValueError) as e:
         logging.error(e)
         sys.exit(1)
 
-    with serial.Serial(port, BAUDRATE, timeout=READ_TIMEOUT) as ser:
+    for problem in check_geometry(ANCHOR_POSITIONS):
+        logging.warning("Anker-Layout: %s", problem)
+    # Erwarteter Fehler je Zelle des Laborbereichs, im Betrieb nur noch nachgeschlagen
+    dop_map = DopMap(ANCHOR_POSITIONS, area)
+    logging.info(dop_map.summary(args.max_pdop))
+    alarm = GeometryAlarm(args.max_pdop)
+
+    with open_port(port, BAUDRATE, timeout=READ_TIMEOUT) as ser:
         running = threading.Event(); running.set()
-        q: Queue[str] = Queue()
-        t = threading.Thread(target=reader_thread, args=(ser, q, running),
+        q = RingQueue(QUEUE_SIZE, args.queue)
+        t = threading.Thread(target=reader_thread, args=(ser, q, running, READ_TIMEOUT),
                              daemon=True)
         t.start()
 
-        plot = LivePlot()
+        if args.headless and not args.sink and not args.publish:
+            args.sink = ["-"]
+        sinks = [open_sink(spec, 2) for spec in args.sink]
+        if args.publish:
+            sinks.append(PublisherSink(args.publish))
+        plot = None if args.headless else LivePlot(args.fps)
+        solver = Multilaterator(ANCHOR_POSITIONS)
+        latency = LatencyStats()
+        tracker = None if args.filter == "off" else Tracker(2, ANCHOR_POSITIONS, mode=args.filter)
         try:
             while running.is_set():
                 try:
-                    msg = q.get(timeout=0.2)
+                    t_rx, msg = q.get(timeout=0.2)
                 except Empty:
+                    if plot is not None:
+                        plot.refresh()
                     continue
-                dists = parse_distances(msg)
-                if not dists or len(dists) < 3:
-                    continue
-                macs = sorted(m for m in dists if m in ANCHOR_POSITIONS)[:3]
-                if len(macs) < 3:
-                    continue
-                anchors   = [ANCHOR_POSITIONS[m] for m in macs]
-                distances = [dists[m] for m in macs]
-                pos = trilateration(anchors, distances)
+                dists = parse_distances(msg, min_count=1) or {}
+                macs = sorted(m for m in dists if m in ANCHOR_POSITIONS)
+                pos = None
+                if len(macs) == 3:
+                    anchors   = [ANCHOR_POSITIONS[m] for m in macs]
+                    distances = [dists[m] for m in macs]
+                    pos = trilateration(anchors, distances)
+                elif len(macs) > 3:
+                    # Überbestimmt: alle Anker mit SUCCESS gehen in die LS-Lösung ein
+                    pos = solver.solve(dists)
+                if tracker is not None:
+                    # Glättet, verwirft Ausreißer und überbrückt Frames ohne Fix
+                    pos = tracker.step(t_rx, pos, {m: dists[m] for m in macs})
+                    if pos is not None:
+                        logging.debug("σ=%.1f cm", np.sqrt(np.trace(tracker.covariance)))
+                if recorder is not None:
+                    recorder.add_frame(t_rx, msg, pos)
                 if pos is not None:
-                    logging.info("x=%6.1f cm   y=%6.1f cm", *pos)
-                    plot.update(pos)
+                    pdop = dop_map.lookup(pos)
+                    expected = dop_map.range_std * pdop
+                    change = alarm.update(pdop)
+                    if change:
+                        logging.warning("Fix in schlechter Geometrie: PDOP %.1f, erwarteter Fehler ±%.0f cm",
+                                        pdop, expected)
+                    elif change is False:
+                        logging.info("Geometrie wieder brauchbar: PDOP %.1f", pdop)
+                    if sinks:
+                        # Ohne Filter dient der erwartete Fehler aus der DOP-Karte als σ
+                        sigma = np.sqrt(np.trace(tracker.covariance)) if tracker is not None else expected
+                        for sink in sinks:
+                            sink(t_rx, pos, sigma)
+                    latency.add(time.monotonic() - t_rx)
+                    if plot is not None:
+                        logging.info("x=%6.1f cm   y=%6.1f cm   ±%.0f cm", *pos, expected)
+                        plot.update(pos)
+                    else:
+                        logging.debug("x=%6.1f cm   y=%6.1f cm   ±%.0f cm", *pos, expected)
         except KeyboardInterrupt:
             logging.info("Abbruch – fahre herunter …")
         finally:
             running.clear()
             t.join(timeout=2)
-            plt.ioff(); plt.show()
+            if tracker is not None:
+                logging.info(tracker.report())
+            if plot is not None:
+                logging.info(plot.renderer.report())
+            logging.info(latency.report(q))
+            if recorder is not None:
+                recorder.close()
+                logging.info("%d Messungen in %s gespeichert", recorder.rows, args.record)
+            for sink in sinks:
+                logging.info(sink.report())
+                sink.close()
+            if plot is not None:
+                plot.show()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
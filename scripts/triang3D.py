@@ -4,40 +4,37 @@
 UWB-Initiator – Live-Trilateration & Plot
 läuft stabil mit PySerial ≥ 3.5 und Matplotlib ≥ 3.8
 """
-import serial.tools.list_ports as slp
-import serial, re, time, signal, sys, threading, logging
-from queue import Queue, Empty
+import argparse
+import time, sys, threading, logging
+from queue import Empty
 from collections import deque
 import numpy as np
-import matplotlib.pyplot as plt
+
+from uwb.anchors import AnchorSet
+from uwb.config import BAUDRATE, add_layout_arguments, area_from_args, find_initiator_port, layout_from_args
+from uwb.dop import MAX_PDOP, DopMap, GeometryAlarm, check_geometry
+from uwb.framing import reader_thread
+from uwb.multilateration import Multilaterator
+from uwb.parsing import parse_distances
+from uwb.pipeline import QUEUE_POLICIES, LatencyStats, RingQueue
+from uwb.ports import open_port
+from uwb.publish import DEFAULT_ADDRESS
+from uwb.recording import ColumnarRecorder
+from uwb.render import BlitRenderer
+from uwb.sinks import PublisherSink, open_sink
+from uwb.tracking import Tracker
 
 # --------------------------------------------------------------------------- #
 #  Konfiguration
 # --------------------------------------------------------------------------- #
-SERIAL_NUMBERS = {
-    "C208865F906F",
-    "FAD4A05A59E7",
-    "FA6D881A5AFC",
-    "F07DD0297227",
-}
-
-# x, y, z Koordinaten der Anker
-# Diese Werte sollten an die tatsächlichen Positionen der Anker angepasst werden.
-
-ANCHOR_POSITIONS = {
-    0x0002: np.array([0.0, 0.0, 0.0]),        # rot
-    0x0003: np.array([-100, -180, 80]),     # grün
-    0x0004: np.array([220, -85, -80]),      # ohne
-}
-
-BAUDRATE       = 115_200
+# x, y, z Koordinaten der Anker aus der Layout-Datei (uwb/anker.json), gesetzt in main()
+ANCHOR_POSITIONS: dict[int, np.ndarray] = {}
+ANCHOR_SET: AnchorSet | None = None
+
 READ_TIMEOUT   = 0.05          # s
+QUEUE_SIZE     = 64            # Frames zwischen Reader und Auswertung
 TRACE_LENGTH   = 50            # vergangene Punkte im Plot
 
-DIST_RE = re.compile(
-    r"\[mac_address=0x([0-9a-fA-F]+),\s*status=\"SUCCESS\",\s*distance\[cm\]=(\d+)\]"
-)
-
 logging.basicConfig(level=logging.INFO,
                     format="%(asctime)s [%(levelname)s] %(message)s",
                     datefmt="%H:%M:%S")
@@ -45,75 +42,27 @@ logging.basicConfig(level=logging.INFO,
 # --------------------------------------------------------------------------- #
 #  Hilfsfunktionen
 # --------------------------------------------------------------------------- #
-def find_initiator_port() -> str:
-    for port in slp.comports():
-        if (port.serial_number or "").upper() in SERIAL_NUMBERS:
-            logging.info("Serielles Gerät gefunden: %s  (SN=%s)", port.device,
-                         port.serial_number)
-            return port.device
-    raise RuntimeError("Kein bekanntes UWB-Modul eingesteckt!")
-
-def parse_distances(msg: str) -> dict[int, float] | None:
-    matches = DIST_RE.findall(msg)
-    if len(matches) < 3:
-        return None
-    return {int(mac, 16): float(dist) for mac, dist in matches}
-
-def trilateration(anchors: list[np.ndarray], d: list[float]) -> np.ndarray | None:
+def trilateration(macs: list[int], d: list[float]) -> np.ndarray | None:
     # Überprüfen, ob genau drei Anker und Distanzen übergeben wurden
-    if len(anchors) != 3 or len(d) != 3:
+    if len(macs) != 3 or len(d) != 3:
         logging.warning("Trilateration braucht genau 3 Anker und Distanzen.")
         return None
 
-    # Ankerpositionen und Distanzen extrahieren
-    P1, P2, P3 = anchors
-    r1, r2, r3 = d
-
-    # Berechnung des Einheitsvektors zwischen Anker 1 und Anker 2
-    ex = P2 - P1
-    distance = np.linalg.norm(ex)  # Abstand zwischen Anker 1 und Anker 2
-    if distance == 0:
-        logging.warning("Anker 1 und 2 sind identisch.")
-        return None
-    ex /= distance  # Normalisierung des Vektors
-
-    # Berechnung des zweiten Einheitsvektors basierend auf Anker 3
-    temp = P3 - P1
-    i = np.dot(ex, temp)  # Projektion von temp auf ex
-    temp2 = temp - i * ex  # Orthogonale Komponente von temp zu ex
-    temp2_norm = np.linalg.norm(temp2)  # Norm der orthogonalen Komponente
-    if temp2_norm == 0:
-        logging.warning("Anker 3 liegt auf Linie zwischen Anker 1 und 2.")
+    # Koordinatensystem des MAC-Tripels kommt aus dem Cache; liefert die Lösung näher am Boden
+    pos = ANCHOR_SET.trilaterate(macs, d)
+    if pos is None:
+        logging.warning("Trilateration nicht möglich (Anker kollinear oder z^2 negativ).")
         return None
-    ey = temp2 / temp2_norm  # Normalisierung des zweiten Einheitsvektors
-    ez = np.cross(ex, ey)  # Berechnung des dritten Einheitsvektors durch Kreuzprodukt
-
-    # Berechnung der Koordinaten x und y
-    j = np.dot(ey, temp)  # Projektion von temp auf ey
-    x = (r1**2 - r2**2 + distance**2) / (2 * distance)  # x-Koordinate
-    y = (r1**2 - r3**2 + i**2 + j**2 - 2 * i * x) / (2 * j)  # y-Koordinate
-
-    # Berechnung der z-Koordinate
-    z_squared = r1**2 - x**2 - y**2  # Quadrat der z-Koordinate
-    if z_squared < 0:
-        logging.warning("z_Wert negativ – Trilateration nicht möglich.")
-        logging.info("x=%f, y=%f, z^2=%f", x, y, z_squared)
-        return None
-    else:
-        z = np.sqrt(z_squared)  # z-Koordinate
-
-    # Berechnung der zwei möglichen Lösungen
-    result_1 = P1 + x * ex + y * ey + z * ez  # Lösung 1
-    result_2 = P1 + x * ex + y * ey - z * ez  # Lösung 2
-
-    # Rückgabe der Lösung mit dem niedrigeren z-Wert (näher am Boden)
-    return result_1 if result_1[2] < result_2[2] else result_2
+    return pos
 
 # --------------------------------------------------------------------------- #
 #  Plot-Objekt
 # --------------------------------------------------------------------------- #
 class LivePlot:
-    def __init__(self):
+    def __init__(self, fps: float = 30.0):
+        # matplotlib erst hier laden: im Kopfbetrieb (--headless) nie
+        import matplotlib.pyplot as plt
+        self.plt = plt
         plt.ion()
         self.fig = plt.figure(figsize=(8, 8))
         self.ax = self.fig.add_subplot(111, projection='3d')
@@ -121,6 +70,8 @@ class LivePlot:
         self.trace = deque(maxlen=TRACE_LENGTH)
         self.line, = self.ax.plot([], [], [], "b--", lw=1, alpha=0.6)
         self.point, = self.ax.plot([], [], [], "ro", ms=8)
+        # Nur Spur und Punkt werden pro Bild neu gezeichnet, höchstens fps-mal pro Sekunde
+        self.renderer = BlitRenderer(self.fig, [self.line, self.point], fps)
 
     def _setup_axes(self):
         # Berechne die Grenzen basierend auf den Ankerpositionen
@@ -144,85 +95,150 @@ class LivePlot:
         self.ax.set_zlabel("z [cm]")
         self.ax.set_title("UWB – Initiator-Position")
 
+    def show(self):
+        """Lässt das Fenster nach dem Ende offen."""
+        self.plt.ioff(); self.plt.show()
+
     def update(self, pos: np.ndarray):
         self.trace.append(pos)
-        pts = np.asarray(self.trace)
-        if len(pts) > 1:
-            self.line.set_data(pts[:, 0], pts[:, 1])
-            self.line.set_3d_properties(pts[:, 2])
-        self.point.set_data([pos[0]], [pos[1]])
-        self.point.set_3d_properties([pos[2]])
-        self.fig.canvas.draw_idle()
-        self.fig.canvas.flush_events()
-
-# --------------------------------------------------------------------------- #
-#  Reader-Thread
-# --------------------------------------------------------------------------- #
-def reader_thread(ser: serial.Serial, q: Queue, running: threading.Event):
-    buf = ""
-    while running.is_set():
-        try:
-            data = ser.read(ser.in_waiting or 1).decode(errors="ignore")
-            if data:
-                logging.debug("Empfangene Daten: %s", data)
-                buf += data
-                while "SESSION_INFO_NTF" in buf and "}" in buf:
-                    start = buf.find("SESSION_INFO_NTF")
-                    end   = buf.find("}", start)
-                    if end == -1:
-                        break
-                    msg = buf[start:end+1]
-                    buf = buf[end+1:]
-                    logging.debug("Verarbeitete Nachricht: %s", msg)
-                    q.put(msg.replace("\n", " "))
-            else:
-                time.sleep(READ_TIMEOUT)
-        except serial.SerialException as e:
-            logging.warning("Serielle Ausnahme: %s – versuche weiter …", e)
-            time.sleep(1)
+        self.renderer.submit()
+        self.refresh()
+
+    def refresh(self):
+        """Zeichnet den neuesten Fix, sobald ein Bild fällig ist; Zwischenstände entfallen."""
+        if not self.renderer.due():
+            return
+        if self.renderer.pending:
+            pts = np.asarray(self.trace)
+            if len(pts) > 1:
+                self.line.set_data(pts[:, 0], pts[:, 1])
+                self.line.set_3d_properties(pts[:, 2])
+            self.point.set_data([pts[-1, 0]], [pts[-1, 1]])
+            self.point.set_3d_properties([pts[-1, 2]])
+        self.renderer.poll()
 
 # --------------------------------------------------------------------------- #
 #  Hauptprogramm
 # --------------------------------------------------------------------------- #
 def main():
+    parser = argparse.ArgumentParser(description="Live-Trilateration (3D)")
+    parser.add_argument("--port", default=None,
+                        help="Serieller Port oder sim://-URL, z.B. sim://?role=initiator (default: suchen)")
+    parser.add_argument("--queue", choices=QUEUE_POLICIES, default="drop-oldest",
+                        help="Bei Rückstau älteste Frames verwerfen oder nur den neuesten behalten (default: drop-oldest)")
+    parser.add_argument("--filter", choices=["ranges", "position", "off"], default="ranges",
+                        help="Kalman-Tracker auf den Distanzen (EKF), auf den Positionen oder aus (default: ranges)")
+    parser.add_argument("--fps", type=float, default=30.0, help="Maximale Bildrate des Plots (default: 30)")
+    parser.add_argument("--record", default=None, metavar="DIR",
+                        help="Zeichnet Frames und Positionen spaltenweise als .npy-Segmente auf")
+    parser.add_argument("--publish", nargs="?", const=DEFAULT_ADDRESS, default=None, metavar="ADRESSE",
+                        help=f"Jeden Fix binär an Abonnenten senden, udp://HOST:PORT oder unix:///PFAD (ohne Wert: {DEFAULT_ADDRESS})")
+    parser.add_argument("--headless", action="store_true",
+                        help="Ohne Plot und ohne matplotlib; Fixes gehen an die Senken (ohne --sink/--publish: stdout)")
+    parser.add_argument("--sink", action="append", default=[], metavar="ZIEL",
+                        help="Fixes zusätzlich ausgeben: - (stdout, CSV), Dateipfad (CSV) oder udp://…/unix://…, mehrfach nutzbar")
+    parser.add_argument("--max-pdop", type=float, default=MAX_PDOP,
+                        help=f"Warnen, sobald ein Fix in einer Zelle der DOP-Karte mit höherem PDOP liegt (default: {MAX_PDOP:g})")
+    add_layout_arguments(parser, "lab3d")
+    args = parser.parse_args()
+
+    global ANCHOR_POSITIONS, ANCHOR_SET
     try:
-        port = find_initiator_port()
-    except RuntimeError as e:
+        ANCHOR_POSITIONS = layout_from_args(args, dim=3)
+        area = area_from_args(args)
+        ANCHOR_SET = AnchorSet(ANCHOR_POSITIONS)
+        port = args.port or find_initiator_port()
+        # Vor dem Port: ein belegtes --record-Verzeichnis soll nicht erst bei laufendem Reader auffallen
+        recorder = ColumnarRecorder(args.record) if args.record else None
+    except (OSError, RuntimeError, ValueError) as e:
         logging.error(e)
         sys.exit(1)
 
-    with serial.Serial(port, BAUDRATE, timeout=READ_TIMEOUT) as ser:
+    for problem in check_geometry(ANCHOR_POSITIONS):
+        logging.warning("Anker-Layout: %s", problem)
+    # Erwarteter Fehler je Zelle des Laborbereichs, im Betrieb nur noch nachgeschlagen
+    dop_map = DopMap(ANCHOR_POSITIONS, area)
+    logging.info(dop_map.summary(args.max_pdop))
+    alarm = GeometryAlarm(args.max_pdop)
+
+    with open_port(port, BAUDRATE, timeout=READ_TIMEOUT) as ser:
         running = threading.Event(); running.set()
-        q: Queue[str] = Queue()
-        t = threading.Thread(target=reader_thread, args=(ser, q, running),
+        q = RingQueue(QUEUE_SIZE, args.queue)
+        t = threading.Thread(target=reader_thread, args=(ser, q, running, READ_TIMEOUT),
                              daemon=True)
         t.start()
 
-        plot = LivePlot()
+        if args.headless and not args.sink and not args.publish:
+            args.sink = ["-"]
+        sinks = [open_sink(spec, 3) for spec in args.sink]
+        if args.publish:
+            sinks.append(PublisherSink(args.publish))
+        plot = None if args.headless else LivePlot(args.fps)
+        solver = Multilaterator(ANCHOR_POSITIONS)
+        latency = LatencyStats()
+        tracker = None if args.filter == "off" else Tracker(3, ANCHOR_POSITIONS, mode=args.filter)
         try:
             while running.is_set():
                 try:
-                    msg = q.get(timeout=0.2)
+                    t_rx, msg = q.get(timeout=0.2)
                 except Empty:
+                    if plot is not None:
+                        plot.refresh()
                     continue
-                dists = parse_distances(msg)
-                if not dists or len(dists) < 3:
-                    continue
-                macs = sorted(m for m in dists if m in ANCHOR_POSITIONS)[:3]
-                if len(macs) < 3:
-                    continue
-                anchors   = [ANCHOR_POSITIONS[m] for m in macs]
-                distances = [dists[m] for m in macs]
-                pos = trilateration(anchors, distances)
+                dists = parse_distances(msg, min_count=1) or {}
+                macs = sorted(m for m in dists if m in ANCHOR_POSITIONS)
+                pos = None
+                if len(macs) == 3:
+                    distances = [dists[m] for m in macs]
+                    pos = trilateration(macs, distances)
+                elif len(macs) > 3:
+                    # Überbestimmt: alle Anker mit SUCCESS gehen in die LS-Lösung ein
+                    pos = solver.solve(dists)
+                if tracker is not None:
+                    # Glättet, verwirft Ausreißer und überbrückt Frames ohne Fix
+                    pos = tracker.step(t_rx, pos, {m: dists[m] for m in macs})
+                    if pos is not None:
+                        logging.debug("σ=%.1f cm", np.sqrt(np.trace(tracker.covariance)))
+                if recorder is not None:
+                    recorder.add_frame(t_rx, msg, pos)
                 if pos is not None:
-                    logging.info("x=%6.1f cm   y=%6.1f cm   z=%6.1f cm", pos[0], pos[1], pos[2])
-                    plot.update(pos)
+                    pdop = dop_map.lookup(pos)
+                    expected = dop_map.range_std * pdop
+                    change = alarm.update(pdop)
+                    if change:
+                        logging.warning("Fix in schlechter Geometrie: PDOP %.1f, erwarteter Fehler ±%.0f cm",
+                                        pdop, expected)
+                    elif change is False:
+                        logging.info("Geometrie wieder brauchbar: PDOP %.1f", pdop)
+                    if sinks:
+                        # Ohne Filter dient der erwartete Fehler aus der DOP-Karte als σ
+                        sigma = np.sqrt(np.trace(tracker.covariance)) if tracker is not None else expected
+                        for sink in sinks:
+                            sink(t_rx, pos, sigma)
+                    latency.add(time.monotonic() - t_rx)
+                    if plot is not None:
+                        logging.info("x=%6.1f cm   y=%6.1f cm   z=%6.1f cm   ±%.0f cm", pos[0], pos[1], pos[2], expected)
+                        plot.update(pos)
+                    else:
+                        logging.debug("x=%6.1f cm   y=%6.1f cm   z=%6.1f cm   ±%.0f cm", pos[0], pos[1], pos[2], expected)
         except KeyboardInterrupt:
             logging.info("Abbruch – fahre herunter …")
         finally:
             running.clear()
             t.join(timeout=2)
-            plt.ioff(); plt.show()
+            if tracker is not None:
+                logging.info(tracker.report())
+            if plot is not None:
+                logging.info(plot.renderer.report())
+            logging.info(latency.report(q))
+            if recorder is not None:
+                recorder.close()
+                logging.info("%d Messungen in %s gespeichert", recorder.rows, args.record)
+            for sink in sinks:
+                logging.info(sink.report())
+                sink.close()
+            if plot is not None:
+                plot.show()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,3 @@
+"""
+Gemeinsame Bausteine der UWB-Skripte (Trilateration, Parser, Serielle Helfer).
+"""
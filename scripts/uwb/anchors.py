@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ankerkonfiguration mit vorberechneter Geometrie
+
+Das lokale Koordinatensystem (ex, ey, ez, i, j, d) hängt nur von den
+Ankerpositionen ab. `AnchorSet` berechnet es einmal pro sortiertem
+MAC-Tripel und hält es in einem kleinen LRU-Cache.
+"""
+from collections import OrderedDict
+
+import numpy as np
+
+from .trilateration import Frame3D, anchor_frame
+
+class AnchorSet:
+    """Ankerpositionen plus LRU-Cache der lokalen 3D-Koordinatensysteme."""
+
+    def __init__(self, anchor_positions: dict[int, np.ndarray], maxsize: int = 16):
+        self.positions = {mac: np.asarray(p, dtype=float) for mac, p in anchor_positions.items()}
+        self.maxsize = maxsize
+        # Wert None merkt sich degenerierte Tripel, damit sie nicht neu berechnet werden
+        self._frames: OrderedDict[tuple[int, int, int], Frame3D | None] = OrderedDict()
+
+    @property
+    def cached_frames(self) -> int:
+        """Anzahl der aktuell gecachten Koordinatensysteme."""
+        return len(self._frames)
+
+    def frame(self, macs) -> Frame3D | None:
+        """Liefert das Koordinatensystem zum (sortierten) MAC-Tripel."""
+        key = tuple(sorted(macs))
+        try:
+            self._frames.move_to_end(key)
+            return self._frames[key]
+        except KeyError:
+            pass
+        if len(key) != 3:
+            raise ValueError(f"Erwarte genau 3 Anker, nicht {len(key)}")
+        frame = anchor_frame([self.positions[m] for m in key])
+        self._frames[key] = frame
+        if len(self._frames) > self.maxsize:
+            self._frames.popitem(last=False)
+        return frame
+
+    def trilaterate(self, macs, d) -> np.ndarray | None:
+        """Einzelner 3D-Fix zu drei Ankern; Distanzen in derselben Reihenfolge wie `macs`."""
+        order = sorted(range(3), key=lambda k: macs[k])
+        frame = self.frame(macs)
+        if frame is None:
+            return None
+        pos = frame.locate(*(float(d[k]) for k in order))
+        return None if pos is None else np.array(pos)
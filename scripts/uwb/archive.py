@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Messarchiv für die Distanzmessungen in raw_data/messungen
+
+Die Messreihen (CSV von `start_uwb.py stat --save`, Spalten "MAC-Adresse"
+und "Distanz (cm)") werden über einen Index nach Soll-Distanz und
+Kalibrierzustand gefunden. Der Index steht in `archiv.json`; CSV-Dateien,
+die dort fehlen, werden trotzdem aufgenommen (Soll-Distanz aus dem
+Dateinamen wie `messung_4m_...` bzw. `messung_2855cm_...`, kalibriert
+wenn der Ordner so heißt).
+
+Jede CSV wird nur einmal geparst und als `.npy` (ARCHIVE_DTYPE) im
+Cache-Ordner abgelegt. Geändert sich mtime oder Größe, entscheidet ein
+SHA-1 der Datei, ob neu konvertiert werden muss. Geladen wird per
+Memory-Mapping.
+
+    python -m uwb.archive list
+    python -m uwb.archive build
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+
+import numpy as np
+
+ARCHIVE_DTYPE = np.dtype([("mac", "u2"), ("distance", "i4")])
+
+DEFAULT_ROOT = Path(__file__).resolve().parent.parent / "raw_data" / "messungen"
+INDEX_FILE = "archiv.json"
+CACHE_DIR = ".cache"
+
+_NOMINAL_RE = re.compile(r"_(\d+)(cm|m)(?:_|$)")
+
+def _nominal_from_name(stem: str) -> int | None:
+    m = _NOMINAL_RE.search(stem)
+    if m is None:
+        return None
+    value = int(m.group(1))
+    return value * 100 if m.group(2) == "m" else value
+
+def _sha1(path: Path) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def parse_csv(path: Path) -> np.ndarray:
+    """Liest eine Messreihe; ungültige Zeilen werden übersprungen."""
+    raw = path.read_bytes()
+    body = raw[raw.find(b"\n") + 1:] if b"\n" in raw else b""
+    # Schneller Pfad: Kommas zu Leerzeichen, dann abwechselnd MAC und Distanz
+    tokens = body.replace(b",", b" ").split()
+    if len(tokens) % 2 == 0:
+        macs, dists = tokens[0::2], tokens[1::2]
+        try:
+            codes = {m: int(m, 16) for m in set(macs)}
+            out = np.empty(len(macs), dtype=ARCHIVE_DTYPE)
+            out["mac"] = np.fromiter(map(codes.__getitem__, macs), dtype=np.uint16, count=len(macs))
+            out["distance"] = np.array(dists).astype(np.int32) if dists else 0
+            return out
+        except ValueError:
+            pass
+
+    # Langsamer Pfad: zeilenweise, ungültige Zeilen überspringen
+    rows = [line.split(b",") for line in body.splitlines() if line.strip()]
+    out = np.empty(len(rows), dtype=ARCHIVE_DTYPE)
+    n = 0
+    for row in rows:
+        try:
+            out[n] = (int(row[0], 16), int(float(row[1])))
+            n += 1
+        except (ValueError, IndexError):
+            continue
+    return out[:n]
+
+# --------------------------------------------------------------------------- #
+#  Messreihe
+# --------------------------------------------------------------------------- #
+class Run:
+    """Eine Messreihe: CSV-Datei, Soll-Distanz in cm und Kalibrierzustand."""
+
+    def __init__(self, archive: "Archive", path: Path, nominal: int | None, calibrated: bool | None,
+                 note: str = ""):
+        self.archive = archive
+        self.path = path
+        self.nominal = nominal
+        self.calibrated = calibrated
+        self.note = note
+
+    @property
+    def name(self) -> str:
+        return self.path.relative_to(self.archive.root).as_posix()
+
+    def load(self) -> np.ndarray:
+        """Alle Messungen als (mac, distance), per Memory-Mapping aus dem Cache."""
+        return self.archive.load(self)
+
+    @property
+    def distances(self) -> np.ndarray:
+        return self.load()["distance"]
+
+    def by_mac(self) -> dict[int, np.ndarray]:
+        data = self.load()
+        macs = data["mac"]
+        return {int(m): data["distance"][macs == m] for m in np.unique(macs)}
+
+    def __repr__(self) -> str:
+        state = {True: "kalibriert", False: "unkalibriert", None: "?"}[self.calibrated]
+        return f"Run({self.name!r}, {self.nominal} cm, {state})"
+
+# --------------------------------------------------------------------------- #
+#  Archiv
+# --------------------------------------------------------------------------- #
+class Archive:
+    """Index aller Messreihen unter `root` mit Cache für die konvertierten Arrays."""
+
+    def __init__(self, root: str | Path = DEFAULT_ROOT, cache_dir: str | Path | None = None):
+        self.root = Path(root).resolve()
+        self.cache_dir = Path(cache_dir) if cache_dir else self.root / CACHE_DIR
+        self.runs: list[Run] = []
+        self._maps: dict[Path, np.ndarray] = {}
+        self.conversions = 0
+        self._read_index()
+
+    def _read_index(self):
+        seen = set()
+        index = self.root / INDEX_FILE
+        if index.exists():
+            for entry in json.loads(index.read_text(encoding="utf-8"))["runs"]:
+                path = (self.root / entry["path"]).resolve()
+                if not path.exists():
+                    raise FileNotFoundError(f"{INDEX_FILE}: {entry['path']} existiert nicht")
+                self.runs.append(Run(self, path, entry.get("nominal"), entry.get("calibrated"),
+                                     entry.get("note", "")))
+                seen.add(path)
+        for path in sorted(self.root.rglob("*.csv")):
+            path = path.resolve()
+            if path in seen or self.cache_dir in path.parents:
+                continue
+            calibrated = {"kalibriert": True, "unkalibriert": False}.get(path.parent.name)
+            self.runs.append(Run(self, path, _nominal_from_name(path.stem), calibrated))
+
+    # ---- Auswahl ------------------------------------------------------------ #
+    def select(self, nominal: int | None = None, calibrated: bool | None = None) -> list[Run]:
+        """Messreihen mit passender Soll-Distanz und/oder Kalibrierzustand (None = egal)."""
+        return [r for r in self.runs
+                if (nominal is None or r.nominal == nominal)
+                and (calibrated is None or r.calibrated == calibrated)]
+
+    def by_nominal(self, calibrated: bool | None = None) -> dict[int, Run]:
+        """Eine Messreihe pro Soll-Distanz (bei mehreren die erste im Index)."""
+        runs: dict[int, Run] = {}
+        for r in self.select(calibrated=calibrated):
+            if r.nominal is not None:
+                runs.setdefault(r.nominal, r)
+        return dict(sorted(runs.items()))
+
+    def find(self, name: str) -> Run:
+        """Messreihe über ihren Pfad relativ zum Archiv (oder absolut)."""
+        path = (self.root / name).resolve()
+        for r in self.runs:
+            if r.path == path:
+                return r
+        raise KeyError(name)
+
+    # ---- Cache -------------------------------------------------------------- #
+    def _cache_paths(self, run: Run) -> tuple[Path, Path]:
+        key = run.name.replace("/", "__").removesuffix(".csv")
+        return self.cache_dir / f"{key}.npy", self.cache_dir / f"{key}.json"
+
+    def _fresh(self, run: Run, npy: Path, meta_file: Path) -> bool:
+        if not (npy.exists() and meta_file.exists()):
+            return False
+        meta = json.loads(meta_file.read_text())
+        st = run.path.stat()
+        if meta["mtime_ns"] == st.st_mtime_ns and meta["size"] == st.st_size:
+            return True
+        # mtime geändert (z.B. nach git checkout): nur bei anderem Inhalt neu konvertieren
+        if meta["size"] == st.st_size and meta["sha1"] == _sha1(run.path):
+            self._write_meta(meta_file, st, meta["sha1"])
+            return True
+        return False
+
+    def _write_meta(self, meta_file: Path, st: os.stat_result, sha1: str):
+        tmp = meta_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha1": sha1}))
+        os.replace(tmp, meta_file)
+
+    def _convert(self, run: Run, npy: Path, meta_file: Path):
+        if not self.cache_dir.exists():
+            self.cache_dir.mkdir(parents=True)
+            (self.cache_dir / ".gitignore").write_text("*\n")
+        st = run.path.stat()
+        data = parse_csv(run.path)
+        tmp = npy.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            np.save(f, data)
+        os.replace(tmp, npy)
+        self._write_meta(meta_file, st, _sha1(run.path))
+        self.conversions += 1
+
+    def load(self, run: Run) -> np.ndarray:
+        """Messungen einer Reihe als schreibgeschützte Memory-Map; konvertiert bei Bedarf."""
+        npy, meta_file = self._cache_paths(run)
+        fresh = self._fresh(run, npy, meta_file)
+        arr = self._maps.get(run.path)
+        if arr is not None and fresh:
+            return arr
+        if not fresh:
+            self._convert(run, npy, meta_file)
+        if os.path.getsize(npy) > 128:
+            arr = np.load(npy, mmap_mode="r")
+        else:
+            # Leere Reihe: mmap kann keine 0 Bytes einblenden
+            arr = np.load(npy)
+        self._maps[run.path] = arr
+        return arr
+
+    def build(self) -> int:
+        """Konvertiert alle veralteten Reihen; liefert die Anzahl Konvertierungen."""
+        before = self.conversions
+        for r in self.runs:
+            self.load(r)
+        return self.conversions - before
+
+# --------------------------------------------------------------------------- #
+#  CLI
+# --------------------------------------------------------------------------- #
+def main():
+    parser = argparse.ArgumentParser(description="Messarchiv anzeigen und Cache aufbauen")
+    parser.add_argument("--root", default=DEFAULT_ROOT, help=f"Archivordner (default: {DEFAULT_ROOT})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="Listet alle Messreihen mit Anzahl und Median")
+    sub.add_parser("build", help="Konvertiert alle geänderten CSV-Dateien")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    archive = Archive(args.root)
+    if args.command == "build":
+        n = archive.build()
+        print(f"{n} von {len(archive.runs)} Messreihen konvertiert ({time.perf_counter() - t0:.2f} s)")
+        return
+
+    for r in archive.runs:
+        d = r.distances
+        state = {True: "kalibriert", False: "unkalibriert", None: "-"}[r.calibrated]
+        nominal = f"{r.nominal} cm" if r.nominal is not None else "-"
+        median = f"{np.median(d):.1f} cm" if len(d) else "-"
+        print(f"{r.name:<45} {nominal:>8}  {state:<12} {len(d):>6} Werte  Median {median}")
+    print(f"{len(archive.runs)} Messreihen, {archive.conversions} konvertiert, "
+          f"{(time.perf_counter() - t0) * 1e3:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ein Einstiegspunkt `uwb` für alle Skripte
+
+    uwb track [--2d] …     Live-Trilateration (triang3D.py bzw. triang2D.py)
+    uwb server …           Tracking-Server für mehrere Tags (track_server.py)
+    uwb log …              Positionslogging mit Boxplot (logging/log_triang.py)
+    uwb calibrate …        Antennen-Delay kalibrieren (calibration.py)
+    uwb provision …        Module für den Batteriebetrieb einstellen (setup_headless.py)
+    uwb stats …            Logs und Aufzeichnungen auswerten (analyze-triang.py)
+    uwb raw …              Rohdaten aller Module (raw_data/start_uwb.py)
+    uwb layouts            Anker-Layouts anzeigen (uwb.config)
+    uwb dop …              Geometrie eines Layouts prüfen, DOP-Karte (uwb.dop)
+    uwb listen [ADRESSE]   Veröffentlichte Fixes mitlesen (uwb.publish)
+
+Alle Argumente nach dem Befehl gehen unverändert an das Skript, also auch
+--help. Hier werden nur argparse, os und runpy importiert; numpy, matplotlib
+und pyserial lädt erst das gewählte Skript, und auch nur, was es braucht.
+
+Installation:
+    pip install .       Skripte werden unter uwb/_repo mitinstalliert
+    pip install -e .    Skripte laufen direkt aus dem Repository
+"""
+import argparse
+import os
+import runpy
+import sys
+
+SCRIPTS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Kopie der Skripte im installierten Paket (siehe pyproject.toml)
+BUNDLED = os.path.join(os.path.dirname(os.path.abspath(__file__)), "_repo", "scripts")
+
+# Befehl → (Skript relativ zu scripts/ oder Modul, Hilfetext)
+COMMANDS = {
+    "track":     ("triang3D.py", "Live-Trilateration mit Plot oder --headless (--2d: triang2D.py)"),
+    "server":    ("track_server.py", "Tracking-Server für mehrere Tags"),
+    "log":       ("../logging/log_triang.py", "Positionslogging (2D) mit Boxplot"),
+    "calibrate": ("calibration.py", "Antennen-Delay kalibrieren"),
+    "provision": ("setup_headless.py", "Module für den Batteriebetrieb einstellen"),
+    "stats":     ("analyze-triang.py", "Mittelwerte und Abweichungen aus Logs und Aufzeichnungen"),
+    "raw":       ("raw_data/start_uwb.py", "Rohdaten aller Module plotten, loggen oder auswerten"),
+    "layouts":   ("uwb.config", "Anker-Layouts der Layout-Datei anzeigen"),
+    "dop":       ("uwb.dop", "Geometrie eines Anker-Layouts prüfen (DOP-Karte)"),
+    "listen":    ("uwb.publish", "Veröffentlichte Fixes mitlesen"),
+}
+
+def run(target: str, argv: list[str]):
+    """Führt ein Skript bzw. Modul aus, als wäre es direkt mit `argv` gestartet worden."""
+    sys.argv = [target, *argv]          # argv[0] setzt runpy auf den Dateipfad
+    if not target.endswith(".py"):
+        runpy.run_module(target, run_name="__main__", alter_sys=True)
+        return
+    # Erst das Repository (Checkout bzw. pip install -e .), dann die mitinstallierte Kopie
+    for base in (SCRIPTS, BUNDLED):
+        path = os.path.normpath(os.path.join(base, target))
+        if os.path.isfile(path):
+            break
+    else:
+        sys.exit(f"uwb: {target} weder in {SCRIPTS} noch in {BUNDLED} – Installation unvollständig?")
+    sys.path.insert(0, os.path.dirname(path))
+    runpy.run_path(path, run_name="__main__")
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        prog="uwb", description="UWB-Lokalisierung mit DWM3001C-Modulen",
+        epilog="Hilfe zu einem Befehl: uwb BEFEHL --help")
+    sub = parser.add_subparsers(dest="command", metavar="BEFEHL", required=True)
+    for name, (_, help) in COMMANDS.items():
+        # Ohne eigene Hilfe, damit --help beim Skript ankommt
+        sub.add_parser(name, help=help, add_help=False)
+    args, rest = parser.parse_known_args(sys.argv[1:] if argv is None else argv)
+
+    target = COMMANDS[args.command][0]
+    if args.command == "track" and "--2d" in rest:
+        rest.remove("--2d")
+        target = "triang2D.py"
+    run(target, rest)
+
+if __name__ == "__main__":
+    main()
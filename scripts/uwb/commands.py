@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Befehls-Client für die CLI der Module
+
+Statt nach jedem Befehl eine feste Zeit zu schlafen und danach read_all()
+aufzurufen, wartet `CommandClient` auf die Quittung des Moduls ("ok" bzw.
+"error: …", wahlweise ein eigenes Muster oder einen Prompt ohne
+Zeilenende), höchstens `timeout` Sekunden. Unabhängige Befehle schreibt
+`pipeline()` direkt hintereinander; die CLI arbeitet sie der Reihe nach
+ab, die Quittungen werden in derselben Reihenfolge zugeordnet. Jede
+Antwort trägt ihre Round-Trip-Zeit, `summary()` fasst sie zusammen.
+
+Liest ohnehin ein Thread den Port (Messdaten während der Kalibrierung),
+übernimmt `start_reader()` das Lesen und reicht alle Zeilen, die keine
+Quittung sind, an einen Callback weiter.
+"""
+import re
+import threading
+import time
+from collections import deque
+from statistics import median
+from typing import Callable, NamedTuple
+
+ACK_RE = re.compile(r"^(ok|error\b.*)$", re.IGNORECASE)
+ERROR_RE = re.compile(r"^error\b", re.IGNORECASE)
+DEFAULT_TIMEOUT = 1.0           # s bis ein Befehl als unbeantwortet gilt
+
+def is_ack(line: str) -> bool:
+    """True für Quittungszeilen der CLI ("ok", "error: …")."""
+    return ACK_RE.match(line) is not None
+
+class Reply(NamedTuple):
+    command: str
+    ok: bool                    # Quittung erhalten und kein "error"
+    answer: str                 # Quittungszeile, "" bei Timeout
+    lines: list[str]            # übrige Ausgabe zwischen Befehl und Quittung
+    rtt: float                  # s vom Schreiben bis zur Quittung bzw. bis zum Timeout
+
+    @property
+    def timed_out(self) -> bool:
+        return not self.answer
+
+    def __str__(self) -> str:
+        state = "Timeout" if self.timed_out else f"{self.rtt * 1e3:.1f} ms"
+        return f"{self.command} ({state}{'' if self.ok or self.timed_out else ', ' + self.answer})"
+
+class _Pending:
+    __slots__ = ("command", "expect", "sent", "lines", "answer", "rtt", "done")
+
+    def __init__(self, command: str, expect: re.Pattern):
+        self.command = command
+        self.expect = expect
+        self.sent = time.monotonic()
+        self.lines: list[str] = []
+        self.answer = ""
+        self.rtt = 0.0
+        self.done = threading.Event()
+
+class CommandClient:
+    """Schreibt Befehle auf einen geöffneten Port und wartet auf die Quittungen."""
+
+    def __init__(self, ser, label: str = "", timeout: float = DEFAULT_TIMEOUT,
+                 ack: re.Pattern = ACK_RE, prompt: bytes | None = None,
+                 log: Callable[[str, Reply], None] | None = None):
+        self.ser = ser
+        self.label = label
+        self.timeout = timeout
+        self.ack = ack
+        self.prompt = prompt
+        self.log = log
+        self.history: list[Reply] = []
+        self._pending: deque[_Pending] = deque()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._buf = bytearray()
+        self._reader: threading.Thread | None = None
+        self._on_line: Callable[[str], None] | None = None
+        self._running = threading.Event()
+
+    # ---- Befehle ------------------------------------------------------------ #
+    def send(self, cmd: str, expect: str | re.Pattern | None = None,
+             timeout: float | None = None) -> Reply | None:
+        """
+        Schreibt einen Befehl und wartet auf `expect` (Standard: ok/error).
+        Leere Befehle (nur Zeilenende zum Aufwecken) werden nur geschrieben, Rückgabe None.
+        """
+        replies = self.pipeline([cmd], expect, timeout)
+        return replies[0] if replies else None
+
+    def pipeline(self, cmds: list[str], expect: str | re.Pattern | None = None,
+                 timeout: float | None = None) -> list[Reply]:
+        """
+        Schreibt alle Befehle ohne Pause und sammelt danach die Quittungen ein.
+        Leere Befehle (nur Zeilenende zum Aufwecken) werden nicht quittiert.
+        """
+        expect = self.ack if expect is None else re.compile(expect) if isinstance(expect, str) else expect
+        timeout = self.timeout if timeout is None else timeout
+        pending = []
+        with self._write_lock:
+            for cmd in cmds:
+                p = _Pending(cmd, expect)
+                if cmd.strip():
+                    with self._lock:
+                        self._pending.append(p)
+                    pending.append(p)
+                self.ser.write(f"{cmd}\r\n".encode())
+        replies = []
+        for p in pending:
+            self._wait(p, p.sent + timeout)
+            reply = Reply(p.command, bool(p.answer) and ERROR_RE.match(p.answer) is None,
+                          p.answer, p.lines, time.monotonic() - p.sent if not p.answer else p.rtt)
+            self.history.append(reply)
+            if self.log is not None:
+                self.log(self.label, reply)
+            replies.append(reply)
+        return replies
+
+    def summary(self) -> str:
+        """Anzahl, Median und Maximum der Round-Trip-Zeiten sowie Timeouts."""
+        rtts = [r.rtt for r in self.history if not r.timed_out]
+        timeouts = sum(r.timed_out for r in self.history)
+        if not rtts:
+            return f"{len(self.history)} Befehle, {timeouts} ohne Antwort"
+        return (f"{len(self.history)} Befehle, RTT Median {median(rtts) * 1e3:.1f} ms, "
+                f"max {max(rtts) * 1e3:.1f} ms, {timeouts} ohne Antwort")
+
+    # ---- Lesen -------------------------------------------------------------- #
+    def start_reader(self, on_line: Callable[[str], None] | None = None):
+        """Liest den Port in einem eigenen Thread; Zeilen ohne Quittung gehen an `on_line`."""
+        self._on_line = on_line
+        self._running.set()
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    def stop_reader(self):
+        self._running.clear()
+        if self._reader is not None:
+            self._reader.join(timeout=1)
+            self._reader = None
+
+    def _read_loop(self):
+        while self._running.is_set():
+            try:
+                data = self.ser.read(self.ser.in_waiting or 1)
+            except Exception:
+                if not self._running.is_set():
+                    return
+                time.sleep(0.05)
+                continue
+            if data:
+                self._feed(data)
+
+    def _wait(self, p: _Pending, deadline: float):
+        if self._reader is not None:
+            p.done.wait(max(deadline - time.monotonic(), 0.0))
+        else:
+            # Ohne Reader-Thread selbst lesen, bis die Quittung da ist
+            while not p.done.is_set() and time.monotonic() < deadline:
+                data = self.ser.read(self.ser.in_waiting or 1)
+                if data:
+                    self._feed(data)
+        if not p.done.is_set():
+            # Unbeantwortet: aus der Warteschlange, sonst bekäme er die nächste Quittung
+            with self._lock:
+                if p in self._pending:
+                    self._pending.remove(p)
+
+    def _feed(self, data: bytes):
+        self._buf += data
+        start = 0
+        while (end := self._buf.find(b"\n", start)) >= 0:
+            line = self._buf[start:end].decode("utf-8", errors="ignore").strip()
+            start = end + 1
+            if line:
+                self._line(line)
+        del self._buf[:start]
+        if self.prompt and self._buf.rstrip().endswith(self.prompt):
+            # Prompt ohne Zeilenende quittiert den ältesten offenen Befehl
+            self._buf.clear()
+            self._complete(self.prompt.decode(errors="ignore"))
+
+    def _line(self, line: str):
+        with self._lock:
+            head = self._pending[0] if self._pending else None
+            if head is not None and (head.expect.search(line) or ERROR_RE.match(line)):
+                self._pending.popleft()
+                self._finish(head, line)
+                return
+            if head is not None:
+                head.lines.append(line)
+        if self._on_line is not None and not is_ack(line):
+            self._on_line(line)
+
+    def _complete(self, answer: str):
+        with self._lock:
+            if self._pending:
+                self._finish(self._pending.popleft(), answer)
+
+    @staticmethod
+    def _finish(p: _Pending, answer: str):
+        p.answer = answer
+        p.rtt = time.monotonic() - p.sent
+        p.done.set()
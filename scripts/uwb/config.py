@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gemeinsame Konfiguration der Skripte
+
+Seriennummern der Module, Baudrate und Gerätesuche stehen hier einmal statt
+in jedem Skript. Die Anker-Positionen [cm] kommen aus einer JSON-Datei mit
+benannten Layouts (Aufbau siehe uwb/anker.json). Gesucht wird in dieser
+Reihenfolge:
+- --anker-datei DATEI
+- Umgebungsvariable UWB_ANKER
+- anker.json im aktuellen Verzeichnis
+- uwb/anker.json (mitgeliefert)
+
+Beim Import werden weder numpy noch pyserial (und auch nicht logging oder
+pathlib) geladen, damit `uwb provision` und `uwb --help` schnell starten.
+
+Layouts anzeigen:
+    python -m uwb.config [--anker-datei DATEI]
+"""
+import argparse
+import os
+
+SERIAL_NUMBERS = frozenset({
+    "C208865F906F",
+    "FAD4A05A59E7",
+    "FA6D881A5AFC",
+    "F07DD0297227",
+})
+BAUDRATE = 115_200
+
+CONFIG_ENV = "UWB_ANKER"
+CONFIG_NAME = "anker.json"
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), CONFIG_NAME)
+
+# --------------------------------------------------------------------------- #
+#  Geräte
+# --------------------------------------------------------------------------- #
+def find_devices() -> dict[str, str]:
+    """Seriennummer → Port aller eingesteckten bekannten Module, in der Reihenfolge der Ports."""
+    from serial.tools import list_ports
+    return {p.serial_number.upper(): p.device for p in list_ports.comports()
+            if (p.serial_number or "").upper() in SERIAL_NUMBERS}
+
+def find_initiator_port() -> str:
+    import logging
+    for serial_number, device in find_devices().items():
+        logging.info("Serielles Gerät gefunden: %s  (SN=%s)", device, serial_number)
+        return device
+    raise RuntimeError("Kein bekanntes UWB-Modul eingesteckt!")
+
+# --------------------------------------------------------------------------- #
+#  Anker-Layouts
+# --------------------------------------------------------------------------- #
+def config_path(path: str | os.PathLike | None = None) -> str:
+    if path:
+        return os.fspath(path)
+    if os.environ.get(CONFIG_ENV):
+        return os.environ[CONFIG_ENV]
+    return CONFIG_NAME if os.path.isfile(CONFIG_NAME) else DEFAULT_CONFIG
+
+def read_config(path: str | os.PathLike | None = None) -> dict:
+    """Liest und prüft die Layout-Datei; Fehler als ValueError bzw. OSError."""
+    import json
+    path = config_path(path)
+    with open(path, encoding="utf-8") as f:
+        try:
+            config = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path}: kein gültiges JSON ({e})") from None
+    layouts = config.get("layouts")
+    if not isinstance(layouts, dict) or not layouts:
+        raise ValueError(f"{path}: keine Layouts unter \"layouts\"")
+    for name, layout in layouts.items():
+        anchors = layout.get("anker") if isinstance(layout, dict) else None
+        if not isinstance(anchors, dict) or not anchors:
+            raise ValueError(f"{path}: Layout {name!r} hat keine Anker")
+        for mac, pos in anchors.items():
+            try:
+                int(mac, 0)
+                ok = len(pos) in (2, 3) and all(isinstance(v, (int, float)) for v in pos)
+            except (TypeError, ValueError):
+                ok = False
+            if not ok:
+                raise ValueError(f"{path}: Layout {name!r}, Anker {mac!r}: erwartet \"0x…\": [x, y] oder [x, y, z]")
+        area = layout.get("bereich", {})
+        for axis, value in area.items():
+            if axis == "raster":
+                ok = isinstance(value, (int, float)) and value > 0
+            else:
+                ok = (axis in ("x", "y", "z") and isinstance(value, list) and len(value) == 2
+                      and all(isinstance(v, (int, float)) for v in value) and value[0] <= value[1])
+            if not ok:
+                raise ValueError(f"{path}: Layout {name!r}, Bereich {axis!r}: erwartet "
+                                 f"\"x\"/\"y\"/\"z\": [min, max] und \"raster\": cm > 0")
+    config["path"] = path
+    return config
+
+def _layout(config: dict, name: str | None) -> dict:
+    name = name or config.get("default") or next(iter(config["layouts"]))
+    if name not in config["layouts"]:
+        raise ValueError(f"Layout {name!r} nicht in {config['path']} "
+                         f"(vorhanden: {', '.join(config['layouts'])})")
+    return config["layouts"][name]
+
+def load_layout(name: str | None = None, path: str | os.PathLike | None = None, dim: int | None = None) -> dict:
+    """
+    MAC → Position als NumPy-Array. Ohne `name` gilt "default" der Datei,
+    fehlt auch das, das erste Layout.
+    Mit `dim` = 2 wird z verworfen, mit `dim` = 3 fehlt z als 0 ergänzt.
+    """
+    import numpy as np
+    anchors = {}
+    for mac, pos in _layout(read_config(path), name)["anker"].items():
+        pos = [float(v) for v in pos]
+        if dim is not None:
+            pos = (pos + [0.0] * dim)[:dim]
+        anchors[int(mac, 0)] = np.array(pos)
+    return anchors
+
+def load_area(name: str | None = None, path: str | os.PathLike | None = None) -> dict:
+    """
+    Laborbereich des Layouts für die DOP-Karte (uwb/dop.py): "x", "y", "z"
+    als [min, max] in cm und "raster" in cm, jeweils optional.
+    """
+    return dict(_layout(read_config(path), name).get("bereich", {}))
+
+def add_layout_arguments(parser: argparse.ArgumentParser, default: str | None = None):
+    """--layout und --anker-datei für Skripte, die Anker-Positionen brauchen."""
+    parser.add_argument("--layout", default=default, metavar="NAME",
+                        help=f"Anker-Layout aus der Layout-Datei (default: {default or 'Eintrag default der Datei'})")
+    parser.add_argument("--anker-datei", default=None, metavar="DATEI",
+                        help=f"Layout-Datei (default: ${CONFIG_ENV}, ./{CONFIG_NAME} oder uwb/{CONFIG_NAME})")
+
+def parse_anchors(values: list[list[str]]) -> dict:
+    """
+    Werte von --anker MAC X Y Z (mehrfach angegeben) → MAC → Position als
+    NumPy-Array. Die MAC wie in der Layout-Datei hex (0x0002) oder dezimal.
+    """
+    import numpy as np
+    anchors = {}
+    for mac, *pos in values:
+        try:
+            anchors[int(mac, 0)] = np.array([float(v) for v in pos])
+        except ValueError:
+            raise ValueError(f"--anker {mac} {' '.join(pos)}: erwartet MAC (z.B. 0x0002) "
+                             f"und {len(pos)} Koordinaten in cm") from None
+    return anchors
+
+def layout_from_args(args: argparse.Namespace, dim: int | None = None) -> dict:
+    return load_layout(args.layout, args.anker_datei, dim)
+
+def area_from_args(args: argparse.Namespace) -> dict:
+    return load_area(args.layout, args.anker_datei)
+
+# --------------------------------------------------------------------------- #
+#  Kommandozeile
+# --------------------------------------------------------------------------- #
+def main():
+    parser = argparse.ArgumentParser(description="Anker-Layouts der Layout-Datei anzeigen")
+    parser.add_argument("--anker-datei", default=None, metavar="DATEI",
+                        help=f"Layout-Datei (default: ${CONFIG_ENV}, ./{CONFIG_NAME} oder uwb/{CONFIG_NAME})")
+    args = parser.parse_args()
+    try:
+        config = read_config(args.anker_datei)
+    except (OSError, ValueError) as e:
+        parser.exit(1, f"{e}\n")
+    print(config["path"])
+    for name, layout in config["layouts"].items():
+        marker = " (default)" if name == config.get("default") else ""
+        print(f"\n{name}{marker}: {layout.get('beschreibung', '')}")
+        for mac, pos in layout["anker"].items():
+            label = layout.get("namen", {}).get(mac, "")
+            print(f"  {mac}  {', '.join(f'{v:7.1f}' for v in pos)} cm  {label}")
+        area = layout.get("bereich", {})
+        if area:
+            extent = "  ".join(f"{axis}: {area[axis][0]:g} … {area[axis][1]:g}" for axis in "xyz" if axis in area)
+            print(f"  Bereich  {extent} cm" + (f", Raster {area['raster']:g} cm" if "raster" in area else ""))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dilution of Precision (DOP) eines Anker-Layouts
+
+Beim Two-Way-Ranging gibt es keinen Uhrenfehler als Unbekannte, GDOP und
+PDOP fallen zusammen. Mit den Einheitsvektoren u_i von den Ankern zur
+Position ist H = [u_i] und cov(p) ≈ σ_r² (HᵀH)⁻¹: PDOP ist die Wurzel der
+Spur von (HᵀH)⁻¹, HDOP und VDOP die Anteile von x, y bzw. z, und σ_r · PDOP
+der zu erwartende Positionsfehler bei einer Distanzstreuung σ_r.
+
+`DopMap` rechnet das einmal für alle Zellen eines Rasters über den
+Laborbereich des Layouts (geschlossene Inverse über alle Zellen zugleich)
+und liefert danach zu jedem Fix in O(1) den Wert der nächsten Zelle;
+Fixes außerhalb des Bereichs werden einzeln gerechnet.
+`check_geometry()` meldet Layouts, die überall schlecht sind: doppelte
+Anker, Anker auf einer Geraden, mehr als drei Anker in einer Ebene (3D).
+
+Bericht mit Karte auf der Kommandozeile (aus scripts/):
+    python -m uwb.dop [--layout NAME] [--max-pdop 5] [--png DATEI]
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+DEFAULT_RESOLUTION = 10.0   # cm, wenn das Layout kein Raster nennt
+DEFAULT_MARGIN = 100.0      # cm um die Anker, wenn das Layout keinen Bereich nennt
+DEFAULT_RANGE_STD = 10.0    # cm Streuung einer Distanz (wie range_std im Tracker)
+MAX_PDOP = 5.0              # darüber gilt die Geometrie als unbrauchbar
+GOOD_PDOP = 2.0
+HYSTERESIS = 0.8            # Entwarnung erst unter HYSTERESIS · max_pdop
+MIN_SPACING = 10.0          # cm, näher beieinander liegende Anker sind praktisch einer
+FLATNESS = 0.05             # kleinster/größter Singulärwert, ab dem Anker als Gerade/Ebene gelten
+
+def dop_components(anchors, points) -> np.ndarray:
+    """
+    Diagonale von (HᵀH)⁻¹ für Punkte (..., dim) zu Ankern (n, dim), also die
+    Varianzfaktoren je Achse (..., dim). Singuläre Geometrie gibt inf.
+    """
+    anchors = np.asarray(anchors, dtype=float)
+    points = np.asarray(points, dtype=float)
+    diff = points[..., None, :] - anchors                       # (..., n, dim)
+    norm = np.linalg.norm(diff, axis=-1, keepdims=True)
+    u = np.divide(diff, norm, out=np.zeros_like(diff), where=norm > 0)
+    g = np.einsum("...ni,...nj->...ij", u, u)
+    # 2×2 bzw. 3×3 geschlossen invertieren: Diagonale der Adjunkten durch die Determinante
+    if g.shape[-1] == 2:
+        cof = np.stack([g[..., 1, 1], g[..., 0, 0]], axis=-1)
+        det = g[..., 0, 0] * g[..., 1, 1] - g[..., 0, 1] ** 2
+    else:
+        cof = np.stack([g[..., j, j] * g[..., k, k] - g[..., j, k] ** 2
+                        for j, k in ((1, 2), (0, 2), (0, 1))], axis=-1)
+        det = (g[..., 0, 0] * cof[..., 0] - g[..., 0, 1] * (g[..., 0, 1] * g[..., 2, 2] - g[..., 0, 2] * g[..., 1, 2])
+               + g[..., 0, 2] * (g[..., 0, 1] * g[..., 1, 2] - g[..., 0, 2] * g[..., 1, 1]))
+    # Spur von HᵀH ist n; relativ dazu verschwindende Determinante = Richtung unbestimmt
+    out = np.full_like(cof, np.inf)
+    singular = det <= 1e-9 * len(anchors) ** g.shape[-1]
+    np.divide(cof, det[..., None], out=out, where=~singular[..., None])
+    return out
+
+def pdop(anchors, points) -> np.ndarray:
+    """PDOP für Punkte (..., dim), vektorisiert über alle Punkte."""
+    return np.sqrt(dop_components(anchors, points).sum(axis=-1))
+
+def check_geometry(anchor_positions: dict) -> list[str]:
+    """Probleme eines Layouts, die nicht von der Tag-Position abhängen (leer: in Ordnung)."""
+    macs = sorted(anchor_positions)
+    a = np.array([anchor_positions[m] for m in macs], dtype=float)
+    n, dim = a.shape
+    problems = []
+    if n < 3:
+        problems.append(f"nur {n} Anker, ein Fix braucht mindestens 3")
+    for i in range(n):
+        for j in range(i + 1, n):
+            d = np.linalg.norm(a[i] - a[j])
+            if d < MIN_SPACING:
+                problems.append(f"Anker 0x{macs[i]:04X} und 0x{macs[j]:04X} nur {d:.0f} cm auseinander")
+    if n >= 3:
+        s = np.linalg.svd(a - a.mean(axis=0), compute_uv=False)
+        if s[1] < FLATNESS * s[0]:
+            problems.append("Anker liegen (fast) auf einer Geraden, quer dazu ist keine Position bestimmbar")
+        elif dim == 3 and n > 3 and s[2] < FLATNESS * s[0]:
+            problems.append("alle Anker liegen (fast) in einer Ebene, z ist nahe dieser Ebene unbestimmt")
+    return problems
+
+class DopMap:
+    """
+    PDOP auf einem Raster über den Laborbereich, Nachschlagen in O(1).
+    `area` wie "bereich" in uwb/anker.json: "x", "y", "z" als [min, max] und
+    "raster" in cm; fehlende Achsen reichen DEFAULT_MARGIN über die Anker.
+    """
+
+    def __init__(self, anchor_positions: dict, area: dict | None = None, resolution: float | None = None,
+                 range_std: float = DEFAULT_RANGE_STD):
+        self.anchors = {mac: np.asarray(p, dtype=float) for mac, p in anchor_positions.items()}
+        self._anchor_array = a = np.array(list(self.anchors.values()))
+        self.dim = a.shape[1]
+        area = area or {}
+        self.resolution = float(resolution or area.get("raster", DEFAULT_RESOLUTION))
+        self.range_std = range_std
+        bounds = [area.get(axis) or (a[:, k].min() - DEFAULT_MARGIN, a[:, k].max() + DEFAULT_MARGIN)
+                  for k, axis in enumerate("xyz"[:self.dim])]
+        self.lo = [float(lo) for lo, _ in bounds]
+        self.shape = tuple(int((hi - lo) / self.resolution + 1e-9) + 1 for lo, hi in bounds)
+        self.axes = [lo + self.resolution * np.arange(n) for lo, n in zip(self.lo, self.shape)]
+
+        t0 = time.perf_counter()
+        points = np.stack(np.meshgrid(*self.axes, indexing="ij"), axis=-1)
+        self.components = dop_components(a, points).astype(np.float32)   # (nx, ny[, nz], dim)
+        self.pdop = np.sqrt(self.components.sum(axis=-1))
+        self.build_time = time.perf_counter() - t0
+
+    @property
+    def cells(self) -> int:
+        return self.pdop.size
+
+    def index(self, pos) -> tuple[int, ...] | None:
+        """Rasterindex der nächsten Zelle, None außerhalb des Bereichs."""
+        try:
+            idx = tuple(int(round((float(p) - lo) / self.resolution)) for p, lo in zip(pos, self.lo))
+        except (ValueError, OverflowError):
+            return None                                     # NaN/inf in der Position
+        for i, n in zip(idx, self.shape):
+            if not 0 <= i < n:
+                return None
+        return idx
+
+    def lookup(self, pos) -> float:
+        """PDOP an `pos` aus dem Raster, außerhalb des Bereichs direkt gerechnet; NaN für NaN-Positionen."""
+        idx = self.index(pos)
+        if idx is not None:
+            return float(self.pdop[idx])
+        pos = np.asarray(pos, dtype=float)[:self.dim]
+        return float(pdop(self._anchor_array, pos)) if np.isfinite(pos).all() else math.nan
+
+    def expected_error(self, pos) -> float:
+        """σ_r · PDOP in cm."""
+        return self.range_std * self.lookup(pos)
+
+    def lookup_many(self, positions) -> np.ndarray:
+        """PDOP für Positionen (N, dim) auf einmal, z.B. für ausgewertete Logs."""
+        positions = np.asarray(positions, dtype=float)[:, :self.dim]
+        out = np.full(len(positions), np.nan)
+        with np.errstate(invalid="ignore"):
+            idx = np.rint((positions - self.lo) / self.resolution)
+            inside = np.all((idx >= 0) & (idx < self.shape), axis=1)
+        out[inside] = self.pdop[tuple(idx[inside].astype(int).T)]
+        outside = ~inside & np.isfinite(positions).all(axis=1)
+        out[outside] = pdop(self._anchor_array, positions[outside])
+        return out
+
+    def summary(self, max_pdop: float = MAX_PDOP) -> str:
+        finite = self.pdop[np.isfinite(self.pdop)]
+        bad = np.count_nonzero(~(self.pdop <= max_pdop)) / self.cells
+        median = f"{np.median(finite):.1f}" if len(finite) else "–"
+        return (f"DOP-Karte {'×'.join(map(str, self.shape))} Zellen à {self.resolution:g} cm "
+                f"in {self.build_time * 1e3:.0f} ms: PDOP Median {median}, {bad:.0%} über {max_pdop:g} "
+                f"(erwarteter Fehler > {self.range_std * max_pdop:.0f} cm bei σ_r = {self.range_std:g} cm)")
+
+    def layer(self, z: float | None = None) -> tuple[np.ndarray, float | None]:
+        """PDOP-Schicht (nx, ny) bei Höhe z (3D; ohne z die mittlere), dazu die Höhe der Schicht."""
+        if self.dim == 2:
+            return self.pdop, None
+        k = self.shape[2] // 2 if z is None else int(np.clip(round((z - self.lo[2]) / self.resolution),
+                                                             0, self.shape[2] - 1))
+        return self.pdop[:, :, k], float(self.axes[2][k])
+
+    def ascii_map(self, max_pdop: float = MAX_PDOP, z: float | None = None, width: int = 78) -> str:
+        """
+        Karte einer Schicht, y nach oben: "." PDOP ≤ 2, "o" ≤ max_pdop,
+        "#" darüber bzw. unbestimmt, "A" Anker.
+        """
+        grid, _ = self.layer(z)
+        step = max(1, math.ceil(grid.shape[0] / width))
+        chars = np.where(grid <= GOOD_PDOP, ".", np.where(grid <= max_pdop, "o", "#"))
+        for p in self.anchors.values():
+            idx = self.index(p[:2])                         # zip: nur x und y
+            if idx is not None:
+                chars[idx[0], idx[1]] = "A"
+        rows = chars[::step, ::-step].T                   # x nach rechts, y nach oben
+        return "\n".join("".join(row) for row in rows)
+
+class GeometryAlarm:
+    """Meldet, wenn Fixes in Zellen über `max_pdop` geraten und wieder heraus, ohne an der Grenze zu flattern."""
+
+    def __init__(self, max_pdop: float = MAX_PDOP, hysteresis: float = HYSTERESIS):
+        self.max_pdop = max_pdop
+        self.clear_pdop = hysteresis * max_pdop
+        self.degraded = False
+
+    def update(self, pdop: float) -> bool | None:
+        """True beim Eintritt in schlechte Geometrie, False beim Verlassen, sonst None (auch bei NaN)."""
+        if not self.degraded and pdop > self.max_pdop:
+            self.degraded = True
+            return True
+        if self.degraded and pdop <= self.clear_pdop:
+            self.degraded = False
+            return False
+        return None
+
+# --------------------------------------------------------------------------- #
+#  Kommandozeile
+# --------------------------------------------------------------------------- #
+def save_png(dop_map: DopMap, path: str, max_pdop: float, z: float | None):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    grid, z = dop_map.layer(z)
+    fig, ax = plt.subplots(figsize=(8, 6))
+    extent = [dop_map.axes[0][0], dop_map.axes[0][-1], dop_map.axes[1][0], dop_map.axes[1][-1]]
+    img = ax.imshow(np.minimum(grid, 4 * max_pdop).T, origin="lower", extent=extent, cmap="viridis_r")
+    ax.contour(dop_map.axes[0], dop_map.axes[1], grid.T, levels=[max_pdop], colors="red")
+    for mac, p in dop_map.anchors.items():
+        ax.plot(p[0], p[1], "k^")
+        ax.annotate(f"0x{mac:04X}", p[:2], textcoords="offset points", xytext=(5, 5))
+    fig.colorbar(img, ax=ax, label="PDOP")
+    ax.set_xlabel("x [cm]")
+    ax.set_ylabel("y [cm]")
+    ax.set_title("PDOP" + ("" if z is None else f" bei z = {z:g} cm") + f", rot: PDOP = {max_pdop:g}")
+    fig.savefig(path, dpi=120)
+
+def main():
+    from .config import add_layout_arguments, area_from_args, layout_from_args
+
+    parser = argparse.ArgumentParser(description="Geometrie eines Anker-Layouts prüfen (DOP-Karte)")
+    add_layout_arguments(parser)
+    parser.add_argument("--dim", type=int, choices=[2, 3], default=None,
+                        help="2D oder 3D rechnen (default: nach den Koordinaten des Layouts)")
+    parser.add_argument("--raster", type=float, default=None, help="Rasterweite in cm (default: aus dem Layout oder 10)")
+    parser.add_argument("--max-pdop", type=float, default=MAX_PDOP,
+                        help=f"Ab diesem PDOP gilt die Geometrie als unbrauchbar (default: {MAX_PDOP:g})")
+    parser.add_argument("--range-std", type=float, default=DEFAULT_RANGE_STD,
+                        help=f"Streuung einer Distanz in cm für den erwarteten Fehler (default: {DEFAULT_RANGE_STD:g})")
+    parser.add_argument("--z", type=float, default=None, help="Höhe der Karte in cm (3D, default: Mitte des Bereichs)")
+    parser.add_argument("--png", default=None, metavar="DATEI", help="Karte zusätzlich als Bild speichern (matplotlib)")
+    args = parser.parse_args()
+
+    try:
+        anchors = layout_from_args(args, args.dim)
+        if args.dim is None:
+            anchors = layout_from_args(args, max(len(p) for p in anchors.values()))
+        area = area_from_args(args)
+    except (OSError, ValueError) as e:
+        parser.exit(1, f"{e}\n")
+
+    problems = check_geometry(anchors)
+    for problem in problems:
+        print(f"WARNUNG: {problem}")
+    dop_map = DopMap(anchors, area, args.raster, args.range_std)
+    dim = dop_map.dim
+    if dim == 3 and len(anchors) == 3:
+        print("Hinweis: 3 Anker in 3D, z nur bis auf Spiegelung an der Ankerebene bestimmt "
+              "(die Lösung näher am Boden wird genommen)")
+    print(dop_map.summary(args.max_pdop))
+
+    finite = np.isfinite(dop_map.pdop)
+    print(f"PDOP min {dop_map.pdop[finite].min():.2f}, P95 {np.percentile(dop_map.pdop[finite], 95):.1f}, "
+          f"{np.count_nonzero(~finite)} Zellen unbestimmt" if finite.any() else "Keine Zelle bestimmt")
+    if dim == 3:
+        # Je Höhe: wo bricht vor allem z ein?
+        print(f"\n{'z [cm]':>8} {'PDOP Median':>12} {'VDOP Median':>12} {'> ' + format(args.max_pdop, 'g'):>8}")
+        vdop = np.sqrt(dop_map.components[..., 2])
+        for k, z in enumerate(dop_map.axes[2]):
+            layer = dop_map.pdop[:, :, k]
+            bad = np.count_nonzero(~(layer <= args.max_pdop)) / layer.size
+            print(f"{z:8.0f} {np.median(layer):12.1f} {np.median(vdop[:, :, k]):12.1f} {bad:8.0%}")
+    grid, z = dop_map.layer(args.z)
+    print(f"\nKarte{'' if z is None else f' bei z = {z:g} cm'} "
+          f"(x {dop_map.axes[0][0]:g} … {dop_map.axes[0][-1]:g} cm nach rechts, "
+          f"y {dop_map.axes[1][0]:g} … {dop_map.axes[1][-1]:g} cm nach oben; "
+          f". PDOP ≤ {GOOD_PDOP:g}, o ≤ {args.max_pdop:g}, # darüber, A Anker):")
+    print(dop_map.ascii_map(args.max_pdop, args.z))
+    if args.png:
+        save_png(dop_map, args.png, args.max_pdop, args.z)
+        print(f"\nBild gespeichert: {args.png}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tracking für viele Tags gleichzeitig
+
+`TagTable` hält den Zustand aller Tags in vorallokierten Arrays, eine Zeile
+pro Tag; die Tag-ID (Seriennummer, Name, Zahl) wird über ein Dict auf die
+Zeile abgebildet. Eingehende Frames legen nur ihre Distanzen in der Zeile
+ab (`ingest()`; kommt vor dem nächsten Tick ein neuerer Frame, gewinnt
+dieser). `step()` löst einmal pro Tick alle fälligen Tags gemeinsam:
+Trilateration bzw. Multilateration gruppiert nach Ankermenge wie in
+`uwb/reprocess.py`, danach ein Konstantgeschwindigkeits-Kalmanfilter auf
+den Positionen (wie `Tracker` mit mode="position") für alle Zeilen als
+Batch. Reicht die Kapazität nicht, wird sie verdoppelt.
+
+`TrackingServer` liest mehrere Initiatoren (ein reader_thread pro Port,
+eine gemeinsame RingQueue), ruft `step()` mit fester Tickrate auf und
+reicht jedes Ergebnis als `FixBatch` an alle Abonnenten (`subscribe()`).
+"""
+import logging
+import threading
+import time
+from queue import Empty
+from typing import Callable, Hashable, NamedTuple
+
+import numpy as np
+
+from .anchors import AnchorSet
+from .framing import reader_thread
+from .multilateration import Multilaterator
+from .parsing import parse_distances
+from .pipeline import RingQueue
+from .tracking import GATE_CHI2
+from .trilateration import trilaterate_frame
+
+DEFAULT_CAPACITY = 64
+DEFAULT_RATE = 50.0             # Ticks pro Sekunde
+QUEUE_SIZE = 4096               # Frames aller Tags zwischen Readern und Tick
+READ_TIMEOUT = 0.05             # s
+
+# --------------------------------------------------------------------------- #
+#  Ergebnis eines Ticks
+# --------------------------------------------------------------------------- #
+class FixBatch(NamedTuple):
+    t: float                    # Zeitpunkt des Ticks (time.monotonic())
+    tags: list[Hashable]        # Tag-IDs, eine pro Zeile
+    rows: np.ndarray            # (m,) Zeilen in der TagTable, als Tag-Nummer fest für die Laufzeit
+    t_rx: np.ndarray            # (m,) Empfangszeit des verwendeten Frames
+    positions: np.ndarray       # (m, dim) [cm], gefiltert bzw. roh
+    velocities: np.ndarray      # (m, dim) [cm/s], 0 ohne Filter
+    sigma: np.ndarray           # (m,) Wurzel der Spur der Positionskovarianz [cm], NaN ohne Filter
+    measured: np.ndarray        # (m,) False: Fix verworfen oder fehlend, Position nur prädiziert
+
+    @property
+    def count(self) -> int:
+        return len(self.tags)
+
+# --------------------------------------------------------------------------- #
+#  Zustand aller Tags
+# --------------------------------------------------------------------------- #
+class TagTable:
+    """Solver- und Filterzustand aller Tags in Arrays, Zeile = Tag."""
+
+    # Arrays, die beim Vergrößern mitwachsen, samt Füllwert
+    _ARRAYS = (("ranges", np.nan), ("t_rx", 0.0), ("due", False), ("x", 0.0), ("P", 0.0),
+               ("t", 0.0), ("t_update", 0.0), ("initialized", False), ("rejects", 0))
+
+    def __init__(self, anchor_positions: dict[int, np.ndarray], capacity: int = DEFAULT_CAPACITY,
+                 filter: bool = True, accel_std: float = 100.0, position_std: float = 10.0,
+                 max_coast: float = 1.0, max_rejects: int = 10):
+        if capacity < 1:
+            raise ValueError("capacity muss mindestens 1 sein")
+        self.anchors = {mac: np.asarray(p, dtype=float) for mac, p in anchor_positions.items()}
+        self.macs = sorted(self.anchors)
+        self.dim = d = len(next(iter(self.anchors.values())))
+        self._col = {mac: k for k, mac in enumerate(self.macs)}
+        self._bits = 1 << np.arange(len(self.macs), dtype=np.int64)
+        self.anchor_set = AnchorSet(self.anchors) if d == 3 else None
+        self.solver = Multilaterator(self.anchors)
+
+        self.filter = filter
+        self.q = accel_std ** 2
+        self.r_pos = position_std ** 2
+        self.max_coast = max_coast
+        self.max_rejects = max_rejects
+        n = 2 * d
+        self._P0 = np.diag([self.r_pos] * d + [100.0 ** 2] * d)    # Geschwindigkeit unbekannt, ~1 m/s
+        self._R = self.r_pos * np.eye(d)
+        self._diag = np.arange(d)
+
+        self.capacity = capacity
+        self.ids: list[Hashable] = []
+        self._rows: dict[Hashable, int] = {}
+        self.ranges = np.full((capacity, len(self.macs)), np.nan)
+        self.t_rx = np.zeros(capacity)
+        self.due = np.zeros(capacity, dtype=bool)
+        self.x = np.zeros((capacity, n))
+        self.P = np.zeros((capacity, n, n))
+        self.t = np.zeros(capacity)
+        self.t_update = np.zeros(capacity)
+        self.initialized = np.zeros(capacity, dtype=bool)
+        self.rejects = np.zeros(capacity, dtype=np.int32)
+
+        self.frames = 0
+        self.superseded = 0         # Frames, die vor dem Tick von einem neueren ersetzt wurden
+        self.fixes = 0
+        self.rejected = 0
+        self.ticks = 0
+        self.cpu = 0.0              # s Prozesszeit in step()
+
+    # ---- Tags --------------------------------------------------------------- #
+    def row(self, tag: Hashable) -> int:
+        """Zeile des Tags, legt neue Tags an."""
+        row = self._rows.get(tag)
+        if row is None:
+            row = len(self.ids)
+            if row == self.capacity:
+                self._grow()
+            self._rows[tag] = row
+            self.ids.append(tag)
+        return row
+
+    def _grow(self):
+        cap = self.capacity
+        for name, fill in self._ARRAYS:
+            old = getattr(self, name)
+            new = np.full((2 * cap,) + old.shape[1:], fill, dtype=old.dtype)
+            new[:cap] = old
+            setattr(self, name, new)
+        self.capacity = 2 * cap
+
+    def ingest(self, tag: Hashable, t_rx: float, dists: dict[int, float]):
+        """Legt die Distanzen eines Frames für den nächsten Tick ab."""
+        row = self.row(tag)
+        self.frames += 1
+        if self.due[row]:
+            self.superseded += 1
+        r = self.ranges[row]
+        r.fill(np.nan)
+        col = self._col
+        for mac, dist in dists.items():
+            k = col.get(mac)
+            if k is not None:
+                r[k] = dist
+        self.t_rx[row] = t_rx
+        self.due[row] = True
+
+    def ingest_frame(self, tag: Hashable, t_rx: float, msg: bytes):
+        self.ingest(tag, t_rx, parse_distances(msg, min_count=1) or {})
+
+    # ---- Lösen -------------------------------------------------------------- #
+    def solve(self, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Rohe Fixes der Zeilen `rows`, gruppiert nach Ankermenge: (Positionen, gültig)."""
+        r = self.ranges[rows]
+        ok = np.isfinite(r)
+        keys = ok @ self._bits
+        keys[ok.sum(axis=1) < 3] = 0
+        pos = np.full((len(rows), self.dim), np.nan)
+        for key in np.unique(keys):
+            if key == 0:
+                continue
+            sel = keys == key
+            cols = np.flatnonzero(ok[np.argmax(sel)])
+            macs = tuple(self.macs[k] for k in cols)
+            frame = self.anchor_set.frame(macs) if self.anchor_set is not None and len(macs) == 3 else None
+            if frame is not None:
+                pos[sel], _ = trilaterate_frame(frame, r[sel][:, cols])
+            else:
+                pos[sel], _ = self.solver.solve_batch(macs, r[sel][:, cols])
+        return pos, np.isfinite(pos).all(axis=1)
+
+    # ---- Filter (alle Zeilen als Batch) ------------------------------------- #
+    def _reset(self, rows: np.ndarray, t: np.ndarray, pos: np.ndarray):
+        d = self.dim
+        self.x[rows, :d] = pos
+        self.x[rows, d:] = 0.0
+        self.P[rows] = self._P0
+        self.t[rows] = self.t_update[rows] = t
+        self.rejects[rows] = 0
+        self.initialized[rows] = True
+
+    def _predict(self, rows: np.ndarray, t: np.ndarray):
+        d, q, i = self.dim, self.q, self._diag
+        dt = np.maximum(t - self.t[rows], 0.0)
+        self.t[rows] = np.maximum(t, self.t[rows])
+        self.x[rows, :d] += dt[:, None] * self.x[rows, d:]
+
+        # F P F^T blockweise mit F = [[I, dt I], [0, I]], dann + Q
+        P = self.P[rows]
+        dt3 = dt[:, None, None]
+        A, B, C, D = P[:, :d, :d], P[:, :d, d:], P[:, d:, :d], P[:, d:, d:]
+        A += dt3 * (B + C) + dt3 * dt3 * D
+        B += dt3 * D
+        C += dt3 * D
+        A[:, i, i] += (q * dt ** 3 / 3)[:, None]
+        B[:, i, i] += (q * dt ** 2 / 2)[:, None]
+        C[:, i, i] += (q * dt ** 2 / 2)[:, None]
+        D[:, i, i] += (q * dt)[:, None]
+        self.P[rows] = P
+
+    def _update(self, rows: np.ndarray, pos: np.ndarray) -> np.ndarray:
+        """Lineares Positions-Update mit Chi²-Gate; liefert die Maske der akzeptierten Zeilen."""
+        d = self.dim
+        x, P = self.x[rows], self.P[rows]
+        y = pos - x[:, :d]
+        S = P[:, :d, :d] + self._R
+        Sinv_y = np.linalg.solve(S, y[:, :, None])[:, :, 0]
+        accepted = np.einsum("ni,ni->n", y, Sinv_y) <= GATE_CHI2[d]
+        if accepted.any():
+            a = accepted
+            K = np.linalg.solve(S[a], P[a, :d, :]).transpose(0, 2, 1)     # S symmetrisch: K = P H^T S^-1
+            x[a] += np.einsum("nij,nj->ni", K, y[a])
+            P[a] -= K @ P[a, :d, :]
+            self.x[rows], self.P[rows] = x, P
+        return accepted
+
+    def step(self, now: float | None = None) -> FixBatch | None:
+        """Löst und filtert alle Tags mit neuem Frame; None, wenn keiner fällig ist."""
+        c0 = time.process_time()
+        now = time.monotonic() if now is None else now
+        rows = np.flatnonzero(self.due)
+        if not len(rows):
+            return None
+        self.ticks += 1
+        self.due[rows] = False
+        pos, valid = self.solve(rows)
+        t = self.t_rx[rows]
+        d = self.dim
+
+        if not self.filter:
+            rows, t, pos = rows[valid], t[valid], pos[valid]
+            measured = np.ones(len(rows), dtype=bool)
+            velocities, sigma = np.zeros_like(pos), np.full(len(rows), np.nan)
+        else:
+            run = self.initialized[rows]
+            fresh = ~run & valid
+            if fresh.any():
+                self._reset(rows[fresh], t[fresh], pos[fresh])
+            measured = valid.copy()
+            if run.any():
+                r, tr = rows[run], t[run]
+                self._predict(r, tr)
+                ok = np.zeros(len(r), dtype=bool)
+                m = valid[run]
+                if m.any():
+                    ok[m] = self._update(r[m], pos[run][m])
+                self.t_update[r[ok]] = tr[ok]
+                self.rejects[r[ok]] = 0
+                rejected = r[m & ~ok]
+                self.rejects[rejected] += 1
+                self.rejected += len(rejected)
+                measured[run] = ok
+
+                # Ziel verloren: mit dem nächsten Fix neu aufsetzen
+                lost = (tr - self.t_update[r] > self.max_coast) | (self.rejects[r] > self.max_rejects)
+                if lost.any():
+                    self.initialized[r[lost]] = False
+                    again = lost & m
+                    if again.any():
+                        self._reset(r[again], tr[again], pos[run][again])
+                        measured[np.flatnonzero(run)[again]] = True
+            out = self.initialized[rows]
+            rows, t, measured = rows[out], t[out], measured[out]
+            x = self.x[rows]
+            pos, velocities = x[:, :d], x[:, d:]
+            sigma = np.sqrt(np.trace(self.P[rows, :d, :d], axis1=1, axis2=2))
+
+        self.fixes += int(measured.sum())
+        self.cpu += time.process_time() - c0
+        return FixBatch(now, [self.ids[k] for k in rows], rows, t, pos, velocities, sigma, measured)
+
+    def report(self) -> str:
+        rate = f"{self.fixes / self.cpu:.0f} Fixes/s pro Kern" if self.cpu > 0 else "keine Rechenzeit"
+        return (f"{len(self.ids)} Tags, {self.frames} Frames ({self.superseded} vor dem Tick ersetzt), "
+                f"{self.fixes} Fixes in {self.ticks} Ticks, {self.rejected} verworfen; "
+                f"{self.cpu:.2f} s CPU, {rate}")
+
+# --------------------------------------------------------------------------- #
+#  Server
+# --------------------------------------------------------------------------- #
+class _TagQueue:
+    """Versieht die (t_rx, msg)-Einträge eines reader_thread mit der Tag-ID."""
+
+    def __init__(self, queue: RingQueue, tag: Hashable):
+        self.queue = queue
+        self.tag = tag
+
+    def put(self, item):
+        self.queue.put((self.tag, *item))
+
+class TrackingServer:
+    """Liest mehrere Initiatoren, löst pro Tick alle Tags und verteilt die Ergebnisse."""
+
+    def __init__(self, table: TagTable, rate: float = DEFAULT_RATE, queue_size: int = QUEUE_SIZE,
+                 policy: str = "drop-oldest"):
+        self.table = table
+        self.period = 1.0 / rate
+        self.queue = RingQueue(queue_size, policy)
+        self.running = threading.Event()
+        self.running.set()
+        self._subscribers: list[Callable[[FixBatch], None]] = []
+        self._readers: list[threading.Thread] = []
+
+    def subscribe(self, callback: Callable[[FixBatch], None]):
+        """`callback(batch)` bekommt nach jedem Tick alle neuen Fixes."""
+        self._subscribers.append(callback)
+
+    def add_port(self, tag: Hashable, ser):
+        """Startet einen Reader für den Initiator `tag` auf dem geöffneten Port `ser`."""
+        self.table.row(tag)
+        t = threading.Thread(target=reader_thread, args=(ser, _TagQueue(self.queue, tag), self.running,
+                                                         READ_TIMEOUT),
+                             name=f"reader-{tag}", daemon=True)
+        t.start()
+        self._readers.append(t)
+
+    def put(self, tag: Hashable, t_rx: float, msg: bytes):
+        """Frame aus einer anderen Quelle (Replay, Netzwerk) einspeisen."""
+        self.queue.put((tag, t_rx, msg))
+
+    def tick(self, now: float | None = None) -> FixBatch | None:
+        """Übernimmt alle wartenden Frames, löst und verteilt das Ergebnis."""
+        while not self.queue.empty():
+            self.table.ingest_frame(*self.queue.get())
+        batch = self.table.step(now)
+        if batch is not None:
+            self.publish(batch)
+        return batch
+
+    def publish(self, batch: FixBatch):
+        for callback in self._subscribers:
+            try:
+                callback(batch)
+            except Exception as err:
+                logging.warning("Abonnent %s: %s", getattr(callback, "__name__", callback), err)
+
+    def run(self):
+        """Tick-Schleife bis stop(); Frames werden zwischen den Ticks übernommen."""
+        table, queue = self.table, self.queue
+        next_tick = time.monotonic() + self.period
+        while self.running.is_set():
+            while (left := next_tick - time.monotonic()) > 0:
+                try:
+                    table.ingest_frame(*queue.get(timeout=left))
+                except Empty:
+                    break
+            self.tick()
+            next_tick = max(next_tick + self.period, time.monotonic())
+
+    def stop(self):
+        self.running.clear()
+        for t in self._readers:
+            t.join(timeout=2)
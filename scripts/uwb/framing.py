@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Inkrementelles Framing der SESSION_INFO_NTF-Nachrichten
+
+Der Puffer ist ein `bytearray` mit Scan-Offset: jedes Byte wird höchstens
+einmal nach Start- und Endmarke durchsucht, verarbeitete Bytes werden vorne
+abgeschnitten (bei `bytearray` ohne Umkopieren). Frames werden als
+`memoryview` ohne Kopie geliefert.
+"""
+import logging
+import threading
+import time
+from queue import Queue
+from typing import Iterable, Iterator
+
+import serial
+
+FRAME_START = b"SESSION_INFO_NTF"
+FRAME_END   = b"}"
+
+_NO_FRAMES: tuple = ()
+
+class SessionFramer:
+    """
+    Zerlegt einen Bytestrom in SESSION_INFO_NTF-Frames (vom Tag bis einschließlich "}").
+
+    Die gelieferten `memoryview`s zeigen direkt in den internen Puffer und
+    werden freigegeben, sobald der nächste Frame angefordert wird; wer sie
+    länger braucht, muss sie kopieren (`bytes(frame)`).
+    """
+
+    def __init__(self, max_frame: int = 4096):
+        self.max_frame = max_frame
+        self._buf = bytearray()
+        self._consumed = 0      # alles davor ist verarbeitet oder Müll
+        self._scan = 0          # ab hier wird weitergesucht
+        self._start = -1        # Anfang des aktuellen Frames, -1 = kein Frame offen
+        self.frames = 0
+        self.dropped_bytes = 0
+
+    def _find_start(self) -> bool:
+        start = self._buf.find(FRAME_START, self._scan)
+        if start < 0:
+            # Nur ein angeschnittenes Tag am Ende kann noch relevant sein
+            keep = max(self._scan, len(self._buf) - len(FRAME_START) + 1)
+            self.dropped_bytes += keep - self._consumed
+            self._consumed = self._scan = keep
+            return False
+        self.dropped_bytes += start - self._consumed
+        self._start = start
+        self._scan = start + len(FRAME_START)
+        return True
+
+    def feed(self, data: bytes) -> Iterable[memoryview]:
+        """Hängt `data` an und liefert alle jetzt vollständigen Frames."""
+        buf = self._buf
+        consumed = self._consumed
+        if consumed:
+            del buf[:consumed]
+            self._scan -= consumed
+            if self._start >= 0:
+                self._start -= consumed
+            self._consumed = 0
+        buf += data
+        if FRAME_END in data:
+            return self._frames()
+
+        # Schneller Pfad: ohne Endmarke in den neuen Bytes kann kein Frame fertig sein
+        if self._start < 0 and not self._find_start():
+            return _NO_FRAMES
+        if len(buf) - self._start > self.max_frame:
+            return self._frames()
+        self._scan = len(buf)
+        return _NO_FRAMES
+
+    def _frames(self) -> Iterator[memoryview]:
+        buf = self._buf
+        view = memoryview(buf)
+        frame = None
+        try:
+            while self._start >= 0 or self._find_start():
+                end = buf.find(FRAME_END, self._scan)
+                if end < 0:
+                    if len(buf) - self._start > self.max_frame:
+                        # Kein Ende in Sicht: Frame verwerfen und neu synchronisieren
+                        logging.warning("SESSION_INFO_NTF ohne Ende verworfen (%d Bytes)",
+                                        len(buf) - self._start)
+                        self._consumed = self._start
+                        self._scan = self._start + 1
+                        self._start = -1
+                        continue
+                    self._scan = len(buf)
+                    return
+
+                # Zustand vor dem yield fortschreiben, damit ein Abbruch keinen Frame doppelt liefert
+                start, self._start = self._start, -1
+                self._consumed = self._scan = end + 1
+                self.frames += 1
+                frame = view[start:end + 1]
+                yield frame
+                frame.release()
+        finally:
+            # Offene Views blockieren sonst das Vergrößern des Puffers
+            if frame is not None:
+                frame.release()
+            view.release()
+
+# --------------------------------------------------------------------------- #
+#  Reader-Thread
+# --------------------------------------------------------------------------- #
+def reader_thread(ser: serial.Serial, q: Queue, running: threading.Event,
+                  idle_sleep: float = 0.05):
+    """
+    Liest den Initiator, zerlegt den Strom in Frames und legt sie als
+    (t_rx, bytes) in `q`; t_rx ist time.monotonic() beim Empfang am Port.
+    """
+    framer = SessionFramer()
+    while running.is_set():
+        try:
+            data = ser.read(ser.in_waiting or 1)
+            if data:
+                t_rx = time.monotonic()
+                for frame in framer.feed(data):
+                    # Einzige Kopie: der Frame verlässt den Thread, geparst wird direkt auf bytes
+                    msg = bytes(frame)
+                    logging.debug("Verarbeitete Nachricht: %s", msg)
+                    q.put((t_rx, msg))
+            else:
+                time.sleep(idle_sleep)
+        except serial.SerialException as e:
+            logging.warning("Serielle Ausnahme: %s – versuche weiter …", e)
+            time.sleep(1)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+asyncio-Hub für mehrere serielle Module
+
+Alle Module laufen auf einer Eventloop in einem einzigen Thread, egal wie
+viele Anker und Tags angeschlossen sind. Ports mit Dateideskriptor (Linux,
+macOS) werden über `loop.add_reader()` bedient, alle anderen (sim://,
+Windows) per kurzem Polling von `in_waiting`. Empfangene Zeilen laufen als
+asynchroner Strom (`lines()`) zum Verbraucher. `stop()` beendet sofort,
+ohne auf readline-Timeouts zu warten, und schickt jedem Modul STOP.
+Der Startbefehl geht ohne Wartezeit raus; `delay` ist nur noch die Frist,
+nach der eine fehlende Quittung gemeldet wird. Welche Ports sich öffnen
+ließen, steht danach in `opened`.
+"""
+import asyncio
+import threading
+from contextlib import aclosing
+from typing import AsyncIterator, Callable
+
+from .commands import is_ack
+from .ports import open_port
+
+class SerialHub:
+    """Multiplext mehrere Module auf einer asyncio-Eventloop."""
+
+    def __init__(self, ports: list[str], commands: list[str | None], baudrate: int = 115200,
+                 delay: float = 0.5, poll_interval: float = 0.005, queue_size: int = 1024):
+        if len(commands) != len(ports):
+            raise ValueError("Für jeden Port wird ein Befehl (oder None) erwartet")
+        self.ports = ports
+        self.commands = commands
+        self.baudrate = baudrate
+        self.delay = delay
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self.line_counts = [0] * len(ports)
+        self.opened = [False] * len(ports)
+        self._thread: threading.Thread | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stop: asyncio.Event | None = None
+        self._ready = threading.Event()
+        self._stop_requested = False
+
+    # ---- Steuerung aus anderen Threads -------------------------------------- #
+    def start(self, consumer: Callable[[int, str], None]):
+        """Startet den Hub-Thread; `consumer(i, line)` wird für jede Zeile aufgerufen."""
+        self._thread = threading.Thread(target=asyncio.run, args=(self._main(consumer),),
+                                        name="SerialHub", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Beendet alle Module sofort (threadsicher)."""
+        self._stop_requested = True
+        if self._ready.wait(timeout=1) and self._loop is not None and not self._loop.is_closed():
+            try:
+                self._loop.call_soon_threadsafe(self._stop.set)
+            except RuntimeError:
+                pass                                # Loop schon beendet
+
+    def is_alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def join(self, timeout: float | None = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    # ---- Eventloop ---------------------------------------------------------- #
+    async def _main(self, consumer: Callable[[int, str], None]):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        self._queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self._ready.set()
+        if self._stop_requested:
+            return
+
+        devices = [asyncio.create_task(self._device(i, port, cmd))
+                   for i, (port, cmd) in enumerate(zip(self.ports, self.commands))]
+        dispatch = asyncio.create_task(self._dispatch(consumer))
+        stop = asyncio.create_task(self._stop.wait())
+        # Läuft bis stop() oder bis kein Modul mehr liest
+        await asyncio.wait([stop, asyncio.gather(*devices, return_exceptions=True)],
+                           return_when=asyncio.FIRST_COMPLETED)
+        for task in (*devices, dispatch, stop):
+            task.cancel()
+        await asyncio.gather(*devices, dispatch, stop, return_exceptions=True)
+
+    async def lines(self) -> AsyncIterator[tuple[int, str]]:
+        """Asynchroner Strom aller empfangenen Zeilen als (Geräteindex, Zeile)."""
+        while True:
+            yield await self._queue.get()
+
+    async def _dispatch(self, consumer: Callable[[int, str], None]):
+        async for i, line in self.lines():
+            try:
+                consumer(i, line)
+            except SystemExit:
+                # Processor beendet die Messung (z.B. stat --time)
+                self._stop.set()
+                return
+            except Exception as err:
+                print(f"[{i}] Fehler: {err}")
+
+    async def _device(self, i: int, port: str, cmd: str | None):
+        ser = sent = warn = None
+        try:
+            ser = open_port(port, baudrate=self.baudrate, timeout=0)
+            self.opened[i] = True
+            print(f"[{i}] Serielle Verbindung geöffnet.")
+            if cmd:
+                print(f"[{i}] Schicke Befehl: {cmd}")
+                ser.write(f"{cmd}\n".encode("utf-8"))
+                sent = self._loop.time()
+                if self.delay:
+                    warn = self._loop.call_later(self.delay, print,
+                                                 f"[{i}] Keine Quittung für {cmd} nach {self.delay * 1e3:.0f} ms")
+            buf = bytearray()
+            # aclosing: Reader wird vor ser.close() abgemeldet
+            async with aclosing(self._chunks(ser)) as chunks:
+                async for data in chunks:
+                    buf += data
+                    start = 0
+                    while (end := buf.find(b"\n", start)) >= 0:
+                        line = buf[start:end].decode("utf-8", errors="ignore").strip()
+                        start = end + 1
+                        if line:
+                            if sent is not None and is_ack(line):
+                                print(f"[{i}] Befehl bestätigt nach {(self._loop.time() - sent) * 1e3:.1f} ms: {line}")
+                                sent = None
+                                if warn is not None:
+                                    warn.cancel()
+                            self.line_counts[i] += 1
+                            await self._queue.put((i, line))
+                    del buf[:start]
+        except asyncio.CancelledError:
+            print(f"[{i}] Stoppe Schnittstelle")
+            raise
+        except Exception as err:
+            print(f"[{i}] Fehler: {err}")
+        finally:
+            if warn is not None:
+                warn.cancel()
+            if ser is not None:
+                print(f"[{i}] Schicke Befehl: STOP")
+                try:
+                    ser.write(b"STOP\n")
+                    ser.flush()
+                finally:
+                    ser.close()
+
+    async def _chunks(self, ser) -> AsyncIterator[bytes]:
+        try:
+            fd = ser.fileno()
+        except (AttributeError, OSError):
+            fd = None
+
+        if fd is None:
+            # Kein Deskriptor (sim://, Windows): kurz pollen
+            while True:
+                n = ser.in_waiting
+                if n:
+                    yield ser.read(n)
+                else:
+                    await asyncio.sleep(self.poll_interval)
+        else:
+            ready = asyncio.Event()
+            self._loop.add_reader(fd, ready.set)
+            try:
+                while True:
+                    await ready.wait()
+                    ready.clear()
+                    data = ser.read(ser.in_waiting or 1)
+                    if data:
+                        yield data
+            finally:
+                self._loop.remove_reader(fd)
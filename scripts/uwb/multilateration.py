@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Multilateration mit beliebig vielen Ankern
+
+Linearisierte Kleinste-Quadrate-Lösung mit anschließender Gauss-Newton-
+Verfeinerung. Die Normalmatrix jeder Ankermenge wird einmal aus den
+Ankerpositionen vorberechnet, pro Fix bleibt ein kleines Matrixprodukt.
+"""
+import numpy as np
+
+# --------------------------------------------------------------------------- #
+#  Vorberechnetes Gleichungssystem
+# --------------------------------------------------------------------------- #
+class LinearSystem:
+    """
+    Linearisiertes System für eine feste Ankermenge.
+
+    Aus |x - p_i|^2 = r_i^2 folgt nach Abzug der Gleichung des ersten Ankers
+    2 (p_i - p_0) · x = r_0^2 - r_i^2 + |p_i - p_0|^2 (relativ zu p_0).
+    Gerechnet wird in der affinen Hülle der Anker; liegen 3D-Anker in einer
+    Ebene (z.B. genau drei Anker), wird die Höhe über der Ebene aus den
+    Residuen bestimmt und die Lösung näher am Boden gewählt.
+    """
+
+    def __init__(self, anchors: np.ndarray):
+        self.anchors = np.asarray(anchors, dtype=float)
+        k, self.dim = self.anchors.shape
+        self.origin = self.anchors[0]
+
+        # Orthonormalbasis der affinen Hülle
+        rel = self.anchors - self.origin
+        _, s, vt = np.linalg.svd(rel, full_matrices=True)
+        rank = int(np.sum(s > 1e-9 * max(s.max(initial=0.0), 1.0)))
+        self.basis = vt[:rank]                      # (m, dim)
+        self.normal = vt[rank] if rank < self.dim else None
+        self.solvable = k >= 3 and (rank == self.dim or (self.dim == 3 and rank == 2))
+        if not self.solvable:
+            return
+
+        # Die Lösung mit dem niedrigeren z-Wert liegt auf der Seite -normal[2]
+        if self.normal is not None and self.normal[2] > 0:
+            self.normal = -self.normal
+
+        self.local = rel @ self.basis.T             # (k, m)
+        A = 2 * self.local[1:]                      # (k-1, m)
+        # Pseudoinverse (A^T A)^-1 A^T, einmalig vorberechnet
+        self.pinv = np.linalg.solve(A.T @ A, A.T)   # (m, k-1)
+        self.const = np.sum(self.local[1:]**2, axis=1)
+
+    def linear(self, ranges: np.ndarray) -> np.ndarray:
+        """Geschlossene LS-Lösung für (N, k) Distanzen."""
+        r2 = ranges * ranges
+        b = r2[:, :1] - r2[:, 1:] + self.const      # (N, k-1)
+        u = b @ self.pinv.T                         # (N, m)
+        pos = self.origin + u @ self.basis
+        if self.normal is not None:
+            # Höhe über der Ankerebene aus dem mittleren Residuum
+            diff = u[:, None, :] - self.local[None]
+            h2 = np.mean(r2 - np.sum(diff**2, axis=2), axis=1)
+            pos += np.sqrt(np.clip(h2, 0.0, None))[:, None] * self.normal
+        return pos
+
+    def refine(self, pos: np.ndarray, ranges: np.ndarray, iterations: int,
+               damping: float) -> np.ndarray:
+        """Gauss-Newton auf sum(|x - p_i| - r_i)^2, für alle N Fixes gleichzeitig."""
+        eye = damping * np.eye(self.dim)
+        for _ in range(iterations):
+            diff = pos[:, None, :] - self.anchors[None]          # (N, k, dim)
+            dist = np.linalg.norm(diff, axis=2)
+            J = diff / np.maximum(dist, 1e-9)[:, :, None]
+            res = dist - ranges
+            JtJ = np.einsum("nki,nkj->nij", J, J) + eye
+            Jtr = np.einsum("nki,nk->ni", J, res)
+            pos = pos - np.linalg.solve(JtJ, Jtr[:, :, None])[:, :, 0]
+        return pos
+
+# --------------------------------------------------------------------------- #
+#  Solver
+# --------------------------------------------------------------------------- #
+class Multilaterator:
+    """Löst Positionen aus allen gemeldeten Ankern (k >= 3) einer Ankerkonfiguration."""
+
+    def __init__(self, anchor_positions: dict[int, np.ndarray], iterations: int = 3,
+                 damping: float = 1e-6):
+        self.anchor_positions = {mac: np.asarray(p, dtype=float)
+                                 for mac, p in anchor_positions.items()}
+        self.iterations = iterations
+        self.damping = damping
+        self._systems: dict[tuple[int, ...], LinearSystem] = {}
+        # Normalmatrix der vollständigen Ankermenge direkt vorberechnen
+        self.system(tuple(sorted(self.anchor_positions)))
+
+    def system(self, macs: tuple[int, ...]) -> LinearSystem:
+        """Liefert das (gecachte) System für eine sortierte MAC-Kombination."""
+        system = self._systems.get(macs)
+        if system is None:
+            system = LinearSystem(np.array([self.anchor_positions[m] for m in macs]))
+            self._systems[macs] = system
+        return system
+
+    def solve_batch(self, macs, ranges) -> tuple[np.ndarray, np.ndarray]:
+        """Löst (N, k) Distanzen zu den Ankern `macs`: liefert (Positionen, gültig)."""
+        macs = tuple(macs)
+        order = np.argsort(macs)
+        r = np.atleast_2d(np.asarray(ranges, dtype=float))[:, order]
+        system = self.system(tuple(macs[i] for i in order))
+        if not system.solvable:
+            return np.full((len(r), system.dim), np.nan), np.zeros(len(r), dtype=bool)
+
+        pos = system.linear(r)
+        pos = system.refine(pos, r, self.iterations, self.damping)
+        valid = np.isfinite(pos).all(axis=1)
+        pos[~valid] = np.nan
+        return pos, valid
+
+    def solve(self, dists: dict[int, float]) -> np.ndarray | None:
+        """Einzelner Fix aus allen bekannten Ankern in `dists`, None wenn nicht lösbar."""
+        macs = sorted(m for m in dists if m in self.anchor_positions)
+        if len(macs) < 3:
+            return None
+        pos, valid = self.solve_batch(macs, [[dists[m] for m in macs]])
+        return pos[0] if valid[0] else None
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parser für die Distanzmessungen der QM33-CLI
+
+Ein einziges vorkompiliertes Muster erkennt Messungen der Form
+    [mac_address=0x0002, status="SUCCESS", distance[cm]=123]
+inklusive optionaler Zusatzfelder (z.B. nlos, rssi) und arbeitet direkt
+auf `bytes`. Für Text (z.B. Zeilen in start_uwb.py) gibt es dieselbe
+Regel als `str`-Variante.
+
+Eine Messung ist ein kompaktes Tupel (mac, status, distance, nlos, rssi):
+`status` ist ein Code aus STATUS_CODES, fehlende Felder sind
+distance=MISSING, nlos=MISSING bzw. rssi=NaN.
+"""
+import math
+import re
+
+_PATTERN = (
+    rb'\[mac_address=0x([0-9a-fA-F]+),\s*status="([A-Z_]+)"'
+    rb'(?:,\s*distance\[cm\]=(-?\d+))?'
+    rb'([^\]]*)\]'
+)
+MEASUREMENT_RE = re.compile(_PATTERN)
+_MEASUREMENT_RE_STR = re.compile(_PATTERN.decode())
+
+_EXTRA_RE = re.compile(rb'(nlos|rssi)\w*=(-?\d+(?:\.\d+)?)')
+_EXTRA_RE_STR = re.compile(_EXTRA_RE.pattern.decode())
+
+STATUS_CODES = {
+    "SUCCESS": 0,
+    "TX_FAILED": 1,
+    "RX_TIMEOUT": 2,
+    "RX_PHY_DEC_FAILED": 3,
+    "RX_PHY_TOA_FAILED": 4,
+    "RX_PHY_STS_FAILED": 5,
+    "RX_MAC_DEC_FAILED": 6,
+    "RX_MAC_IE_DEC_FAILED": 7,
+    "RX_MAC_IE_MISSING": 8,
+}
+STATUS_SUCCESS = STATUS_CODES["SUCCESS"]
+STATUS_UNKNOWN = 255
+_STATUS_LOOKUP = {**STATUS_CODES, **{k.encode(): v for k, v in STATUS_CODES.items()}}
+
+MISSING = -1
+
+# Es gibt nur wenige Anker: die Hex-Umwandlung der MAC wird zwischengespeichert
+_MAC_CACHE: dict[bytes | str, int] = {}
+
+# Strukturierter NumPy-Datentyp für to_records()
+MEASUREMENT_DTYPE = [
+    ("mac", "u2"),
+    ("status", "u1"),
+    ("distance", "i4"),
+    ("nlos", "i1"),
+    ("rssi", "f4"),
+]
+
+Measurement = tuple[int, int, int, int, float]
+
+# --------------------------------------------------------------------------- #
+#  Hilfsfunktionen
+# --------------------------------------------------------------------------- #
+def format_mac(mac: int) -> str:
+    """Formatiert eine MAC-Adresse wie die CLI, z.B. 0x0002."""
+    return f"0x{mac:04X}"
+
+def _mac(mac: bytes | str) -> int:
+    value = _MAC_CACHE.get(mac)
+    if value is None:
+        value = _MAC_CACHE[mac] = int(mac, 16)
+    return value
+
+def _extras(extra, extra_re) -> tuple[int, float]:
+    nlos, rssi = MISSING, math.nan
+    for key, value in extra_re.findall(extra):
+        if key in (b"nlos", "nlos"):
+            nlos = int(float(value))
+        else:
+            rssi = float(value)
+    return nlos, rssi
+
+def _measurement(mac, status, dist, extra, extra_re=_EXTRA_RE) -> Measurement:
+    if extra:
+        nlos, rssi = _extras(extra, extra_re)
+    else:
+        nlos, rssi = MISSING, math.nan
+    return (_mac(mac),
+            _STATUS_LOOKUP.get(status, STATUS_UNKNOWN),
+            int(dist) if dist else MISSING,
+            nlos, rssi)
+
+# --------------------------------------------------------------------------- #
+#  Parser
+# --------------------------------------------------------------------------- #
+def parse_measurements(data: bytes | str) -> list[Measurement]:
+    """Alle Messungen einer Nachricht (oder eines ganzen Logs) als Tupel."""
+    if isinstance(data, str):
+        return [_measurement(*m, _EXTRA_RE_STR) for m in _MEASUREMENT_RE_STR.findall(data)]
+    return [_measurement(*m, _EXTRA_RE) for m in MEASUREMENT_RE.findall(data)]
+
+def parse_line(line: bytes | str) -> Measurement | None:
+    """Eine Messung am Zeilenanfang, wie sie start_uwb.py zeilenweise liefert."""
+    if isinstance(line, str):
+        m = _MEASUREMENT_RE_STR.match(line)
+        return None if m is None else _measurement(*m.groups(), _EXTRA_RE_STR)
+    m = MEASUREMENT_RE.match(line)
+    if m is None:
+        return None
+    mac, status, dist, extra = m.groups()
+    if extra:
+        return _measurement(mac, status, dist, extra)
+    # Schneller Pfad ohne Zusatzfelder
+    key = _MAC_CACHE.get(mac)
+    if key is None:
+        key = _mac(mac)
+    return (key, _STATUS_LOOKUP.get(status, STATUS_UNKNOWN),
+            int(dist) if dist else MISSING, MISSING, math.nan)
+
+def parse_distances(msg: bytes | str, min_count: int = 3) -> dict[int, float] | None:
+    """
+    Distanzen aller SUCCESS-Messungen einer Nachricht, None bei weniger als `min_count`.
+    Negative Distanzen werden wie bisher ignoriert.
+    """
+    if isinstance(msg, str):
+        regex, success, minus = _MEASUREMENT_RE_STR, "SUCCESS", "-"
+    else:
+        regex, success, minus = MEASUREMENT_RE, b"SUCCESS", ord("-")
+    cache = _MAC_CACHE
+    dists = {}
+    for mac, status, dist, _ in regex.findall(msg):
+        if status == success and dist and dist[0] != minus:
+            key = cache.get(mac)
+            if key is None:
+                key = _mac(mac)
+            dists[key] = float(dist)
+    if len(dists) < min_count:
+        return None
+    return dists
+
+def to_records(measurements: list[Measurement]):
+    """Wandelt Messungs-Tupel in ein strukturiertes NumPy-Array (MEASUREMENT_DTYPE)."""
+    import numpy as np
+    return np.array(measurements, dtype=MEASUREMENT_DTYPE)
+
+def parse_records(data: bytes):
+    """
+    Parst einen ganzen Log spaltenweise in ein strukturiertes NumPy-Array.
+    Schneller als parse_measurements() + to_records(), weil nur MACs und Status
+    (wenige verschiedene Werte) über Python-Dicts laufen.
+    """
+    import numpy as np
+    matches = MEASUREMENT_RE.findall(data)
+    out = np.empty(len(matches), dtype=MEASUREMENT_DTYPE)
+    if not matches:
+        return out
+    macs, status, dists, extras = zip(*matches)
+
+    mac_codes = {m: _mac(m) for m in set(macs)}
+    status_codes = {st: _STATUS_LOOKUP.get(st, STATUS_UNKNOWN) for st in set(status)}
+    out["mac"] = list(map(mac_codes.__getitem__, macs))
+    out["status"] = list(map(status_codes.__getitem__, status))
+    if not all(dists):
+        dists = [d or b"-1" for d in dists]
+    out["distance"] = np.array(dists).astype(np.int32)
+    out["nlos"] = MISSING
+    out["rssi"] = np.nan
+    if any(extras):
+        for k, extra in enumerate(extras):
+            if extra:
+                out["nlos"][k], out["rssi"][k] = _extras(extra, _EXTRA_RE)
+    return out
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Begrenzte Queue und Latenzmessung zwischen Reader und Auswertung
+
+`RingQueue` ersetzt die unbegrenzte `queue.Queue` zwischen reader_thread()
+und der Hauptschleife. Schreiben blockiert nie: ist der Puffer voll, fliegt
+der älteste Eintrag raus ("drop-oldest"), bei "latest" bleibt nur der
+neueste. So wächst der Speicher nicht und es kommen keine Sekunden alten
+Positionen heraus, wenn die Auswertung hängt.
+
+`LatencyStats` sammelt die Zeit vom Empfang am Port (Zeitstempel aus
+reader_thread) bis zur fertigen Position und liefert Perzentile.
+"""
+import threading
+from collections import deque
+from queue import Empty
+
+import numpy as np
+
+QUEUE_POLICIES = ("drop-oldest", "latest")
+
+class RingQueue:
+    """Threadsichere Ringpuffer-Queue mit Verwurfsstrategie."""
+
+    def __init__(self, maxsize: int = 64, policy: str = "drop-oldest"):
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"Unbekannte Strategie {policy!r}, erlaubt: {', '.join(QUEUE_POLICIES)}")
+        if maxsize < 1:
+            raise ValueError("maxsize muss mindestens 1 sein")
+        self.policy = policy
+        self.maxsize = 1 if policy == "latest" else maxsize
+        self._items = deque(maxlen=self.maxsize)
+        self._cond = threading.Condition()
+        self.put_count = 0
+        self.dropped = 0
+
+    def put(self, item):
+        """Legt `item` ab; bei vollem Puffer wird der älteste Eintrag verworfen."""
+        with self._cond:
+            if len(self._items) == self.maxsize:
+                self.dropped += 1
+            self._items.append(item)
+            self.put_count += 1
+            self._cond.notify()
+
+    def get(self, timeout: float | None = None):
+        """Wie Queue.get(): wartet höchstens `timeout` s und wirft sonst queue.Empty."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items, timeout):
+                raise Empty
+            return self._items.popleft()
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def empty(self) -> bool:
+        return not self._items
+
+class LatencyStats:
+    """Latenzen in einem vorallokierten Ringpuffer; Perzentile über die letzten `size` Werte."""
+
+    def __init__(self, size: int = 100_000):
+        self._buf = np.empty(size)
+        self.count = 0
+
+    def add(self, latency: float):
+        self._buf[self.count % len(self._buf)] = latency
+        self.count += 1
+
+    def values(self) -> np.ndarray:
+        return self._buf[:min(self.count, len(self._buf))]
+
+    def percentiles(self, q=(50, 95, 99)) -> np.ndarray:
+        return np.percentile(self.values(), q)
+
+    def report(self, queue: RingQueue | None = None) -> str:
+        drops = ""
+        if queue is not None:
+            drops = f", {queue.dropped} von {queue.put_count} Frames verworfen ({queue.policy})"
+        if not self.count:
+            return f"Latenz: keine Positionen{drops}"
+        p50, p95, p99 = self.percentiles() * 1e3
+        return (f"Latenz Port→Position: p50 {p50:.1f} ms, p95 {p95:.1f} ms, p99 {p99:.1f} ms, "
+                f"max. {self.values().max() * 1e3:.1f} ms ({self.count} Positionen){drops}")
@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Öffnen serieller Ports
+
+`open_port()` akzeptiert Gerätepfade (/dev/ttyACM0, COM3), pyserial-URLs
+und sim://-URLs für das simulierte DWM3001C (uwb/sim.py).
+"""
+import serial
+
+if "uwb" not in serial.protocol_handler_packages:
+    serial.protocol_handler_packages.append("uwb")
+
+def open_port(port: str, baudrate: int = 115200, timeout: float | None = 1) -> serial.SerialBase:
+    """Öffnet ein echtes Modul oder den Simulator."""
+    return serial.serial_for_url(port, baudrate=baudrate, timeout=timeout)
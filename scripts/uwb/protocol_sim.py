@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+pyserial-Handler für sim://-URLs
+
+Wird von serial.serial_for_url() geladen, sobald "uwb" in
+serial.protocol_handler_packages steht (siehe uwb.ports.open_port).
+Frames werden beim Lesen aus der Uhr erzeugt, es gibt keinen eigenen Thread.
+"""
+import threading
+import time
+
+from serial.serialutil import SerialBase, SerialException, PortNotOpenError
+
+from .sim import DeviceModel
+
+class Serial(SerialBase):
+    """Serielle Schnittstelle zu einem simulierten DWM3001C."""
+
+    def open(self):
+        if self._port is None:
+            raise SerialException("Port must be configured before it can be used.")
+        if self.is_open:
+            raise SerialException("Port is already open.")
+        self._model = DeviceModel.from_url(self._port)
+        self._rx = bytearray()
+        self._cmd = bytearray()
+        self._lock = threading.Lock()
+        self.is_open = True
+
+    def close(self):
+        if self.is_open:
+            self._model.stop()
+        self.is_open = False
+
+    def _reconfigure_port(self):
+        pass
+
+    def _pump(self):
+        data = self._model.poll()
+        if data:
+            self._rx += data
+
+    def _take(self, n: int) -> bytes:
+        out = bytes(self._rx[:n])
+        del self._rx[:n]
+        return out
+
+    def _wait(self, deadline: float | None):
+        """Schläft bis zum nächsten Frame, höchstens bis zur Deadline."""
+        wake = self._model.next_event()
+        if deadline is not None:
+            wake = min(wake, deadline)
+        time.sleep(min(max(wake - time.monotonic(), 0.0), 0.05))
+
+    @property
+    def in_waiting(self) -> int:
+        if not self.is_open:
+            raise PortNotOpenError
+        with self._lock:
+            self._pump()
+            return len(self._rx)
+
+    def read(self, size: int = 1) -> bytes:
+        if not self.is_open:
+            raise PortNotOpenError
+        deadline = None if self._timeout is None else time.monotonic() + self._timeout
+        while True:
+            with self._lock:
+                self._pump()
+                if len(self._rx) >= size:
+                    return self._take(size)
+                if deadline is not None and time.monotonic() >= deadline:
+                    return self._take(size)
+            self._wait(deadline)
+
+    def readline(self, size: int = -1) -> bytes:
+        if not self.is_open:
+            raise PortNotOpenError
+        deadline = None if self._timeout is None else time.monotonic() + self._timeout
+        while True:
+            with self._lock:
+                self._pump()
+                end = self._rx.find(b"\n")
+                if end >= 0 and (size < 0 or end < size):
+                    return self._take(end + 1)
+                if 0 <= size <= len(self._rx):
+                    return self._take(size)
+                if deadline is not None and time.monotonic() >= deadline:
+                    return self._take(len(self._rx))
+            self._wait(deadline)
+
+    def write(self, data) -> int:
+        if not self.is_open:
+            raise PortNotOpenError
+        data = bytes(data)
+        with self._lock:
+            self._cmd += data
+            while True:
+                end = min((i for i in (self._cmd.find(b"\n"), self._cmd.find(b"\r")) if i >= 0), default=-1)
+                if end < 0:
+                    break
+                line = self._cmd[:end].decode(errors="ignore")
+                del self._cmd[:end + 1]
+                if line.strip():
+                    self._rx += self._model.command(line)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def reset_input_buffer(self):
+        with self._lock:
+            self._pump()
+            self._rx.clear()
+
+    def reset_output_buffer(self):
+        pass
+
+    @property
+    def out_waiting(self) -> int:
+        return 0
+
+    def _update_break_state(self):
+        pass
+
+    def _update_rts_state(self):
+        pass
+
+    def _update_dtr_state(self):
+        pass
+
+    @property
+    def cts(self) -> bool:
+        return True
+
+    @property
+    def dsr(self) -> bool:
+        return True
+
+    @property
+    def ri(self) -> bool:
+        return False
+
+    @property
+    def cd(self) -> bool:
+        return True
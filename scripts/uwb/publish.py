@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Positionen als Binärnachrichten über lokale Sockets verteilen
+
+Jeder Fix ist ein Record fester Größe (FIX_DTYPE, 32 Byte, little endian):
+Tag, laufende Nummer, Zeit (time.monotonic() des Frames, auf Linux für alle
+Prozesse eines Rechners gleich), x, y, z [cm] und Qualität (σ der Position
+in cm; ohne Filter der erwartete Fehler aus der DOP-Karte, sonst NaN). Ein
+Datagramm enthält einen oder mehrere Records hintereinander; `FixPublisher`
+schreibt sie in einen vorallokierten Puffer und sendet ihn ohne weitere
+Kopie, `FixSubscriber` liest per recv_into() und liefert ein NumPy-Array
+direkt auf dem Empfangspuffer. Lücken in der laufenden Nummer zählt er als
+verloren, einen Sprung zurück als Neustart des Publishers.
+
+Adressen: udp://HOST:PORT (Standard udp://127.0.0.1:5005) oder
+unix:///PFAD (Unix-Datagramm-Socket). Abonnenten melden sich mit einem
+kurzen SUB-Datagramm an und wiederholen das alle HEARTBEAT Sekunden; wer
+sich SUBSCRIBER_TIMEOUT Sekunden nicht meldet oder nicht erreichbar ist,
+fliegt raus. So braucht der Publisher keinen Thread und beliebig viele
+Abonnenten können kommen und gehen.
+
+Der Publisher blockiert nie; ist der Empfangspuffer eines Abonnenten voll,
+wird das Datagramm verworfen und in `dropped` gezählt. Bei Unix-Sockets
+begrenzt der Kernel die Warteschlange je Socket auf net.unix.max_dgram_qlen
+Datagramme (oft nur 10, SO_SNDBUF/SO_RCVBUF ändern daran nichts); für
+Bursts daher UDP nehmen, dort hilft ein größerer Empfangspuffer.
+
+Mitlesen auf der Kommandozeile (aus scripts/):
+    python -m uwb.publish [ADRESSE]
+"""
+import argparse
+import itertools
+import math
+import os
+import socket
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+FIX_DTYPE = np.dtype([
+    ("tag", "<u4"),
+    ("seq", "<u4"),
+    ("t", "<f8"),
+    ("x", "<f4"),
+    ("y", "<f4"),
+    ("z", "<f4"),
+    ("quality", "<f4"),
+])
+DEFAULT_ADDRESS = "udp://127.0.0.1:5005"
+MAX_PER_DATAGRAM = 256          # 8 KB pro Datagramm
+HEARTBEAT = 1.0                 # s zwischen zwei Anmeldungen eines Abonnenten
+SUBSCRIBER_TIMEOUT = 5.0        # s ohne Anmeldung, bis ein Abonnent entfernt wird
+SUBSCRIBE = b"SUB"
+UNSUBSCRIBE = b"UNSUB"
+
+_ids = itertools.count()
+
+def parse_address(address: str) -> tuple[int, str | tuple[str, int]]:
+    """udp://HOST:PORT bzw. unix:///PFAD → (Adressfamilie, Socket-Adresse)."""
+    url = urlsplit(address)
+    if url.scheme == "udp":
+        if not url.hostname or url.port is None:
+            raise ValueError(f"UDP-Adresse braucht Host und Port: {address}")
+        return socket.AF_INET, (url.hostname, url.port)
+    if url.scheme == "unix":
+        path = url.netloc + url.path
+        if not path:
+            raise ValueError(f"Unix-Adresse braucht einen Pfad: {address}")
+        return socket.AF_UNIX, path
+    raise ValueError(f"Unbekanntes Schema {url.scheme!r}, erwartet udp:// oder unix://")
+
+# --------------------------------------------------------------------------- #
+#  Publisher
+# --------------------------------------------------------------------------- #
+class FixPublisher:
+    """Sendet Fixes an alle angemeldeten Abonnenten."""
+
+    def __init__(self, address: str = DEFAULT_ADDRESS, subscriber_timeout: float = SUBSCRIBER_TIMEOUT):
+        self.address = address
+        self.family, self.addr = parse_address(address)
+        self.subscriber_timeout = subscriber_timeout
+        self.sock = socket.socket(self.family, socket.SOCK_DGRAM)
+        if self.family == socket.AF_UNIX and os.path.exists(self.addr):
+            os.unlink(self.addr)                    # Reste eines abgebrochenen Laufs
+        self.sock.bind(self.addr)
+        self.sock.setblocking(False)
+        self.subscribers: dict = {}                 # Adresse → letzte Anmeldung
+        self._buf = np.zeros(MAX_PER_DATAGRAM, dtype=FIX_DTYPE)
+        self._seq = 0
+        self.sent = 0
+        self.datagrams = 0
+        self.dropped = 0                            # Empfangspuffer voll
+        self.errors = 0                             # Abonnent nicht erreichbar
+
+    def _poll(self):
+        """Verarbeitet wartende An- und Abmeldungen, ohne zu blockieren."""
+        now = time.monotonic()
+        while True:
+            try:
+                msg, addr = self.sock.recvfrom(64)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                continue                            # z.B. ICMP-Fehler eines früheren Sendens
+            if not addr:
+                continue                            # Unix-Abonnent ohne eigenen Pfad
+            if msg.startswith(UNSUBSCRIBE):
+                self.subscribers.pop(addr, None)
+            elif msg.startswith(SUBSCRIBE):
+                self.subscribers[addr] = now
+        stale = [a for a, t in self.subscribers.items() if now - t > self.subscriber_timeout]
+        for addr in stale:
+            del self.subscribers[addr]
+
+    def publish(self, tags, t, positions, quality=None) -> int:
+        """
+        Sendet n Fixes: Tags (n,), Zeiten (n,), Positionen (n, 2|3) und
+        Qualität (n,) oder None. Liefert die Anzahl der Abonnenten.
+        """
+        self._poll()
+        positions = np.asarray(positions, dtype=float)
+        n = len(positions)
+        if not n or not self.subscribers:
+            self._seq += n
+            return len(self.subscribers)
+        for start in range(0, n, MAX_PER_DATAGRAM):
+            end = min(start + MAX_PER_DATAGRAM, n)
+            k = end - start
+            buf = self._buf[:k]
+            buf["tag"] = tags[start:end] if np.ndim(tags) else tags
+            buf["seq"] = np.arange(self._seq, self._seq + k) & 0xFFFFFFFF
+            buf["t"] = t[start:end] if np.ndim(t) else t
+            buf["x"] = positions[start:end, 0]
+            buf["y"] = positions[start:end, 1]
+            buf["z"] = positions[start:end, 2] if positions.shape[1] > 2 else 0.0
+            buf["quality"] = math.nan if quality is None else quality[start:end]
+            self._seq += k
+            self._send(buf.data)
+        self.sent += n
+        return len(self.subscribers)
+
+    def publish_fix(self, tag: int, t: float, pos, quality: float = math.nan) -> int:
+        """Ein einzelner Fix, z.B. aus den Live-Skripten."""
+        return self.publish(tag, t, np.asarray(pos, dtype=float)[None], np.array([quality]))
+
+    def __call__(self, batch):
+        """Abonnent für TrackingServer.subscribe(): sendet alle Fixes eines Ticks."""
+        self.publish(batch.rows, batch.t_rx, batch.positions, batch.sigma)
+
+    def _send(self, data: memoryview):
+        for addr in list(self.subscribers):
+            try:
+                self.sock.sendto(data, addr)
+            except (BlockingIOError, InterruptedError):
+                self.dropped += 1                   # Empfangspuffer voll: Datagramm verworfen
+                continue
+            except OSError:
+                # Abonnent weg (Socket geschlossen, Pfad gelöscht)
+                self.errors += 1
+                self.subscribers.pop(addr, None)
+                continue
+            self.datagrams += 1
+
+    def report(self) -> str:
+        return (f"Publisher {self.address}: {self.sent} Fixes in {self.datagrams} Datagrammen, "
+                f"{len(self.subscribers)} Abonnenten, {self.dropped} Datagramme verworfen, {self.errors} Sendefehler")
+
+    def close(self):
+        self.sock.close()
+        if self.family == socket.AF_UNIX:
+            try:
+                os.unlink(self.addr)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# --------------------------------------------------------------------------- #
+#  Abonnent
+# --------------------------------------------------------------------------- #
+class FixSubscriber:
+    """
+    Empfängt Fixes eines FixPublisher. `recv()` liefert ein Array mit
+    FIX_DTYPE direkt auf dem Empfangspuffer; es gilt nur bis zum nächsten
+    Aufruf (bei Bedarf `.copy()`).
+    """
+
+    def __init__(self, address: str = DEFAULT_ADDRESS, rcvbuf: int | None = None):
+        self.address = address
+        self.family, self.addr = parse_address(address)
+        self.sock = socket.socket(self.family, socket.SOCK_DGRAM)
+        if rcvbuf:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+        self.path = None
+        if self.family == socket.AF_UNIX:
+            # Eigener Pfad, damit der Publisher antworten kann
+            self.path = os.path.join(tempfile.gettempdir(), f"uwb-sub-{os.getpid()}-{next(_ids)}.sock")
+            self.sock.bind(self.path)
+        else:
+            self.sock.bind(("127.0.0.1" if self.addr[0] in ("127.0.0.1", "localhost") else "", 0))
+        self._buf = bytearray(MAX_PER_DATAGRAM * FIX_DTYPE.itemsize)
+        self._last_sub = -math.inf
+        self._next_seq: int | None = None
+        self.received = 0
+        self.lost = 0
+        self.restarts = 0
+
+    def subscribe(self):
+        try:
+            self.sock.sendto(SUBSCRIBE, self.addr)
+        except OSError:
+            pass                                    # Publisher läuft (noch) nicht
+        self._last_sub = time.monotonic()
+
+    def recv(self, timeout: float | None = None) -> np.ndarray | None:
+        """Wartet höchstens `timeout` s (None: unbegrenzt) auf das nächste Datagramm."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            now = time.monotonic()
+            if now - self._last_sub >= HEARTBEAT:
+                self.subscribe()
+            wait = self._last_sub + HEARTBEAT - now
+            if deadline is not None:
+                if now >= deadline:
+                    return None
+                wait = min(wait, deadline - now)
+            self.sock.settimeout(max(wait, 1e-3))
+            try:
+                n = self.sock.recv_into(self._buf)
+            except socket.timeout:
+                continue
+            except ConnectionRefusedError:
+                continue
+            fixes = np.frombuffer(self._buf, dtype=FIX_DTYPE, count=n // FIX_DTYPE.itemsize)
+            if len(fixes):
+                first = int(fixes["seq"][0])
+                if self._next_seq is not None:
+                    gap = (first - self._next_seq) & 0xFFFFFFFF
+                    if gap < 1 << 31:
+                        self.lost += gap
+                    else:
+                        # Nummer springt zurück: Publisher neu gestartet, ab hier neu zählen
+                        self.restarts += 1
+                self._next_seq = (int(fixes["seq"][-1]) + 1) & 0xFFFFFFFF
+                self.received += len(fixes)
+            return fixes
+
+    def __iter__(self):
+        while True:
+            fixes = self.recv()
+            if fixes is not None:
+                yield from fixes
+
+    def close(self):
+        try:
+            self.sock.sendto(UNSUBSCRIBE, self.addr)
+        except OSError:
+            pass
+        self.sock.close()
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# --------------------------------------------------------------------------- #
+#  Kommandozeile
+# --------------------------------------------------------------------------- #
+def main():
+    parser = argparse.ArgumentParser(description="Fixes eines Publishers mitlesen")
+    parser.add_argument("address", nargs="?", default=DEFAULT_ADDRESS,
+                        help=f"udp://HOST:PORT oder unix:///PFAD (default: {DEFAULT_ADDRESS})")
+    args = parser.parse_args()
+    with FixSubscriber(args.address) as sub:
+        try:
+            for fix in sub:
+                latency = (time.monotonic() - fix["t"]) * 1e3
+                print(f"[{fix['tag']}] #{fix['seq']}  x={fix['x']:6.1f} cm   y={fix['y']:6.1f} cm   "
+                      f"z={fix['z']:6.1f} cm   σ={fix['quality']:5.1f} cm   {latency:6.1f} ms")
+        except KeyboardInterrupt:
+            pass
+        print(f"{sub.received} Fixes, {sub.lost} verloren, {sub.restarts} Neustarts des Publishers")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Binäre, spaltenweise Aufzeichnung von Ranging-Sessions
+
+Eine Aufzeichnung ist ein Verzeichnis mit `meta.json` und durchnummerierten
+Segmenten (`seg_000000/`, ...). Jedes Segment enthält pro Spalte eine
+`.npy`-Datei, eine Zeile pro Messung (Typen siehe RECORD_DTYPE):
+
+    t_rx, device, session, mac, status, distance, nlos, rssi, x, y, z
+
+`t_rx` ist time.monotonic() beim Empfang (in `meta.json` steht die
+zugehörige Wandzeit; bei aus Text umgewandelten Aufzeichnungen die Zeit
+seit Start des Mitschnitts, eine Wandzeit gibt es dort nicht), `session`
+die sequence_number der SESSION_INFO_NTF, x/y/z die aus dem Frame
+berechnete Position (NaN ohne Fix bzw. in 2D).
+Geschrieben wird blockweise: ein Segment wird erst unter seinem endgültigen
+Namen sichtbar, wenn es vollständig ist. Zum Auswerten werden die Spalten
+mit `np.load(mmap_mode="r")` eingeblendet, ohne Text erneut zu parsen;
+gelesen wird nur, was tatsächlich gebraucht wird.
+
+    python -m uwb.recording info AUFNAHME
+    python -m uwb.recording convert mitschnitt.txt AUFNAHME
+"""
+import argparse
+import json
+import math
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from .parsing import MEASUREMENT_DTYPE, Measurement, parse_line, parse_measurements
+
+FORMAT = "uwb-columns"
+VERSION = 1
+
+RECORD_DTYPE = np.dtype(
+    [("t_rx", "f8"), ("device", "u1"), ("session", "u4")]
+    + MEASUREMENT_DTYPE
+    + [("x", "f4"), ("y", "f4"), ("z", "f4")]
+)
+
+CHUNK_ROWS = 8192               # Zeilen pro Segment (~300 kB)
+
+_SESSION_RE = re.compile(rb"sequence_number=(\d+)")
+_SESSION_RE_STR = re.compile(_SESSION_RE.pattern.decode())
+_SEGMENT_GLOB = "seg_*[0-9]"
+
+def _session(data: bytes | str) -> int | None:
+    regex = _SESSION_RE_STR if isinstance(data, str) else _SESSION_RE
+    m = regex.search(data)
+    return None if m is None else int(m.group(1))
+
+# --------------------------------------------------------------------------- #
+#  Schreiben
+# --------------------------------------------------------------------------- #
+class ColumnarRecorder:
+    """
+    Hängt Messungen zeilenweise an und schreibt alle `chunk_rows` Zeilen ein Segment.
+    `meta` ergänzt bzw. ersetzt Einträge in meta.json, z.B. den Zeitbezug.
+    """
+
+    def __init__(self, path: str | Path, chunk_rows: int = CHUNK_ROWS, meta: dict | None = None):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        if any(self.path.glob(_SEGMENT_GLOB)):
+            raise FileExistsError(f"{self.path} enthält bereits eine Aufzeichnung")
+        self._buf = np.empty(chunk_rows, dtype=RECORD_DTYPE)
+        self._n = 0
+        self._lock = threading.Lock()
+        self._sessions: dict[int, int] = {}
+        self.rows = 0
+        self.segments = 0
+        self.meta = {
+            "format": FORMAT,
+            "version": VERSION,
+            "dtype": RECORD_DTYPE.descr,
+            # Bezug von t_rx (monotonic) zur Wandzeit
+            "t0_monotonic": time.monotonic(),
+            "t0_wall": time.time(),
+            **(meta or {}),
+        }
+        self._write_meta()
+
+    def _write_meta(self):
+        tmp = self.path / "meta.json.tmp"
+        tmp.write_text(json.dumps({**self.meta, "rows": self.rows, "segments": self.segments}, indent=2))
+        os.replace(tmp, self.path / "meta.json")
+
+    def _flush(self):
+        if not self._n:
+            return
+        name = self.path / f"seg_{self.segments:06d}"
+        tmp = name.with_suffix(".tmp")
+        tmp.mkdir()
+        rows = self._buf[:self._n]
+        for column in RECORD_DTYPE.names:
+            np.save(tmp / f"{column}.npy", np.ascontiguousarray(rows[column]))
+        os.replace(tmp, name)
+        self.segments += 1
+        self._n = 0
+        self._write_meta()
+
+    def _append(self, t_rx: float, device: int, session: int, m: Measurement, pos):
+        if self._n == len(self._buf):
+            self._flush()
+        if pos is None:
+            x = y = z = math.nan
+        else:
+            x, y = pos[0], pos[1]
+            z = pos[2] if len(pos) > 2 else math.nan
+        self._buf[self._n] = (t_rx, device, session, *m, x, y, z)
+        self._n += 1
+        self.rows += 1
+
+    def add_frame(self, t_rx: float, msg: bytes | str, pos=None, device: int = 0):
+        """Ein ganzer SESSION_INFO_NTF-Frame; `pos` ist die daraus berechnete Position oder None."""
+        session = _session(msg)
+        measurements = parse_measurements(msg)
+        with self._lock:
+            if session is None:
+                session = self._sessions.get(device, 0)
+            for m in measurements:
+                self._append(t_rx, device, session, m, pos)
+
+    def add_line(self, device: int, line: str, t_rx: float | None = None):
+        """Eine einzelne Zeile wie in start_uwb.py; die Session kommt aus der letzten Kopfzeile."""
+        if t_rx is None:
+            t_rx = time.monotonic()
+        line = line.strip()
+        m = parse_line(line)
+        with self._lock:
+            if m is None:
+                session = _session(line)
+                if session is not None:
+                    self._sessions[device] = session
+                return
+            self._append(t_rx, device, self._sessions.get(device, 0), m, None)
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._write_meta()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# --------------------------------------------------------------------------- #
+#  Lesen
+# --------------------------------------------------------------------------- #
+class Recording:
+    """Eine Aufzeichnung, deren Segmente per Memory-Mapping eingeblendet sind."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        meta_file = self.path / "meta.json"
+        if not meta_file.exists():
+            raise FileNotFoundError(f"{self.path} ist keine Aufzeichnung (meta.json fehlt)")
+        self.meta = json.loads(meta_file.read_text())
+        if self.meta.get("format") != FORMAT:
+            raise ValueError(f"Unbekanntes Format in {meta_file}: {self.meta.get('format')!r}")
+        self.segments = sorted(p for p in self.path.glob(_SEGMENT_GLOB) if p.is_dir())
+        self._columns: dict[tuple[int, str], np.ndarray] = {}
+
+    def segment(self, k: int, column: str) -> np.ndarray:
+        """Eine Spalte eines Segments, per Memory-Mapping eingeblendet."""
+        arr = self._columns.get((k, column))
+        if arr is None:
+            if column not in RECORD_DTYPE.names:
+                raise KeyError(column)
+            arr = np.load(self.segments[k] / f"{column}.npy", mmap_mode="r")
+            if arr.dtype != RECORD_DTYPE[column]:
+                raise ValueError(f"{self.segments[k]}/{column}.npy hat unerwarteten Datentyp {arr.dtype}")
+            self._columns[k, column] = arr
+        return arr
+
+    def __len__(self) -> int:
+        return sum(len(self.segment(k, "t_rx")) for k in range(len(self.segments)))
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        """Eine Spalte über alle Segmente (bei nur einem Segment ohne Kopie)."""
+        parts = [self.segment(k, column) for k in range(len(self.segments))]
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=RECORD_DTYPE[column])
+
+    def array(self) -> np.ndarray:
+        """Alle Spalten als strukturiertes Array (Kopie)."""
+        out = np.empty(len(self), dtype=RECORD_DTYPE)
+        for column in RECORD_DTYPE.names:
+            out[column] = self[column]
+        return out
+
+    def wall_time(self, t_rx: np.ndarray) -> np.ndarray:
+        """Rechnet t_rx in Unix-Zeit um; NaN, wenn die Aufzeichnung keine Wandzeit kennt."""
+        if self.meta.get("t0_wall") is None:
+            return np.full(np.shape(t_rx), np.nan)
+        return t_rx - self.meta["t0_monotonic"] + self.meta["t0_wall"]
+
+    def positions(self) -> tuple[np.ndarray, np.ndarray]:
+        """(t_rx, xyz) mit einer Zeile pro Frame mit Fix."""
+        t, dev, ses = self["t_rx"], self["device"], self["session"]
+        xyz = np.column_stack([self["x"], self["y"], self["z"]])
+        # Alle Zeilen eines Frames tragen dieselbe Position: nur die erste behalten
+        first = np.ones(len(t), dtype=bool)
+        first[1:] = (t[1:] != t[:-1]) | (dev[1:] != dev[:-1]) | (ses[1:] != ses[:-1])
+        first &= ~np.isnan(xyz[:, 0])
+        return t[first], xyz[first]
+
+def convert(src: str, dst: str | Path, chunk_rows: int = CHUNK_ROWS) -> int:
+    """
+    Wandelt eine Textaufzeichnung (Format von uwb/replay.py) um; liefert die Anzahl Zeilen.
+    t_rx ist dann die Zeit seit Start des Mitschnitts; die Textdatei enthält keine Wandzeit.
+    """
+    from .replay import read_replay
+
+    meta = {"t0_monotonic": 0.0, "t0_wall": None, "source": os.path.basename(src)}
+    with ColumnarRecorder(dst, chunk_rows, meta) as rec:
+        for t, i, line in read_replay(src):
+            rec.add_line(i, line, math.nan if t is None else t)
+    return rec.rows
+
+# --------------------------------------------------------------------------- #
+#  CLI
+# --------------------------------------------------------------------------- #
+def main():
+    parser = argparse.ArgumentParser(description="Spaltenweise UWB-Aufzeichnungen anzeigen und umwandeln")
+    sub = parser.add_subparsers(dest="command", required=True)
+    info = sub.add_parser("info", help="Zeigt Umfang und Statistik einer Aufzeichnung")
+    info.add_argument("path")
+    conv = sub.add_parser("convert", help="Wandelt eine Textaufzeichnung (--record) um")
+    conv.add_argument("src")
+    conv.add_argument("dst")
+    conv.add_argument("--chunk", type=int, default=CHUNK_ROWS, help=f"Zeilen pro Segment (default: {CHUNK_ROWS})")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        t0 = time.perf_counter()
+        n = convert(args.src, args.dst, args.chunk)
+        print(f"{n} Messungen nach {args.dst} geschrieben ({time.perf_counter() - t0:.2f} s)")
+        return
+
+    rec = Recording(args.path)
+    print(f"{args.path}: {len(rec)} Messungen in {len(rec.segments)} Segmenten")
+    if not len(rec):
+        return
+    t = rec["t_rx"]
+    print(f"Dauer: {np.nanmax(t) - np.nanmin(t):.1f} s")
+    mac, ok, dist = rec["mac"], rec["status"] == 0, rec["distance"]
+    for m in np.unique(mac):
+        sel = mac == m
+        d = dist[sel & ok]
+        median = f"{np.median(d):.1f} cm" if len(d) else "-"
+        print(f"  0x{m:04X}: {sel.sum()} Messungen, {len(d)} SUCCESS, Median {median}")
+    t_fix, _ = rec.positions()
+    print(f"Positionen: {len(t_fix)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Blitting-Renderer für Live-Plots
+
+Statt bei jedem Fix die ganze Figur neu zu zeichnen, wird der Hintergrund
+(Achsen, Anker, Legende) einmal gespeichert und pro Bild nur die
+animierten Artists darüber kopiert. Neue Daten werden mit `submit()`
+gemeldet; gezeichnet wird höchstens `fps`-mal pro Sekunde und immer der
+neueste Stand, Zwischenstände entfallen. Das Modul importiert matplotlib
+nicht selbst.
+"""
+import time
+
+class RenderStats:
+    """Gezeichnete Bilder, übersprungene Frames und Zeichenzeit."""
+
+    def __init__(self):
+        self.submitted = 0
+        self.shown = 0
+        self.rendered = 0
+        self.full_redraws = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    @property
+    def dropped(self) -> int:
+        return max(self.submitted - self.shown, 0)
+
+    def report(self) -> str:
+        if not self.rendered:
+            return f"Plot: keine Bilder, {self.submitted} Frames"
+        return (f"Plot: {self.rendered} Bilder ({self.full_redraws} komplett), {self.dropped} von "
+                f"{self.submitted} Frames übersprungen, Zeichnen im Mittel {self.total / self.rendered * 1e3:.1f} ms, "
+                f"max. {self.max * 1e3:.1f} ms")
+
+class BlitRenderer:
+    """Zeichnet die animierten Artists einer Figur per Blitting mit höchstens `fps` Bildern/s."""
+
+    def __init__(self, fig, artists=(), fps: float = 30.0):
+        self.fig = fig
+        self.canvas = fig.canvas
+        self.interval = 1.0 / fps if fps > 0 else 0.0
+        self.artists = []
+        self.pending = False
+        self.stats = RenderStats()
+        self._bg = None
+        self._next = 0.0
+        for a in artists:
+            self.add(a)
+        self._cid = self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def add(self, artist):
+        """Nimmt einen Artist in die animierte Ebene auf."""
+        artist.set_animated(True)
+        self.artists.append(artist)
+        return artist
+
+    def _on_draw(self, event):
+        # Nach jedem vollständigen Zeichnen (auch Resize/Zoom) Hintergrund neu sichern
+        if event is not None and event.canvas is not self.canvas:
+            return
+        self._bg = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_artists()
+
+    def _draw_artists(self):
+        for a in self.artists:
+            self.fig.draw_artist(a)
+
+    # ---- Takt --------------------------------------------------------------- #
+    def submit(self):
+        """Meldet einen neuen Frame; gezeichnet wird beim nächsten fälligen poll()/render()."""
+        self.stats.submitted += 1
+        self.pending = True
+
+    def due(self) -> bool:
+        return time.perf_counter() >= self._next
+
+    def wait(self):
+        """Schläft bis zum nächsten erlaubten Bild."""
+        delay = self._next - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    def poll(self) -> bool:
+        """Zeichnet den neuesten Stand, falls ein Bild fällig ist; hält sonst die GUI bedienbar."""
+        if not self.due():
+            return False
+        if self.pending:
+            self.render()
+            return True
+        self.canvas.flush_events()
+        self._next = time.perf_counter() + self.interval
+        return False
+
+    def render(self, full: bool = False):
+        """Zeichnet sofort; full=True zeichnet auch den Hintergrund neu (z.B. nach neuen Achsengrenzen)."""
+        t0 = time.perf_counter()
+        # Vor dem Zeichnen zurücksetzen: submit() aus anderen Threads landet sonst im Nichts
+        shown, self.pending = self.pending, False
+        if full or self._bg is None:
+            self.canvas.draw()                      # löst _on_draw aus
+            self.stats.full_redraws += 1
+        else:
+            self.canvas.restore_region(self._bg)
+            self._draw_artists()
+            self.canvas.blit(self.fig.bbox)
+        self.canvas.flush_events()
+        t1 = time.perf_counter()
+
+        st = self.stats
+        st.rendered += 1
+        st.shown += 1 if shown else 0
+        st.total += t1 - t0
+        st.max = max(st.max, t1 - t0)
+        self._next = t1 + self.interval
+
+    def report(self) -> str:
+        return self.stats.report()
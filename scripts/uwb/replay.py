@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Aufzeichnen und Abspielen serieller Zeilen ohne Hardware
+
+Aufzeichnungsformat (eine Zeile pro empfangener Zeile, Tab-getrennt):
+    <t [s] seit Start>\t<Geräteindex>\t<Zeile>
+Zum Abspielen werden außerdem die Konsolenausgabe des `log`-Processors
+("[i]: <Zeile>") und rohe serielle Mitschnitte (Gerät 0) akzeptiert; diese
+enthalten keine Zeitstempel und laufen immer so schnell wie möglich.
+"""
+import re
+import threading
+import time
+from typing import Callable, Iterator, TextIO
+
+_LOG_LINE_RE = re.compile(r"\[(\d+)\]:? (.*)")
+
+def read_replay(path: str) -> Iterator[tuple[float | None, int, str]]:
+    """Liefert (t, Geräteindex, Zeile); t ist None, wenn die Datei keine Zeitstempel hat."""
+    with open(path, encoding="utf-8", errors="ignore") as f:
+        for raw in f:
+            raw = raw.rstrip("\r\n")
+            parts = raw.split("\t", 2)
+            if len(parts) == 3:
+                try:
+                    yield float(parts[0]), int(parts[1]), parts[2]
+                    continue
+                except ValueError:
+                    pass
+            line = raw.strip()
+            if not line:
+                continue
+            m = _LOG_LINE_RE.fullmatch(line)
+            if m:
+                yield None, int(m.group(1)), m.group(2).strip()
+            else:
+                yield None, 0, line
+
+def replay(path: str, on_data: Callable[[int, str], None], speed: float = 1.0,
+           stop_event: threading.Event | None = None) -> tuple[int, float]:
+    """
+    Spielt eine Aufzeichnung in `on_data(i, line)` ein.
+    speed=1 hält die Originalzeiten ein, speed=0 läuft so schnell wie möglich.
+    Liefert (Anzahl Zeilen, Laufzeit in s).
+    """
+    n = 0
+    start = time.perf_counter()
+    for t, i, line in read_replay(path):
+        if stop_event is not None and stop_event.is_set():
+            break
+        if speed > 0 and t is not None:
+            delay = start + t / speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        on_data(i, line)
+        n += 1
+    return n, time.perf_counter() - start
+
+class LineRecorder:
+    """Schreibt empfangene Zeilen threadsicher im Aufzeichnungsformat."""
+
+    def __init__(self, path: str):
+        self._file: TextIO = open(path, "w", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+
+    def write(self, i: int, line: str):
+        t = time.perf_counter() - self._start
+        with self._lock:
+            self._file.write(f"{t:.6f}\t{i}\t{line}\n")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
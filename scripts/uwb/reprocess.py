@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parallele Nachauswertung großer Logdateien
+
+Eine Logdatei wird in Byte-Bereiche zerlegt, deren Grenzen auf den
+nächsten Zeilenanfang (Positionslogs von triang2D/3D, `x= … cm y= … cm
+z= … cm`) bzw. den nächsten SESSION_INFO_NTF (Rohlogs) geschoben werden,
+sodass keine Zeile und kein Frame geteilt wird. Jeder Bereich wird in
+einem eigenen Prozess (ProcessPoolExecutor) gelesen und ausgewertet; Rohlogs
+werden dabei gegen die Anker trilateriert (drei Anker) bzw. multilateriert.
+
+Innerhalb eines Chunks (oder einer ganzen Datei bei einem Prozess) wird in
+Blöcken von BLOCK_BYTES gelesen und geparst, der Speicherbedarf hängt also
+nicht von der Dateigröße ab. Zurück an den Hauptprozess gehen nur
+Teilsummen (Anzahl, Mittelwert und M2 pro Achse, zusammengeführt nach Chan
+et al.). Werden die Positionen selbst gebraucht, legt jeder Worker sie in
+einen eigenen SharedMemory-Block, den der Hauptprozess in Chunk-Reihenfolge
+an einen `ColumnDump` weiterreicht und freigibt.
+"""
+import math
+import os
+import re
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from .anchors import AnchorSet
+from .framing import FRAME_START
+from .multilateration import Multilaterator
+from .parsing import parse_distances
+from .trilateration import trilaterate_frame
+
+MODE_POSITIONS = "positions"
+MODE_FRAMES = "frames"
+
+CHUNK_BYTES = 32 << 20          # Obergrenze pro Chunk
+MIN_CHUNK_BYTES = 1 << 20       # kleinere Chunks lohnen den Prozesswechsel nicht
+BLOCK_BYTES = 1 << 20           # Lesegröße innerhalb eines Chunks
+SAMPLE_BYTES = 1 << 20          # Dateianfang für die Formaterkennung
+
+_NUM = rb"(-?\d+\.?\d*)"
+POSITION_RE = {
+    2: rb"x=\s*" + _NUM + rb"\s*cm\s*y=\s*" + _NUM + rb"\s*cm",
+    3: rb"x=\s*" + _NUM + rb"\s*cm\s*y=\s*" + _NUM + rb"\s*cm\s*z=\s*" + _NUM + rb"\s*cm",
+}
+
+# --------------------------------------------------------------------------- #
+#  Teilsummen
+# --------------------------------------------------------------------------- #
+class Moments:
+    """Anzahl, Mittelwert und M2 pro Achse; Teilergebnisse lassen sich zusammenführen."""
+
+    def __init__(self, dim: int):
+        self.count = 0
+        self.mean = np.zeros(dim)
+        self.m2 = np.zeros(dim)
+
+    @classmethod
+    def of(cls, data: np.ndarray) -> "Moments":
+        m = cls(data.shape[1])
+        if len(data):
+            m.count = len(data)
+            m.mean = data.mean(axis=0)
+            m.m2 = ((data - m.mean) ** 2).sum(axis=0)
+        return m
+
+    def merge(self, other: "Moments") -> "Moments":
+        """Chan et al.: Mittelwert und M2 zweier Teilmengen ohne die Daten selbst."""
+        if other.count == 0:
+            return self
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * (other.count / n)
+        self.m2 = self.m2 + other.m2 + delta ** 2 * (self.count * other.count / n)
+        self.count = n
+        return self
+
+    @property
+    def variance(self) -> np.ndarray:
+        """Stichprobenvarianz pro Achse, NaN bei weniger als zwei Werten."""
+        return self.m2 / (self.count - 1) if self.count > 1 else np.full_like(self.m2, math.nan)
+
+    @property
+    def stdev(self) -> np.ndarray:
+        return np.sqrt(self.variance)
+
+# --------------------------------------------------------------------------- #
+#  Aufteilung
+# --------------------------------------------------------------------------- #
+def detect_format(path: str | Path) -> tuple[str, int]:
+    """(Modus, Achsen) aus dem Dateianfang; Rohlogs liefern 0 Achsen (hängt von den Ankern ab)."""
+    with open(path, "rb") as f:
+        sample = f.read(SAMPLE_BYTES)
+    if FRAME_START in sample:
+        return MODE_FRAMES, 0
+    m = re.search(POSITION_RE[2] + rb"(\s*z=)?", sample)
+    return MODE_POSITIONS, 3 if m is None or m.group(3) else 2
+
+def _marker(mode: str) -> tuple[bytes, int]:
+    """Trennstelle zwischen zwei Einträgen: (Marker, Bytes ab Markeranfang bis zur Grenze)."""
+    return (FRAME_START, 0) if mode == MODE_FRAMES else (b"\n", 1)
+
+def _align(f, pos: int, marker: bytes, skip: int) -> int:
+    """Erste Stelle ab `pos`, an der `marker` beginnt, plus `skip`; Dateiende wenn keiner folgt."""
+    block = 1 << 16
+    f.seek(pos)
+    buf = b""
+    while True:
+        data = f.read(block)
+        if not data:
+            return pos + len(buf)
+        buf += data
+        i = buf.find(marker)
+        if i >= 0:
+            return pos + i + skip
+        # Marker kann über die Blockgrenze gehen
+        keep = len(marker) - 1
+        pos += len(buf) - keep
+        buf = buf[len(buf) - keep:] if keep else b""
+
+def chunk_ranges(path: str | Path, mode: str, chunk_bytes: int = CHUNK_BYTES) -> list[tuple[int, int]]:
+    """Byte-Bereiche [start, end) von etwa `chunk_bytes`, ausgerichtet auf Zeilen bzw. Frames."""
+    size = os.path.getsize(path)
+    marker, skip = _marker(mode)
+    bounds = [0]
+    with open(path, "rb") as f:
+        while bounds[-1] < size:
+            nominal = bounds[-1] + chunk_bytes
+            if nominal >= size:
+                bounds.append(size)
+                break
+            # Grenze erst nach dem ersten Zeichen suchen, sonst bleibt ein Frame am Anfang stehen
+            bounds.append(_align(f, max(nominal, bounds[-1] + 1), marker, skip))
+    return list(zip(bounds[:-1], bounds[1:]))
+
+# --------------------------------------------------------------------------- #
+#  Worker
+# --------------------------------------------------------------------------- #
+class Chunk(NamedTuple):
+    file: int                   # Index der Datei
+    path: str
+    start: int
+    end: int
+    mode: str
+    dim: int
+    anchors: dict | None        # MAC -> Position, nur für Rohlogs
+    keep: bool                  # Positionen per SharedMemory zurückgeben
+
+class ChunkResult(NamedTuple):
+    file: int
+    moments: Moments
+    frames: int                 # Zeilen mit Position bzw. SESSION_INFO_NTF-Frames im Chunk
+    shm_name: str | None
+    rows: int
+
+def parse_positions(data: bytes, dim: int) -> np.ndarray:
+    """Alle Positionszeilen eines Textblocks als (N, dim)."""
+    matches = re.findall(POSITION_RE[dim], data)
+    if not matches:
+        return np.empty((0, dim))
+    return np.array(matches, dtype=np.float64)
+
+def locate_frames(data: bytes, anchors: dict, anchor_set: AnchorSet | None = None,
+                  solver: Multilaterator | None = None) -> tuple[np.ndarray, int]:
+    """
+    Positionen aller SESSION_INFO_NTF-Frames eines Textblocks, wie in triang3D:
+    genau drei Anker per Trilateration (niedrigere Lösung), mehr per Multilateration.
+    Liefert (Positionen (N, dim) in Frame-Reihenfolge, Anzahl Frames).
+    """
+    dim = len(next(iter(anchors.values())))
+    anchor_set = anchor_set or (AnchorSet(anchors) if dim == 3 else None)
+    solver = solver or Multilaterator(anchors)
+
+    # Frames nach Ankermenge gruppieren und jede Gruppe vektorisiert lösen
+    groups: dict[tuple[int, ...], tuple[list[int], list[list[float]]]] = {}
+    frames = data.split(FRAME_START)[1:]
+    for k, frame in enumerate(frames):
+        dists = parse_distances(frame, min_count=3)
+        if dists is None:
+            continue
+        macs = tuple(sorted(m for m in dists if m in anchors))
+        if len(macs) < 3:
+            continue
+        rows, ranges = groups.setdefault(macs, ([], []))
+        rows.append(k)
+        ranges.append([dists[m] for m in macs])
+
+    pos = np.full((len(frames), dim), np.nan)
+    for macs, (rows, ranges) in groups.items():
+        frame = anchor_set.frame(macs) if anchor_set is not None and len(macs) == 3 else None
+        if frame is not None:
+            p, _ = trilaterate_frame(frame, ranges)
+        else:
+            p, _ = solver.solve_batch(macs, ranges)
+        pos[rows] = p
+    return pos[np.isfinite(pos).all(axis=1)], len(frames)
+
+def iter_blocks(path: str | Path, mode: str, start: int = 0, end: int | None = None,
+                block_bytes: int = BLOCK_BYTES):
+    """Liest [start, end) in Blöcken von etwa `block_bytes`, die nur ganze Zeilen bzw. Frames enthalten."""
+    marker, skip = _marker(mode)
+    if end is None:
+        end = os.path.getsize(path)
+    rest = b""
+    with open(path, "rb") as f:
+        f.seek(start)
+        left = end - start
+        while left > 0:
+            data = f.read(min(block_bytes, left))
+            if not data:
+                break
+            left -= len(data)
+            buf = rest + data
+            # Bis vor den letzten Zeilen- bzw. Frameanfang; der Rest kommt zum nächsten Block
+            cut = buf.rfind(marker) + skip
+            if cut <= 0:
+                rest = buf
+                continue
+            rest = buf[cut:]
+            yield buf[:cut]
+    if rest:
+        yield rest
+
+def iter_positions(path: str | Path, mode: str, dim: int, anchors: dict | None = None,
+                   start: int = 0, end: int | None = None, block_bytes: int = BLOCK_BYTES):
+    """Liefert blockweise (Positionen (n, dim), Zeilen bzw. Frames im Block)."""
+    if mode == MODE_FRAMES:
+        anchor_set = AnchorSet(anchors) if dim == 3 else None
+        solver = Multilaterator(anchors)
+        for block in iter_blocks(path, mode, start, end, block_bytes):
+            yield locate_frames(block, anchors, anchor_set, solver)
+    else:
+        for block in iter_blocks(path, mode, start, end, block_bytes):
+            pos = parse_positions(block, dim)
+            yield pos, len(pos)
+
+def _to_shared(data: np.ndarray) -> str:
+    shm = SharedMemory(create=True, size=max(data.nbytes, 1))
+    np.ndarray(data.shape, dtype=data.dtype, buffer=shm.buf)[:] = data
+    name = shm.name
+    shm.close()
+    return name
+
+def process_chunk(chunk: Chunk) -> ChunkResult:
+    """Liest und wertet einen Byte-Bereich blockweise aus; läuft im Worker-Prozess."""
+    moments, frames, kept = Moments(chunk.dim), 0, []
+    for pos, n in iter_positions(chunk.path, chunk.mode, chunk.dim, chunk.anchors,
+                                 chunk.start, chunk.end):
+        moments.merge(Moments.of(pos))
+        frames += n
+        if chunk.keep and len(pos):
+            kept.append(pos)
+    name = _to_shared(np.concatenate(kept)) if kept else None
+    return ChunkResult(chunk.file, moments, frames, name, moments.count)
+
+def take_shared(name: str, rows: int, dim: int) -> np.ndarray:
+    """Kopiert einen Ergebnisblock aus dem SharedMemory und gibt ihn frei."""
+    shm = SharedMemory(name=name)
+    try:
+        return np.ndarray((rows, dim), dtype=np.float64, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+
+# --------------------------------------------------------------------------- #
+#  Auswertung
+# --------------------------------------------------------------------------- #
+class FileResult:
+    """Zusammengeführte Kennwerte einer Logdatei."""
+
+    def __init__(self, path: str, mode: str, dim: int):
+        self.path = path
+        self.mode = mode
+        self.dim = dim
+        self.moments = Moments(dim)
+        self.frames = 0
+        self.chunks = 0
+
+def reprocess(paths, anchors: dict | None = None, jobs: int | None = None,
+              chunk_bytes: int = CHUNK_BYTES, on_positions=None) -> list[FileResult]:
+    """
+    Wertet alle Dateien in `paths` mit `jobs` Prozessen aus (Standard: alle Kerne).
+    Rohlogs brauchen `anchors` (MAC -> Position). `on_positions(datei, pos)` bekommt,
+    falls angegeben, alle Positionen blockweise in Datei-Reihenfolge.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    anchors = {int(m): [float(v) for v in p] for m, p in (anchors or {}).items()}
+
+    results, chunks = [], []
+    sizes = [os.path.getsize(p) for p in paths]
+    # Große Einzeldateien so teilen, dass jeder Prozess mehrere Chunks bekommt
+    chunk_bytes = max(MIN_CHUNK_BYTES, min(chunk_bytes, sum(sizes) // (4 * jobs) + 1))
+    for k, path in enumerate(paths):
+        mode, dim = detect_format(path)
+        if mode == MODE_FRAMES:
+            if not anchors:
+                raise ValueError(f"{path}: Rohlog braucht Ankerpositionen")
+            dim = len(next(iter(anchors.values())))
+        results.append(FileResult(str(path), mode, dim))
+
+    if jobs == 1:
+        # Ein Prozess: jede Datei am Stück streamen, ohne Chunks und SharedMemory
+        for k, (path, result) in enumerate(zip(paths, results)):
+            for pos, n in iter_positions(path, result.mode, result.dim, anchors):
+                result.moments.merge(Moments.of(pos))
+                result.frames += n
+                if on_positions is not None and len(pos):
+                    on_positions(k, pos)
+            result.chunks = 1
+        return results
+
+    keep = on_positions is not None
+    for k, (path, result) in enumerate(zip(paths, results)):
+        for start, end in chunk_ranges(path, result.mode, chunk_bytes):
+            chunks.append(Chunk(k, str(path), start, end, result.mode, result.dim,
+                                anchors if result.mode == MODE_FRAMES else None, keep))
+
+    def collect(parts):
+        for part in parts:
+            result = results[part.file]
+            result.moments.merge(part.moments)
+            result.frames += part.frames
+            result.chunks += 1
+            if part.shm_name is not None:
+                on_positions(part.file, take_shared(part.shm_name, part.rows, result.dim))
+
+    if len(chunks) == 1:
+        collect(map(process_chunk, chunks))
+        return results
+
+    # Worker teilen sich so den Resource-Tracker des Hauptprozesses, der die Blöcke
+    # erst nach dem unlink() hier als freigegeben vermerkt
+    resource_tracker.ensure_running()
+    with ProcessPoolExecutor(max_workers=min(jobs, len(chunks))) as pool:
+        # map() liefert in Chunk-Reihenfolge, die Positionen bleiben sortiert
+        collect(pool.map(process_chunk, chunks))
+    return results
+
+# --------------------------------------------------------------------------- #
+#  Spalten-Dump
+# --------------------------------------------------------------------------- #
+_HEADER_BYTES = 128             # reservierter .npy-Header, Zeilenzahl steht erst am Ende fest
+DUMP_COLUMNS = ("x", "y", "z")
+
+def _npy_header(dtype: np.dtype, rows: int) -> bytes:
+    """Header im .npy-Format 1.0, mit Leerzeichen auf _HEADER_BYTES aufgefüllt."""
+    header = repr({"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": (rows,)})
+    pad = _HEADER_BYTES - 10 - len(header) - 1
+    return (np.lib.format.magic(1, 0) + struct.pack("<H", _HEADER_BYTES - 10)
+            + header.encode("latin1") + b" " * pad + b"\n")
+
+class ColumnDump:
+    """Schreibt Positionen blockweise als eine .npy-Datei pro Achse (x.npy, y.npy, z.npy)."""
+
+    def __init__(self, path: str | Path, dim: int = 3, dtype=np.float64):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.columns = DUMP_COLUMNS[:dim]
+        self.dtype = np.dtype(dtype)
+        self.rows = 0
+        self._files = [open(self.path / f"{c}.npy", "wb") for c in self.columns]
+        for f in self._files:
+            f.write(_npy_header(self.dtype, 0))
+
+    def add(self, pos: np.ndarray):
+        pos = np.asarray(pos, dtype=self.dtype).reshape(-1, len(self.columns))
+        for k, f in enumerate(self._files):
+            f.write(np.ascontiguousarray(pos[:, k]).data)
+        self.rows += len(pos)
+
+    def close(self):
+        for f in self._files:
+            # Header mit der endgültigen Zeilenzahl überschreiben
+            f.seek(0)
+            f.write(_npy_header(self.dtype, self.rows))
+            f.close()
+        self._files = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def is_dump(path: str | Path) -> bool:
+    return (Path(path) / "x.npy").is_file()
+
+def load_dump(path: str | Path) -> tuple[list[str], np.ndarray]:
+    """Liest einen ColumnDump als (Spaltennamen, Array (N, Achsen)); Spalten per Memory-Mapping."""
+    p = Path(path)
+    names = [c for c in DUMP_COLUMNS if (p / f"{c}.npy").is_file()]
+    cols = [np.load(p / f"{c}.npy", mmap_mode="r") if os.path.getsize(p / f"{c}.npy") > _HEADER_BYTES
+            else np.load(p / f"{c}.npy") for c in names]
+    return names, np.column_stack(cols) if cols else np.empty((0, 0))
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Simuliertes DWM3001C-Modul (QM33-CLI)
+
+`DeviceModel` beantwortet die CLI-Befehle (INITF, RESPF, STOP, SAVE,
+RESTORE, SETAPP, CALKEY) und erzeugt als Initiator SESSION_INFO_NTF-Frames
+mit der konfigurierten Ranging-Rate. Die Distanzen kommen aus einem
+Szenario: Ankerlayout, geskriptete Tag-Trajektorie, Rauschen, Aussetzer
+und der per CALKEY gesetzte Antennen-Delay. Eine Einzelpaar-Session ohne
+-MULTI (wie in calibration.py) misst den festen Abstand `pair_distance`.
+
+Zwei Transporte:
+- In-Process über die pyserial-URL `sim://...` (siehe uwb/protocol_sim.py
+  und uwb.ports.open_port), z.B.
+      sim://?role=initiator&rate=100&noise=3&dropout=0.01
+- Als Pseudo-Terminal für beliebige Programme:
+      python -m uwb.sim --pty 2 --role initiator --rate 100
+
+URL-Optionen: role (idle|initiator), addr, paddr (z.B. 2,3,4), rate [Hz],
+noise [cm], dropout [0..1], seed, scenario (JSON-Datei), air (Name des
+gemeinsamen Mediums; angegebene Optionen gelten für alle Geräte darin).
+"""
+import argparse
+import json
+import math
+import os
+import random
+import re
+import select
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+CM_PER_DELAY_UNIT = 0.469       # c * 15.65 ps pro Delay-Einheit
+DEFAULT_ANT_DELAY = 0x4015
+MAX_FRAMES_PER_POLL = 1000      # wer länger nicht liest, verliert ältere Frames
+
+_OPTION_RE = re.compile(r"-(\w+)(?:=(\S+))?")
+
+# --------------------------------------------------------------------------- #
+#  Szenario
+# --------------------------------------------------------------------------- #
+class Trajectory:
+    """Lineare Interpolation zwischen Wegpunkten (t [s], x, y, z [cm]), wird wiederholt."""
+
+    def __init__(self, waypoints):
+        wp = np.asarray(waypoints, dtype=float)
+        if wp.ndim != 2 or wp.shape[1] not in (3, 4):
+            raise ValueError("Wegpunkte brauchen die Form (t, x, y[, z])")
+        if wp.shape[1] == 3:
+            wp = np.column_stack([wp, np.zeros(len(wp))])
+        self.t = wp[:, 0]
+        self.points = wp[:, 1:]
+        self.period = self.t[-1] if self.t[-1] > 0 else 1.0
+
+    @classmethod
+    def circle(cls, center, radius: float, period: float, n: int = 72) -> "Trajectory":
+        center = np.asarray(center, dtype=float)
+        phi = np.linspace(0, 2 * np.pi, n + 1)
+        pts = center + radius * np.column_stack([np.cos(phi), np.sin(phi), np.zeros(n + 1)])
+        return cls(np.column_stack([phi / (2 * np.pi) * period, pts]))
+
+    def position(self, t: float) -> np.ndarray:
+        t = t % self.period
+        return np.array([np.interp(t, self.t, self.points[:, k]) for k in range(3)])
+
+class Scenario:
+    """Ankerlayout, Tag-Trajektorie und Messfehler der Simulation."""
+
+    def __init__(self, anchors: dict[int, np.ndarray] | None = None, trajectory: Trajectory | None = None,
+                 rate: float = 10.0, noise: float = 3.0, dropout: float = 0.0,
+                 pair_distance: float = 200.0, true_ant_delay: int = DEFAULT_ANT_DELAY + 20,
+                 seed: int | None = None):
+        if anchors is None:
+            # Laborlayout aus triang2D.py, auf Bodenhöhe
+            anchors = {0x0002: [0.0, 0.0, 0.0], 0x0003: [0.0, -310.0, 0.0], 0x0004: [550.0, -160.0, 0.0]}
+        self.anchors = {mac: np.pad(np.asarray(p, dtype=float), (0, 3 - len(p))) for mac, p in anchors.items()}
+        if trajectory is None:
+            center = np.mean(list(self.anchors.values()), axis=0)
+            trajectory = Trajectory.circle(center, 100.0, 20.0)
+        self.trajectory = trajectory
+        self.rate = rate
+        self.noise = noise
+        self.dropout = dropout
+        self.pair_distance = pair_distance
+        self.true_ant_delay = true_ant_delay
+        self.rng = random.Random(seed)
+
+    @classmethod
+    def from_json(cls, path: str, **overrides) -> "Scenario":
+        """
+        Lädt ein Szenario, z.B.
+        {"anchors": {"0x0002": [0, 0, 0], ...}, "trajectory": [[0, 100, -100, 0], [5, 300, -100, 0]],
+         "rate": 100, "noise": 3, "dropout": 0.01}
+        """
+        with open(path, encoding="utf-8") as f:
+            cfg = json.load(f)
+        kwargs = {k: cfg[k] for k in ("rate", "noise", "dropout", "pair_distance", "true_ant_delay", "seed") if k in cfg}
+        if "anchors" in cfg:
+            kwargs["anchors"] = {int(mac, 0): pos for mac, pos in cfg["anchors"].items()}
+        if "trajectory" in cfg:
+            kwargs["trajectory"] = Trajectory(cfg["trajectory"])
+        kwargs.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(**kwargs)
+
+class Air:
+    """Gemeinsames Medium: Szenario und die aktiven Geräte nach Adresse."""
+
+    def __init__(self, scenario: Scenario):
+        self.scenario = scenario
+        self.t0 = time.monotonic()
+        self.devices: dict[int, "DeviceModel"] = {}
+        self.lock = threading.Lock()
+
+_AIRS: dict[str, Air] = {}
+_AIRS_LOCK = threading.Lock()
+
+def get_air(name: str = "default", scenario: Scenario | None = None) -> Air:
+    """Liefert das benannte Medium; Geräte im selben Prozess teilen sich so ein Szenario."""
+    with _AIRS_LOCK:
+        air = _AIRS.get(name)
+        if air is None:
+            air = _AIRS[name] = Air(scenario or Scenario())
+        return air
+
+# --------------------------------------------------------------------------- #
+#  Frame-Format
+# --------------------------------------------------------------------------- #
+def format_session_info_ntf(seq: int, measurements: list[tuple[int, str, int | None]]) -> str:
+    """Formatiert eine Nachricht wie die QM33-CLI; eine Messung ist (mac, status, distance|None)."""
+    lines = []
+    for mac, status, dist in measurements:
+        if dist is None:
+            lines.append(f' [mac_address=0x{mac:04x}, status="{status}"]')
+        else:
+            lines.append(f' [mac_address=0x{mac:04x}, status="{status}", distance[cm]={dist}]')
+    return (f"SESSION_INFO_NTF: {{session_handle=1, sequence_number={seq}, block_index={seq}, "
+            f"n_measurements={len(measurements)}\r\n" + ";\r\n".join(lines) + "}\r\n")
+
+# --------------------------------------------------------------------------- #
+#  Gerätemodell
+# --------------------------------------------------------------------------- #
+class DeviceModel:
+    """CLI-Zustandsmaschine eines Moduls; Zeit kommt von außen (poll)."""
+
+    def __init__(self, air: Air, clock=time.monotonic):
+        self.air = air
+        self.clock = clock
+        self.calkeys: dict[str, int] = {}
+        self.role = "idle"
+        self.addr: int | None = None
+        self.peers: list[int] = []
+        self.pair = False
+        self.channel = 9
+        self.seq = 0
+        self.next_due = math.inf
+
+    @classmethod
+    def from_url(cls, url: str) -> "DeviceModel":
+        """Erzeugt ein Gerät aus einer sim://-URL (Optionen siehe Moduldoku)."""
+        opts = {k: v[-1] for k, v in parse_qs(urlsplit(url).query).items()}
+        air = get_air(opts.get("air", "default"))
+        # Explizite Optionen gelten für das ganze Medium, egal welches Gerät zuerst öffnet
+        if "scenario" in opts:
+            air.scenario = Scenario.from_json(opts["scenario"])
+        scenario = air.scenario
+        for key in ("rate", "noise", "dropout", "pair_distance"):
+            if key in opts:
+                setattr(scenario, key, float(opts[key]))
+        if "seed" in opts:
+            scenario.rng.seed(int(opts["seed"]))
+        device = cls(air)
+        if opts.get("role", "idle") == "initiator":
+            # Wie ein per setup_headless.py provisioniertes Modul: startet direkt
+            peers = opts.get("paddr")
+            device.start_initiator(int(opts.get("addr", 1)),
+                                   [int(p) for p in peers.split(",")] if peers else sorted(scenario.anchors))
+        return device
+
+    # ---- Befehle ---------------------------------------------------------- #
+    def command(self, line: str) -> bytes:
+        """Verarbeitet eine Befehlszeile und liefert die Antwort des Moduls."""
+        parts = line.strip().split(maxsplit=1)
+        if not parts:
+            return b"\r\n"
+        cmd = parts[0].upper()
+        rest = parts[1] if len(parts) > 1 else ""
+        opts = {k.upper(): v for k, v in _OPTION_RE.findall(rest)}
+
+        if cmd == "INITF":
+            peers = opts.get("PADDR", "2").strip("[]")
+            self.channel = int(opts.get("CHAN", self.channel))
+            peers = [int(p, 0) for p in peers.split(",") if p]
+            self.start_initiator(int(opts.get("ADDR", 1)), peers, pair="MULTI" not in opts and len(peers) == 1)
+        elif cmd == "RESPF":
+            self.channel = int(opts.get("CHAN", self.channel))
+            self.stop()
+            self.role = "responder"
+            self.addr = int(opts.get("ADDR", 2))
+            with self.air.lock:
+                self.air.devices[self.addr] = self
+        elif cmd == "STOP":
+            self.stop()
+        elif cmd == "CALKEY":
+            key_value = rest.split()
+            if len(key_value) != 2:
+                return b"error: CALKEY <key> <value>\r\n"
+            self.calkeys[key_value[0]] = int(key_value[1], 0)
+        elif cmd == "RESTORE":
+            self.calkeys.clear()
+        elif cmd not in ("SAVE", "SETAPP"):
+            return f"error: unknown command {cmd}\r\n".encode()
+        return b"ok\r\n"
+
+    def start_initiator(self, addr: int, peers: list[int], pair: bool = False):
+        self.stop()
+        self.role = "initiator"
+        self.addr = addr
+        self.peers = peers
+        self.pair = pair
+        with self.air.lock:
+            self.air.devices[addr] = self
+        self.next_due = self.clock()
+
+    def stop(self):
+        if self.addr is not None:
+            with self.air.lock:
+                if self.air.devices.get(self.addr) is self:
+                    del self.air.devices[self.addr]
+        self.role = "idle"
+        self.next_due = math.inf
+
+    def ant_delay(self) -> int:
+        return self.calkeys.get(f"ant0.ch{self.channel}.ant_delay", DEFAULT_ANT_DELAY)
+
+    # ---- Ranging ---------------------------------------------------------- #
+    def _measure(self, t: float) -> list[tuple[int, str, int | None]]:
+        sc = self.air.scenario
+        tag = sc.trajectory.position(t - self.air.t0)
+        with self.air.lock:
+            responders = {addr: self.air.devices.get(addr) for addr in self.peers}
+        out = []
+        for addr in self.peers:
+            if sc.rng.random() < sc.dropout:
+                out.append((addr, "RX_TIMEOUT", None))
+                continue
+            anchor = sc.anchors.get(addr)
+            if self.pair or anchor is None:
+                dist = sc.pair_distance
+            else:
+                dist = float(np.linalg.norm(tag - anchor))
+            # Falsche Antennen-Delays beider Seiten verlängern bzw. verkürzen die Laufzeit
+            peer = responders[addr]
+            delay_error = (sc.true_ant_delay - self.ant_delay()) + \
+                          (sc.true_ant_delay - (peer.ant_delay() if peer else sc.true_ant_delay))
+            dist += delay_error * CM_PER_DELAY_UNIT / 2 + sc.rng.gauss(0.0, sc.noise)
+            out.append((addr, "SUCCESS", round(dist)))
+        return out
+
+    def next_event(self) -> float:
+        """Zeitpunkt (clock) des nächsten Frames, inf wenn nicht gemessen wird."""
+        return self.next_due
+
+    def poll(self, now: float | None = None) -> bytes:
+        """Liefert alle Frames, die bis `now` fällig geworden sind."""
+        if self.role != "initiator":
+            return b""
+        now = self.clock() if now is None else now
+        if now < self.next_due:
+            return b""
+        period = 1.0 / self.air.scenario.rate
+        due = int((now - self.next_due) / period) + 1
+        if due > MAX_FRAMES_PER_POLL:
+            self.next_due += (due - MAX_FRAMES_PER_POLL) * period
+            due = MAX_FRAMES_PER_POLL
+        out = []
+        for _ in range(due):
+            out.append(format_session_info_ntf(self.seq, self._measure(self.next_due)))
+            self.seq += 1
+            self.next_due += period
+        return "".join(out).encode()
+
+# --------------------------------------------------------------------------- #
+#  Pseudo-Terminal
+# --------------------------------------------------------------------------- #
+class PtyDevice:
+    """Stellt ein DeviceModel unter einem Pseudo-Terminal (/dev/pts/N) bereit."""
+
+    def __init__(self, model: DeviceModel):
+        import tty
+        self.model = model
+        self.master, slave = os.openpty()
+        tty.setraw(slave)
+        self.path = os.ttyname(slave)
+        self._slave = slave
+        self._cmd = bytearray()
+
+    def on_readable(self):
+        try:
+            data = os.read(self.master, 4096)
+        except OSError:
+            return
+        self._cmd += data
+        while True:
+            end = min((i for i in (self._cmd.find(b"\n"), self._cmd.find(b"\r")) if i >= 0), default=-1)
+            if end < 0:
+                break
+            line = self._cmd[:end].decode(errors="ignore")
+            del self._cmd[:end + 1]
+            if line.strip():
+                os.write(self.master, self.model.command(line))
+
+    def pump(self):
+        data = self.model.poll()
+        if data:
+            os.write(self.master, data)
+
+    def close(self):
+        os.close(self.master)
+        os.close(self._slave)
+
+def serve_pty(devices: list[PtyDevice], stop_event: threading.Event | None = None):
+    """Bedient alle Pseudo-Terminals, bis `stop_event` gesetzt ist."""
+    by_fd = {d.master: d for d in devices}
+    while stop_event is None or not stop_event.is_set():
+        now = time.monotonic()
+        wait = min((d.model.next_event() for d in devices), default=math.inf) - now
+        readable, _, _ = select.select(list(by_fd), [], [], min(max(wait, 0.0), 0.1))
+        for fd in readable:
+            by_fd[fd].on_readable()
+        for d in devices:
+            d.pump()
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulierte DWM3001C-Module als Pseudo-Terminals")
+    parser.add_argument("--pty", type=int, default=1, help="Anzahl simulierter Module (default: 1)")
+    parser.add_argument("--role", choices=["idle", "initiator"], default="idle",
+                        help="initiator: erstes Modul misst sofort wie ein provisionierter Tag")
+    parser.add_argument("--scenario", type=str, default=None, help="Szenario als JSON-Datei")
+    parser.add_argument("--rate", type=float, default=None, help="Ranging-Rate in Hz")
+    parser.add_argument("--noise", type=float, default=None, help="Standardabweichung in cm")
+    parser.add_argument("--dropout", type=float, default=None, help="Anteil ausgefallener Messungen")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    overrides = dict(rate=args.rate, noise=args.noise, dropout=args.dropout, seed=args.seed)
+    if args.scenario:
+        scenario = Scenario.from_json(args.scenario, **overrides)
+    else:
+        scenario = Scenario(**{k: v for k, v in overrides.items() if v is not None})
+    air = get_air("pty", scenario)
+    devices = [PtyDevice(DeviceModel(air)) for _ in range(args.pty)]
+    if args.role == "initiator":
+        devices[0].model.start_initiator(1, sorted(scenario.anchors))
+    for i, d in enumerate(devices):
+        print(f"[{i}] {d.path}", flush=True)
+    try:
+        serve_pty(devices)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for d in devices:
+            d.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ausgaben für Positionen ohne Plot
+
+`open_sink(spec)` liefert eine Senke für die Fixes der Live-Skripte:
+- "-": CSV-Zeilen auf stdout, jede Zeile sofort geschrieben
+- udp://HOST:PORT bzw. unix:///PFAD: Binär-Records über `FixPublisher`
+- sonst ein Dateipfad: CSV-Datei
+
+Jede Senke wird mit (t_rx, Position, σ) aufgerufen und mit close()
+geschlossen. Das Modul zieht weder matplotlib noch sonst etwas Großes
+nach; so bleibt der Kopfbetrieb (--headless) schlank.
+"""
+import math
+import sys
+
+from .publish import FixPublisher
+
+class CsvSink:
+    """Schreibt t_rx, x, y[, z], sigma als CSV; stdout wird nicht geschlossen."""
+
+    def __init__(self, file, dim: int, flush: bool = False):
+        self.file = file
+        self.flush = flush
+        self.file.write(",".join(["t_rx", *"xyz"[:dim], "sigma"]) + "\n")
+        self.rows = 0
+
+    def __call__(self, t_rx: float, pos, sigma: float = math.nan):
+        self.file.write(f"{t_rx:.3f}," + ",".join(f"{v:.1f}" for v in pos) + f",{sigma:.1f}\n")
+        if self.flush:
+            self.file.flush()
+        self.rows += 1
+
+    def close(self):
+        if self.file is sys.stdout:
+            self.file.flush()
+        else:
+            self.file.close()
+
+    def report(self) -> str:
+        name = "stdout" if self.file is sys.stdout else self.file.name
+        return f"{self.rows} Fixes nach {name} geschrieben"
+
+class PublisherSink:
+    """Sendet jeden Fix als Tag `tag` über einen FixPublisher."""
+
+    def __init__(self, address: str, tag: int = 0):
+        self.publisher = FixPublisher(address)
+        self.tag = tag
+
+    def __call__(self, t_rx: float, pos, sigma: float = math.nan):
+        self.publisher.publish_fix(self.tag, t_rx, pos, sigma)
+
+    def close(self):
+        self.publisher.close()
+
+    def report(self) -> str:
+        return self.publisher.report()
+
+def open_sink(spec: str, dim: int):
+    """Senke zu "-", einer udp://- bzw. unix://-Adresse oder einem Dateipfad."""
+    if spec == "-":
+        return CsvSink(sys.stdout, dim, flush=True)
+    if spec.startswith(("udp://", "unix://")):
+        return PublisherSink(spec)
+    return CsvSink(open(spec, "w", buffering=1), dim)
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Statistik in einem Durchlauf mit konstantem Speicher
+
+`StreamingStats` führt Anzahl, Minimum, Maximum, Mittelwert und Varianz
+nach Welford sowie Quantile mit dem P²-Verfahren (Jain & Chlamtac, 1985)
+mit. Die ersten `exact` Werte (Standard 1000) werden noch gepuffert, bis
+dahin sind alle Kennwerte exakt und gleich denen aus `statistics`. Danach
+werden die P²-Marker aus den exakten Quantilen des Puffers gesetzt, der
+Puffer entfällt und pro Quantil bleiben fünf Marker, unabhängig davon,
+wie lange gemessen wird.
+"""
+import math
+
+def exact_quantile(xs: list[float], p: float) -> float:
+    """p-Quantil einer sortierten Liste wie statistics.quantiles(method="exclusive")."""
+    n = len(xs)
+    if n == 0:
+        return math.nan
+    if n == 1:
+        return xs[0]
+    m = p * (n + 1)
+    j = min(max(int(m), 1), n - 1)
+    return xs[j - 1] + (xs[j] - xs[j - 1]) * (m - j)
+
+class P2Quantile:
+    """Schätzt das p-Quantil eines Datenstroms mit fünf Markern (P²)."""
+
+    def __init__(self, p: float):
+        if not 0 < p < 1:
+            raise ValueError("p muss zwischen 0 und 1 liegen")
+        self.p = p
+        self._first: list[float] = []
+        self._q: list[float] | None = None          # Markerhöhen
+        self._n = [0, 1, 2, 3, 4]                   # Markerpositionen
+        self._step = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+        # Sollpositionen = Start + Anzahl neuer Werte * Schritt, erst bei Bedarf ausgerechnet
+        self._want = [4 * s for s in self._step]
+        self._added = 0
+
+    def init(self, xs: list[float]):
+        """Setzt die Marker aus mindestens fünf sortierten Werten (statt aus den ersten fünf)."""
+        last = len(xs) - 1
+        if last < 4:
+            raise ValueError("Mindestens fünf Werte nötig")
+        idx = [round(s * last) for s in self._step]
+        for i in (1, 2, 3):
+            idx[i] = max(idx[i], idx[i - 1] + 1)
+        for i in (3, 2, 1):
+            idx[i] = min(idx[i], idx[i + 1] - 1)
+        self._n = idx
+        self._q = [xs[i] for i in idx]
+        self._q[2] = exact_quantile(xs, self.p)
+        self._want = [s * last for s in self._step]
+        self._added = 0
+        self._first = []
+
+    def add(self, x: float):
+        q = self._q
+        if q is None:
+            self._first.append(x)
+            if len(self._first) == 5:
+                self._q = sorted(self._first)
+            return
+
+        n = self._n
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        self._added += 1
+        added, want, step = self._added, self._want, self._step
+
+        # Mittlere Marker nachführen, wenn sie mehr als eine Position daneben liegen
+        for i in (1, 2, 3):
+            d = want[i] + added * step[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                qp = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+                if not q[i - 1] < qp < q[i + 1]:
+                    # Parabel verlässt die Nachbarn: linear interpolieren
+                    qp = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = qp
+                n[i] += d
+
+    @property
+    def value(self) -> float:
+        if self._q is not None:
+            return self._q[2]
+        if not self._first:
+            return math.nan
+        return exact_quantile(sorted(self._first), self.p)
+
+class StreamingStats:
+    """Anzahl, Min/Max, Mittelwert, Varianz (Welford) und Quantile (P²) in O(1) Speicher."""
+
+    def __init__(self, quantiles: tuple[float, ...] = (0.25, 0.5, 0.75), exact: int = 1000):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._quantiles = [P2Quantile(p) for p in quantiles]
+        self._exact_limit = max(exact, 5)
+        self._exact: list[float] | None = []
+
+    def add(self, x: float):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+        exact = self._exact
+        if exact is not None:
+            exact.append(x)
+            if len(exact) > self._exact_limit:
+                # Ab hier Schätzung: Marker aus den exakten Quantilen, Puffer freigeben
+                exact.sort()
+                for est in self._quantiles:
+                    est.init(exact)
+                self._exact = None
+            return
+        for est in self._quantiles:
+            est.add(x)
+
+    @property
+    def exact(self) -> bool:
+        """True, solange die Quantile noch aus allen Werten berechnet werden."""
+        return self._exact is not None
+
+    @property
+    def variance(self) -> float:
+        """Stichprobenvarianz wie statistics.variance(), 0 bei weniger als zwei Werten."""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+    @property
+    def quantiles(self) -> list[float]:
+        exact = self._exact             # einmal lesen: add() kann parallel umschalten
+        if exact is not None:
+            xs = sorted(exact)
+            return [exact_quantile(xs, est.p) for est in self._quantiles]
+        return [est.value for est in self._quantiles]
+
+    def quantile(self, p: float) -> float:
+        exact = self._exact
+        for est in self._quantiles:
+            if est.p == p:
+                return exact_quantile(sorted(exact), p) if exact is not None else est.value
+        raise KeyError(f"Quantil {p} wird nicht mitgeführt")
+
+    @property
+    def median(self) -> float:
+        return self.quantile(0.5)
+
+    def boxplot_stats(self, label: str = "") -> dict:
+        """Kennwerte für Axes.bxp(); Whisker bei 1,5·IQR, begrenzt auf Min/Max (keine Ausreißerpunkte)."""
+        q1, med, q3 = (self.quantile(p) for p in (0.25, 0.5, 0.75))
+        iqr = q3 - q1
+        return {
+            "label": label,
+            "med": med,
+            "q1": q1,
+            "q3": q3,
+            "mean": self.mean,
+            "whislo": max(self.min, q1 - 1.5 * iqr),
+            "whishi": min(self.max, q3 + 1.5 * iqr),
+            "fliers": [],
+        }
+
+    def summary(self) -> str:
+        if not self.count:
+            return "keine Werte"
+        q = ", ".join(f"{v:.1f}" for v in self.quantiles)
+        return (f"n = {self.count}{'' if self.exact else ' (P²)'}, Median = {self.median:.1f}, Mittelwert = {self.mean:.2f}, "
+                f"Varianz = {self.variance:.2f}, Min/Max = {self.min:g}/{self.max:g}, Quantile = [{q}]")
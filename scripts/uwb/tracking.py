@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kalman-Tracker für Live-Positionen
+
+Konstantgeschwindigkeitsmodell mit Zustand [Position, Geschwindigkeit] in
+2D oder 3D. Messungen sind entweder die Distanzen zu den Ankern (EKF,
+eine skalare Aktualisierung pro Anker, funktioniert auch mit weniger als
+drei Ankern) oder fertige Positionen. Ausreißer werden über die
+Mahalanobis-Distanz verworfen; Frames ohne Messung werden überbrückt.
+Alle Matrizen und Zwischenergebnisse sind vorallokiert und werden per
+out= bzw. in place überschrieben (die Innovationskovarianz S wird
+geschlossen invertiert), der Aufwand pro Frame ist konstant.
+"""
+import time
+
+import numpy as np
+
+# 99,9 %-Quantile der Chi²-Verteilung für 1..3 Freiheitsgrade
+GATE_CHI2 = {1: 10.83, 2: 13.82, 3: 16.27}
+
+def _inv_sym(S: np.ndarray, out: np.ndarray) -> bool:
+    """Inverse einer symmetrischen 2×2- bzw. 3×3-Matrix nach `out`; False wenn nicht positiv definit."""
+    if len(S) == 2:
+        a, b, c = S[0, 0], S[0, 1], S[1, 1]
+        det = a * c - b * b
+        if not det > 0.0:
+            return False
+        out[0, 0], out[1, 1] = c / det, a / det
+        out[0, 1] = out[1, 0] = -b / det
+        return True
+    a, b, c = S[0, 0], S[0, 1], S[0, 2]
+    e, f, i = S[1, 1], S[1, 2], S[2, 2]
+    c00, c01, c02 = e * i - f * f, c * f - b * i, b * f - c * e
+    det = a * c00 + b * c01 + c * c02
+    if not det > 0.0:
+        return False
+    out[0, 0], out[1, 1], out[2, 2] = c00 / det, (a * i - c * c) / det, (a * e - b * b) / det
+    out[0, 1] = out[1, 0] = c01 / det
+    out[0, 2] = out[2, 0] = c02 / det
+    out[1, 2] = out[2, 1] = (b * c - a * f) / det
+    return True
+
+class FilterTiming:
+    """Laufzeit der Filterschritte."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, dt: float):
+        self.count += 1
+        self.total += dt
+        if dt > self.max:
+            self.max = dt
+
+    def report(self) -> str:
+        if not self.count:
+            return "Filter: keine Frames"
+        return (f"Filter: {self.count} Frames, im Mittel {self.total / self.count * 1e6:.1f} µs, "
+                f"max. {self.max * 1e6:.1f} µs pro Frame")
+
+class Tracker:
+    """
+    Konstantgeschwindigkeits-Kalmanfilter.
+
+    mode="ranges": EKF direkt auf den Distanzen (braucht anchor_positions),
+    mode="position": lineares Update mit der trilaterierten Position.
+    Initialisiert wird immer mit einer Position (erster gültiger Fix).
+    """
+
+    def __init__(self, dim: int, anchor_positions: dict[int, np.ndarray] | None = None,
+                 mode: str = "ranges", accel_std: float = 100.0, range_std: float = 10.0,
+                 position_std: float = 10.0, max_coast: float = 1.0, max_rejects: int = 10):
+        if dim not in (2, 3):
+            raise ValueError("dim muss 2 oder 3 sein")
+        if mode not in ("ranges", "position"):
+            raise ValueError("mode muss 'ranges' oder 'position' sein")
+        if mode == "ranges" and not anchor_positions:
+            raise ValueError("mode='ranges' braucht anchor_positions")
+        self.dim = dim
+        self.mode = mode
+        self.anchors = {mac: np.asarray(p, dtype=float)[:dim] for mac, p in (anchor_positions or {}).items()}
+        self.q = accel_std ** 2
+        self.r_range = range_std ** 2
+        self.r_pos = position_std ** 2
+        self.max_coast = max_coast
+        self.max_rejects = max_rejects
+
+        n = 2 * dim
+        self.x = np.zeros(n)
+        self.P = np.zeros((n, n))
+        self._F = np.eye(n)
+        self._Q = np.zeros((n, n))
+        self._tmp = np.empty((n, n))
+        self._ph = np.empty(n)
+        self._k = np.empty(n)
+        self._u = np.empty(dim)
+        self._y = np.empty(dim)
+        self._sy = np.empty(dim)
+        self._S = np.empty((dim, dim))
+        self._Sinv = np.empty((dim, dim))
+        self._K = np.empty((n, dim))
+        idx = np.arange(dim)
+        self._fv = (idx, idx + dim)                        # dt-Einträge in F
+        self._pp = (idx, idx)
+        self._pv = (idx, idx + dim)
+        self._vp = (idx + dim, idx)
+        self._vv = (idx + dim, idx + dim)
+        self._r_eye = self.r_pos * np.eye(dim)
+
+        self.initialized = False
+        self.t = 0.0
+        self.t_update = 0.0
+        self.rejects = 0
+        self.rejected = 0
+        self.timing = FilterTiming()
+
+    # ---- Zustand ------------------------------------------------------------ #
+    @property
+    def position(self) -> np.ndarray:
+        return self.x[:self.dim]
+
+    @property
+    def velocity(self) -> np.ndarray:
+        return self.x[self.dim:]
+
+    @property
+    def covariance(self) -> np.ndarray:
+        """Kovarianz der Position (dim x dim)."""
+        return self.P[:self.dim, :self.dim]
+
+    def reset(self, t: float, pos: np.ndarray):
+        d = self.dim
+        self.x[:d] = pos[:d]
+        self.x[d:] = 0.0
+        self.P.fill(0.0)
+        self.P[self._pp] = self.r_pos
+        self.P[self._vv] = 100.0 ** 2                      # Geschwindigkeit unbekannt, ~1 m/s
+        self.t = self.t_update = t
+        self.rejects = 0
+        self.initialized = True
+
+    # ---- Filterschritte ----------------------------------------------------- #
+    def predict(self, t: float):
+        dt = t - self.t
+        if dt <= 0.0:
+            return
+        self.t = t
+        F, Q, P, tmp = self._F, self._Q, self.P, self._tmp
+        F[self._fv] = dt
+        q = self.q
+        Q[self._pp] = q * dt ** 3 / 3
+        Q[self._pv] = Q[self._vp] = q * dt ** 2 / 2
+        Q[self._vv] = q * dt
+        np.matmul(F, self.x, out=self._k)
+        self.x[:] = self._k
+        np.matmul(F, P, out=tmp)
+        np.matmul(tmp, F.T, out=P)
+        P += Q
+
+    def update_ranges(self, dists: dict[int, float]) -> int:
+        """Sequentielle skalare EKF-Updates; liefert die Anzahl akzeptierter Distanzen."""
+        d = self.dim
+        x, P, ph, k, u, tmp = self.x, self.P, self._ph, self._k, self._u, self._tmp
+        gate = GATE_CHI2[1]
+        accepted = 0
+        for mac, r in dists.items():
+            anchor = self.anchors.get(mac)
+            if anchor is None:
+                continue
+            np.subtract(x[:d], anchor, out=u)
+            r_hat = float(np.sqrt(u @ u))
+            if r_hat < 1e-6:
+                continue
+            u /= r_hat                                      # Jacobi-Zeile: [u, 0]
+            np.matmul(P[:, :d], u, out=ph)
+            s = float(u @ ph[:d]) + self.r_range
+            y = r - r_hat
+            if y * y > gate * s:
+                continue
+            np.multiply(ph, 1.0 / s, out=k)
+            np.outer(k, ph, out=tmp)
+            P -= tmp
+            k *= y
+            x += k
+            accepted += 1
+        return accepted
+
+    def update_position(self, pos: np.ndarray) -> bool:
+        """Lineares Update mit einer Positionsmessung; False wenn verworfen."""
+        d = self.dim
+        x, P, y, S, Sinv, K = self.x, self.P, self._y, self._S, self._Sinv, self._K
+        np.subtract(pos[:d], x[:d], out=y)
+        np.add(P[:d, :d], self._r_eye, out=S)
+        if not _inv_sym(S, Sinv):
+            return False
+        np.matmul(Sinv, y, out=self._sy)
+        if float(y @ self._sy) > GATE_CHI2[d]:
+            return False
+        np.matmul(P[:, :d], Sinv, out=K)                   # K = P H^T S^-1
+        np.matmul(K, y, out=self._k)
+        x += self._k
+        np.matmul(K, P[:d, :], out=self._tmp)
+        P -= self._tmp
+        return True
+
+    def step(self, t: float, fix: np.ndarray | None = None,
+             dists: dict[int, float] | None = None) -> np.ndarray | None:
+        """
+        Verarbeitet einen Frame: Prädiktion auf t, dann Update mit den Distanzen
+        (mode="ranges") oder dem Fix. Ohne Messung bleibt es bei der Prädiktion.
+        Liefert die geglättete Position oder None, solange der Tracker nicht läuft.
+        """
+        t0 = time.perf_counter()
+        try:
+            if not self.initialized:
+                if fix is None:
+                    return None
+                self.reset(t, fix)
+                return self.position.copy()
+
+            self.predict(t)
+            if self.mode == "ranges":
+                measured = bool(dists)
+                ok = measured and self.update_ranges(dists) > 0
+            else:
+                measured = fix is not None
+                ok = measured and self.update_position(fix)
+
+            if ok:
+                self.t_update = t
+                self.rejects = 0
+            elif measured:
+                self.rejects += 1
+                self.rejected += 1
+
+            if t - self.t_update > self.max_coast or self.rejects > self.max_rejects:
+                # Ziel verloren: mit dem nächsten Fix neu aufsetzen
+                self.initialized = False
+                if fix is not None:
+                    self.reset(t, fix)
+                    return self.position.copy()
+                return None
+            return self.position.copy()
+        finally:
+            self.timing.add(time.perf_counter() - t0)
+
+    def report(self) -> str:
+        return f"{self.timing.report()}, {self.rejected} Frames ohne akzeptierte Messung"
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vektorisierte Trilateration für 2D und 3D
+
+Alle Funktionen arbeiten auf Batches: `ranges` hat die Form (N, 3), die
+Ergebnisse haben die Form (N, 2|3) plus eine Gültigkeitsmaske (N,).
+Der Live-Betrieb ruft dieselbe Engine mit N=1 auf.
+"""
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+DENOM_EPS = 1e-6   # Grenze für numerische Instabilität im 2D-Fall
+
+# --------------------------------------------------------------------------- #
+#  Hilfsfunktionen
+# --------------------------------------------------------------------------- #
+def ranges_matrix(dists: list[dict[int, float]], macs: list[int]) -> np.ndarray:
+    """Baut aus geparsten Distanz-Dicts eine (N, k)-Matrix, fehlende Werte sind NaN."""
+    out = np.full((len(dists), len(macs)), np.nan)
+    for row, d in enumerate(dists):
+        for col, mac in enumerate(macs):
+            if mac in d:
+                out[row, col] = d[mac]
+    return out
+
+def _prepare(anchors, ranges, dim: int) -> tuple[np.ndarray, np.ndarray]:
+    anchors = np.asarray(anchors, dtype=float)
+    r = np.atleast_2d(np.asarray(ranges, dtype=float))
+    if anchors.shape != (3, dim):
+        raise ValueError(f"Erwarte 3 Anker mit {dim} Koordinaten, nicht {anchors.shape}")
+    if r.ndim != 2 or r.shape[1] != 3:
+        raise ValueError(f"Erwarte Distanzen der Form (N, 3), nicht {r.shape}")
+    return anchors, r
+
+def _invalid(n: int, dim: int) -> tuple[np.ndarray, np.ndarray]:
+    return np.full((n, dim), np.nan), np.zeros(n, dtype=bool)
+
+# --------------------------------------------------------------------------- #
+#  Trilateration
+# --------------------------------------------------------------------------- #
+def trilaterate_2d(anchors, ranges) -> tuple[np.ndarray, np.ndarray]:
+    """2D-Trilateration für N Fixes auf einmal: liefert (Positionen (N, 2), gültig (N,))."""
+    anchors, r = _prepare(anchors, ranges, 2)
+    (x1, y1), (x2, y2), (x3, y3) = anchors
+
+    # Koeffizienten hängen nur von den Ankern ab
+    A, B = 2*(x2 - x1), 2*(y2 - y1)
+    D, E = 2*(x3 - x1), 2*(y3 - y1)
+    denom = A*E - B*D
+    if abs(denom) < DENOM_EPS:
+        return _invalid(len(r), 2)
+
+    r2 = r * r
+    C = r2[:, 0] - r2[:, 1] + (x2**2 - x1**2 + y2**2 - y1**2)
+    F = r2[:, 0] - r2[:, 2] + (x3**2 - x1**2 + y3**2 - y1**2)
+
+    pos = np.empty((len(r), 2))
+    pos[:, 0] = (C*E - F*B) / denom
+    pos[:, 1] = (A*F - D*C) / denom
+    valid = np.isfinite(pos).all(axis=1)
+    return pos, valid
+
+class Frame3D(NamedTuple):
+    """Lokales Koordinatensystem dreier 3D-Anker, hängt nur von den Ankerpositionen ab."""
+    origin: np.ndarray      # Anker 1
+    rotation: np.ndarray    # Zeilen ex, ey und ±ez (Seite der niedrigeren Lösung)
+    d: float                # Abstand Anker 1 – Anker 2
+    i: float                # Projektion von Anker 3 auf ex
+    j: float                # Projektion von Anker 3 auf ey
+    coeffs: tuple[float, ...]   # origin und rotation als Python-Floats für locate()
+
+    def locate(self, r1: float, r2: float, r3: float) -> tuple[float, float, float] | None:
+        """Einzelner Fix mit skalaren Distanzen, None wenn z^2 negativ ist."""
+        d, i, j = self.d, self.i, self.j
+        x = (r1*r1 - r2*r2 + d*d) / (2 * d)
+        y = (r1*r1 - r3*r3 + i*i + j*j - 2 * i * x) / (2 * j)
+        z_squared = r1*r1 - x*x - y*y
+        if not z_squared >= 0:
+            return None
+        z = math.sqrt(z_squared)
+        ox, oy, oz, a0, a1, a2, b0, b1, b2, c0, c1, c2 = self.coeffs
+        return (ox + x*a0 + y*b0 + z*c0,
+                oy + x*a1 + y*b1 + z*c1,
+                oz + x*a2 + y*b2 + z*c2)
+
+def anchor_frame(anchors) -> Frame3D | None:
+    """Berechnet das lokale Koordinatensystem, None bei identischen oder kollinearen Ankern."""
+    P1, P2, P3 = np.asarray(anchors, dtype=float)
+
+    ex = P2 - P1
+    d = np.linalg.norm(ex)
+    if d == 0:
+        return None
+    ex = ex / d
+    temp = P3 - P1
+    i = ex @ temp
+    temp2 = temp - i * ex
+    temp2_norm = np.linalg.norm(temp2)
+    if temp2_norm == 0:
+        return None
+    ey = temp2 / temp2_norm
+    ez = np.cross(ex, ey)
+    j = ey @ temp
+
+    # Die Lösung mit dem niedrigeren z-Wert liegt auf der Seite -ez[2]
+    sign = 1.0 if ez[2] < 0 else -1.0
+    rotation = np.stack([ex, ey, sign * ez])
+    coeffs = tuple(P1.tolist() + rotation.ravel().tolist())
+    return Frame3D(P1, rotation, float(d), float(i), float(j), coeffs)
+
+def trilaterate_frame(frame: Frame3D, ranges) -> tuple[np.ndarray, np.ndarray]:
+    """3D-Trilateration für (N, 3) Distanzen mit vorberechnetem Koordinatensystem."""
+    r = np.atleast_2d(np.asarray(ranges, dtype=float))
+    d, i, j = frame.d, frame.i, frame.j
+
+    r2 = r * r
+    local = np.empty((len(r), 3))
+    local[:, 0] = (r2[:, 0] - r2[:, 1] + d**2) / (2 * d)
+    local[:, 1] = (r2[:, 0] - r2[:, 2] + i**2 + j**2 - 2 * i * local[:, 0]) / (2 * j)
+    z_squared = r2[:, 0] - local[:, 0]**2 - local[:, 1]**2
+    valid = z_squared >= 0      # NaN vergleicht ebenfalls als False
+    local[:, 2] = np.sqrt(np.where(valid, z_squared, 0.0))
+
+    pos = frame.origin + local @ frame.rotation
+    valid &= np.isfinite(pos).all(axis=1)
+    pos[~valid] = np.nan
+    return pos, valid
+
+def trilaterate_3d(anchors, ranges) -> tuple[np.ndarray, np.ndarray]:
+    """
+    3D-Trilateration für N Fixes auf einmal: liefert (Positionen (N, 3), gültig (N,)).
+    Von den zwei Spiegellösungen wird die mit dem niedrigeren z-Wert gewählt.
+    """
+    anchors, r = _prepare(anchors, ranges, 3)
+    frame = anchor_frame(anchors)
+    if frame is None:
+        return _invalid(len(r), 3)
+    return trilaterate_frame(frame, r)
+
+def trilaterate(anchors, ranges) -> tuple[np.ndarray, np.ndarray]:
+    """Wählt 2D oder 3D anhand der Dimension der Ankerkoordinaten."""
+    dim = np.shape(anchors)[-1]
+    if dim == 2:
+        return trilaterate_2d(anchors, ranges)
+    if dim == 3:
+        return trilaterate_3d(anchors, ranges)
+    raise ValueError(f"Nicht unterstützte Dimension: {dim}")